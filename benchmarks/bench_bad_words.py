@@ -0,0 +1,79 @@
+"""
+Сравнение проверки запрещённых слов: цикл по списку против автомата.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_bad_words.py --words 20000 --texts 2000
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'ya_news'))
+
+from news.moderation import WordMatcher  # noqa: E402
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя' + string.ascii_lowercase
+
+
+def random_word(rng, min_length=5, max_length=12):
+    length = rng.randint(min_length, max_length)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def loop_search(words, text):
+    """Прежняя реализация CommentForm.clean_text."""
+    for word in words:
+        if word in text:
+            return word
+    return None
+
+
+def measure(function, texts):
+    start = time.perf_counter()
+    for text in texts:
+        function(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=20000)
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--text-length', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = [random_word(rng) for _ in range(args.words)]
+    texts = [
+        ' '.join(
+            random_word(rng, 2, 9) for _ in range(args.text_length // 6)
+        )
+        for _ in range(args.texts)
+    ]
+
+    start = time.perf_counter()
+    matcher = WordMatcher(words)
+    build_time = time.perf_counter() - start
+
+    for text in texts[:50]:
+        assert (loop_search(words, text) is None) == (
+            matcher.search(text) is None
+        )
+
+    loop_time = measure(lambda text: loop_search(words, text), texts)
+    automaton_time = measure(matcher.search, texts)
+    print(f'слов: {args.words}, текстов: {args.texts}, '
+          f'длина текста: ~{args.text_length}')
+    print(f'сборка автомата: {build_time * 1000:.1f} мс')
+    print(f'цикл по словам:  {loop_time / args.texts * 1e6:.1f} мкс/текст')
+    print(f'автомат:         {automaton_time / args.texts * 1e6:.1f} '
+          'мкс/текст')
+    print(f'ускорение:       x{loop_time / automaton_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Полнотекстовый поиск FTS5 против LIKE '%q%' на синтетическом корпусе.
+
+Создаёт отдельную базу SQLite, наполняет её новостями и комментариями
+и сравнивает время запросов. Запуск из корня репозитория:
+    python benchmarks/bench_search.py --news 1000000 --comments 1000000
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import django_setup
+
+VOCABULARY_SIZE = 50000
+WORDS_PER_TEXT = 40
+QUERIES = 20
+
+
+def make_vocabulary(rng):
+    alphabet = 'абвгдежзиклмнопрстуфхцчшэюя'
+    return [
+        ''.join(rng.choice(alphabet) for _ in range(rng.randint(4, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def text(rng, vocabulary, words=WORDS_PER_TEXT):
+    # Распределение Ципфа: частые слова встречаются часто, редкие - редко.
+    return ' '.join(
+        vocabulary[min(int(rng.paretovariate(1.1)), VOCABULARY_SIZE) - 1]
+        for _ in range(words)
+    )
+
+
+def seed(args, rng, vocabulary):
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+
+    user = User.objects.create(username='bench')
+    start = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for first in range(0, args.news, args.batch):
+            cursor.executemany(
+                'INSERT INTO news_news (title, text, date, comment_count) '
+                "VALUES (%s, %s, '2024-01-01', 0)",
+                [
+                    (text(rng, vocabulary, 6), text(rng, vocabulary))
+                    for _ in range(min(args.batch, args.news - first))
+                ]
+            )
+        for first in range(0, args.comments, args.batch):
+            cursor.executemany(
+                'INSERT INTO news_comment (news_id, author_id, text, created) '
+                "VALUES (%s, %s, %s, '2024-01-01 00:00:00')",
+                [
+                    (rng.randint(1, args.news), user.pk,
+                     text(rng, vocabulary, 15))
+                    for _ in range(min(args.batch, args.comments - first))
+                ]
+            )
+    return time.perf_counter() - start
+
+
+def like_search(query, limit):
+    from django.db import connection
+
+    pattern = f'%{query}%'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT id FROM news_news WHERE title LIKE %s OR text LIKE %s '
+            'UNION ALL SELECT news_id FROM news_comment WHERE text LIKE %s '
+            'LIMIT %s',
+            (pattern, pattern, pattern, limit)
+        )
+        return cursor.fetchall()
+
+
+def measure(function, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        function(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=1000000)
+    parser.add_argument('--comments', type=int, default=1000000)
+    parser.add_argument('--batch', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        django_setup.setup('ya_news', Path(directory) / 'bench.sqlite3')
+        django_setup.migrate()
+        from news import search
+
+        rng = random.Random(args.seed)
+        vocabulary = make_vocabulary(rng)
+        seed_time = seed(args, rng, vocabulary)
+        rows = args.news + args.comments
+        print(f'записей: {rows}, вставка с индексом: {seed_time:.1f} с '
+              f'({rows / seed_time:.0f} строк/с)')
+
+        start = time.perf_counter()
+        search.rebuild()
+        print(f'полная перестройка индекса: '
+              f'{time.perf_counter() - start:.1f} с')
+
+        # Слова средней частоты - типичный пользовательский запрос.
+        queries = rng.sample(vocabulary[100:5000], QUERIES)
+        fts_p50, fts_max = measure(
+            lambda query: search.search(query, limit=20), queries
+        )
+        like_p50, like_max = measure(
+            lambda query: like_search(query, 20), queries
+        )
+        print(f'FTS5: p50 {fts_p50 * 1000:.1f} мс, '
+              f'max {fts_max * 1000:.1f} мс')
+        print(f'LIKE: p50 {like_p50 * 1000:.1f} мс, '
+              f'max {like_max * 1000:.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Одновременные писатели комментариев: обычный профиль SQLite против WAL.
+
+Для каждого профиля (yanews.settings, yanews.settings_prod и он же с
+отложенной записью комментариев) создаёт отдельную базу и запускает
+--writers процессов, которые добавляют комментарии, и --readers
+процессов, которые читают страницу новости. Каждая операция
+завершается close_old_connections(), как запрос - сигналом
+request_finished, так что без CONN_MAX_AGE соединение открывается
+заново. С отложенной записью операция писателя - постановка в очередь,
+поэтому отдельно считается, сколько комментариев в секунду дошло до
+базы, включая дозапись очередей в конце. Запуск из корня репозитория:
+    python benchmarks/bench_sqlite_writers.py --writers 8 --readers 4
+"""
+import argparse
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import django_setup
+
+PROFILES = {
+    'default': ('yanews.settings', {}),
+    'prod': ('yanews.settings_prod', {}),
+    'behind': ('yanews.settings_prod', {'NEWS_COMMENTS_WRITE_BEHIND': True}),
+}
+NEWS_COUNT = 50
+
+
+def prepare(profile, database):
+    settings_module, overrides = PROFILES[profile]
+    django_setup.setup(
+        'ya_news', database=database, settings_module=settings_module,
+        **overrides
+    )
+    from django.contrib.auth.models import User
+
+    from news.models import News
+
+    django_setup.migrate()
+    News.objects.bulk_create(
+        News(title=f'Новость {number}', text='Текст')
+        for number in range(NEWS_COUNT)
+    )
+    User.objects.create(username='bench')
+
+
+def run(role, profile, database, start_at, deadline, pause, results):
+    settings_module, overrides = PROFILES[profile]
+    django_setup.setup(
+        'ya_news', database=database, settings_module=settings_module,
+        **overrides
+    )
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, close_old_connections, transaction
+
+    from news import writebehind
+    from news.models import Comment, News
+
+    author = User.objects.get(username='bench')
+    close_old_connections()
+    news_ids = list(range(1, NEWS_COUNT + 1))
+    time.sleep(max(start_at - time.time(), 0))
+    latencies, locked, number = [], 0, 0
+    while time.time() < deadline:
+        news_id = news_ids[number % NEWS_COUNT]
+        number += 1
+        start = time.perf_counter()
+        try:
+            if role == 'writer':
+                comment = Comment(
+                    news_id=news_id, author=author, text='Комментарий'
+                )
+                if settings.NEWS_COMMENTS_WRITE_BEHIND:
+                    writebehind.writer.put(comment)
+                else:
+                    with transaction.atomic():
+                        comment.save()
+            else:
+                News.objects.get(pk=news_id)
+                list(Comment.objects.filter(
+                    news_id=news_id
+                ).select_related('author')[:20])
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            locked += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+        finally:
+            close_old_connections()
+        if role == 'writer':
+            # Интервал между запросами писателя: без него очередь
+            # отложенной записи растёт быстрее, чем её успевают писать.
+            time.sleep(pause)
+    # То же, что atexit при завершении процесса.
+    writebehind.writer.flush()
+    results.put((role, latencies, locked))
+
+
+def percentile(values, rank):
+    ordered = sorted(values)
+    if not ordered:
+        return float('nan')
+    return ordered[max(int(len(ordered) * rank / 100 + 0.5) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--pause', type=float, default=1,
+                        help='Пауза писателя между комментариями, мс.')
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES,
+                        default=list(PROFILES))
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    print(f'писателей: {args.writers}, читателей: {args.readers}, '
+          f'{args.duration:.0f} с')
+    print(f'{"профиль":<9}{"роль":<8}{"операций/с":>12}{"p50, мс":>10}'
+          f'{"p99, мс":>10}{"locked":>8}{"в базе/с":>10}')
+    for profile in args.profiles:
+        database = Path(tempfile.mkdtemp(prefix='bench_writers_')) / 'db'
+        process = context.Process(
+            target=prepare, args=(profile, database)
+        )
+        process.start()
+        process.join()
+        results = context.Queue()
+        # Запас на запуск Django в дочерних процессах.
+        start_at = time.time() + 5
+        deadline = start_at + args.duration
+        roles = ['writer'] * args.writers + ['reader'] * args.readers
+        processes = [
+            context.Process(target=run, args=(
+                role, profile, database, start_at, deadline,
+                args.pause / 1000, results
+            ))
+            for role in roles
+        ]
+        for process in processes:
+            process.start()
+        collected = {'writer': ([], 0), 'reader': ([], 0)}
+        for _ in processes:
+            role, latencies, locked = results.get()
+            total, errors = collected[role]
+            collected[role] = (total + latencies, errors + locked)
+        # Писатели отчитываются, дописав свои очереди.
+        elapsed = time.time() - start_at
+        for process in processes:
+            process.join()
+        with sqlite3.connect(database) as connection:
+            (written,), = connection.execute(
+                'SELECT COUNT(*) FROM news_comment'
+            )
+        for role, (latencies, locked) in collected.items():
+            if role == 'reader' and not args.readers:
+                continue
+            committed = (
+                f'{written / elapsed:>10.0f}' if role == 'writer' else ''
+            )
+            print(f'{profile:<9}{role:<8}'
+                  f'{len(latencies) / args.duration:>12.0f}'
+                  f'{percentile(latencies, 50) * 1000:>10.1f}'
+                  f'{percentile(latencies, 99) * 1000:>10.1f}'
+                  f'{locked:>8}{committed}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Время рендера страницы: загрузчики по умолчанию против кеширующего.
+
+Для каждой страницы проекта повторяет то, что делает render() в
+представлении, - get_template() и render() с RequestContext, - с
+настройками TEMPLATES из settings (шаблон читается и разбирается на
+каждом запросе) и из settings_prod (кеширующий загрузчик). База не
+нужна: объекты в контексте не сохраняются. В yanote DEBUG = False, и
+Django включает кеширующий загрузчик сам, так что там профили совпадают.
+Запуск из корня репозитория:
+    python benchmarks/bench_templates.py --project ya_news
+"""
+import argparse
+import importlib
+import time
+from datetime import date, datetime
+
+import django_setup
+
+SETTINGS = {
+    'ya_news': ('yanews.settings', 'yanews.settings_prod'),
+    'ya_note': ('yanote.settings', 'yanote.settings_prod'),
+}
+
+
+def news_pages(user):
+    from news.forms import CommentForm
+    from news.models import Comment, News
+
+    news = [
+        News(pk=number, title=f'Новость {number}', text='Текст новости. ' * 20,
+             date=date(2024, 1, 1), comment_count=number)
+        for number in range(1, 11)
+    ]
+    comments = [
+        Comment(pk=number, news=news[0], author=user, text='Комментарий',
+                created=datetime(2024, 1, 1))
+        for number in range(1, 21)
+    ]
+    return {
+        'home': ('news/home.html', {'object_list': news}),
+        'detail': ('news/detail.html', {
+            'news': news[0], 'object': news[0], 'news_id': news[0].pk,
+            'comments': comments, 'next_cursor': 'cursor',
+            'form': CommentForm(),
+        }),
+    }
+
+
+def note_pages(user):
+    from notes.forms import NoteForm
+    from notes.models import Note
+
+    notes = [
+        Note(pk=number, title=f'Заметка {number}', text='Текст заметки',
+             slug=f'note-{number}', author=user)
+        for number in range(1, 21)
+    ]
+    return {
+        'list': ('notes/list.html', {'object_list': notes}),
+        'detail': ('notes/detail.html', {'note': notes[0]}),
+        'form': ('notes/form.html', {'form': NoteForm()}),
+    }
+
+
+PAGES = {'ya_news': news_pages, 'ya_note': note_pages}
+
+
+def measure(backend, request, template_name, context, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        backend.get_template(template_name).render(context, request)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--project', choices=SETTINGS, default='ya_news')
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    base, prod = SETTINGS[args.project]
+    django_setup.setup(args.project, settings_module=base)
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.template.backends.django import DjangoTemplates
+    from django.test import RequestFactory
+
+    user = User(pk=1, username='bench')
+    request = RequestFactory().get('/')
+    request.user = user
+    pages = PAGES[args.project](user)
+    profiles = {
+        'settings': settings.TEMPLATES[0],
+        'prod': importlib.import_module(prod).TEMPLATES[0],
+    }
+    print(f'{args.project}, {args.iterations} рендеров на страницу')
+    print(f'{"страница":<10}{"профиль":<10}{"p50, мкс":>10}'
+          f'{"p99, мкс":>10}')
+    for page, (template_name, context) in pages.items():
+        for profile, params in profiles.items():
+            # DjangoTemplates меняет OPTIONS, поэтому передаём копию.
+            backend = DjangoTemplates({
+                'NAME': profile, 'DIRS': params['DIRS'],
+                'APP_DIRS': params['APP_DIRS'],
+                'OPTIONS': {**params['OPTIONS']},
+            })
+            # Первый рендер с кеширующим загрузчиком и есть прогрев.
+            backend.get_template(template_name)
+            timings = measure(
+                backend, request, template_name, context, args.iterations
+            )
+            p50 = timings[len(timings) // 2] * 1e6
+            p99 = timings[int(len(timings) * 0.99)] * 1e6
+            print(f'{page:<10}{profile:<10}{p50:>10.0f}{p99:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,430 @@
+"""
+Бенчмарк представлений news и notes на реалистичных объёмах данных.
+
+Для каждого проекта создаёт базу SQLite, наполняет её (по умолчанию
+100 тыс. новостей, 10 млн комментариев, 1 млн заметок у 10 тыс.
+пользователей; --scale уменьшает все объёмы разом) и вызывает
+представления в том же процессе через тестовый Client. По каждому
+сценарию считает операции в секунду, p50 и p99 времени ответа, число
+SQL-запросов на запрос и пик памяти Python (tracemalloc, отдельным
+коротким прогоном, чтобы не искажать время).
+
+Результаты пишутся в JSON (--output). С --baseline результаты
+сравниваются с прежним файлом: скрипт завершается с кодом 1, если
+какой-то сценарий ухудшился больше, чем на --threshold, или стал делать
+больше запросов. --results сравнивает готовый файл без прогона.
+    python benchmarks/bench_views.py --scale 0.01 --output base.json
+    python benchmarks/bench_views.py --scale 0.01 --baseline base.json
+С --data-dir наполненная база сохраняется и используется повторно.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import django_setup
+
+VOLUMES = {
+    'news': 100000,
+    'comments': 10000000,
+    'notes': 1000000,
+    'users': 10000,
+}
+PROJECTS = {
+    'ya_news': ('news', 'comments', 'users'),
+    'ya_note': ('notes', 'users'),
+}
+BATCH = 10000
+# Клиентов с сессией на сценарий: запросы идут от случайного из них.
+CLIENTS = 50
+# Метрики, для которых рост - ухудшение; у ops_per_sec наоборот.
+HIGHER_IS_WORSE = ('p50_ms', 'p99_ms', 'peak_kib')
+# p99 на сотнях запросов шумит сильнее остальных метрик: допуск для него
+# во столько раз больше --threshold.
+P99_TOLERANCE = 3
+
+
+def scaled_volumes(scale):
+    return {
+        name: max(int(value * scale), 1) for name, value in VOLUMES.items()
+    }
+
+
+def insert_users(cursor, count):
+    for first in range(0, count, BATCH):
+        cursor.executemany(
+            'INSERT INTO auth_user (username, password, is_superuser, '
+            'first_name, last_name, email, is_staff, is_active, '
+            "date_joined) VALUES (%s, '!', 0, '', '', '', 0, 1, "
+            "'2024-01-01 00:00:00')",
+            [(f'user{number}',)
+             for number in range(first, min(first + BATCH, count))]
+        )
+
+
+def seed_news(volumes, rng):
+    from django.db import connection, transaction
+
+    from news import search
+
+    # Индекс строится одним проходом после вставки, а не триггерами.
+    search.uninstall()
+    with transaction.atomic(), connection.cursor() as cursor:
+        insert_users(cursor, volumes['users'])
+        for first in range(0, volumes['news'], BATCH):
+            cursor.executemany(
+                'INSERT INTO news_news (title, text, date, comment_count) '
+                "VALUES (%s, %s, '2024-01-01', 0)",
+                [(f'Новость {number}', 'Текст новости. ' * 20)
+                 for number in range(
+                     first, min(first + BATCH, volumes['news']))]
+            )
+        for first in range(0, volumes['comments'], BATCH):
+            cursor.executemany(
+                'INSERT INTO news_comment (news_id, author_id, text, '
+                "created) VALUES (%s, %s, 'Комментарий к новости', "
+                "'2024-01-01 00:00:00')",
+                [(rng.randint(1, volumes['news']),
+                  rng.randint(1, volumes['users']))
+                 for _ in range(
+                     min(BATCH, volumes['comments'] - first))]
+            )
+    from news.models import News
+
+    News.objects.recount_comments()
+    search.install()
+    search.rebuild()
+
+
+def seed_notes(volumes, rng):
+    from django.db import connection, transaction
+
+    from notes import search
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        insert_users(cursor, volumes['users'])
+        for first in range(0, volumes['notes'], BATCH):
+            cursor.executemany(
+                'INSERT INTO notes_note (title, text, slug, author_id, '
+                "modified) VALUES (%s, %s, %s, %s, '2024-01-01 00:00:00')",
+                [(f'Заметка {number}', 'Текст заметки. ' * 10,
+                  f'note-{number}', rng.randint(1, volumes['users']))
+                 for number in range(
+                     first, min(first + BATCH, volumes['notes']))]
+            )
+    search.reindex()
+
+
+def make_clients(count, rng, users):
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    clients = []
+    for user in User.objects.filter(
+            pk__in=rng.sample(range(1, users + 1), min(count, users))):
+        client = Client()
+        client.force_login(user)
+        client.user = user
+        clients.append(client)
+    return clients
+
+
+def news_scenarios(volumes, rng):
+    from django.test import Client
+    from django.urls import reverse
+
+    anonymous = [Client()]
+    users = make_clients(CLIENTS, rng, volumes['users'])
+
+    def random_news():
+        return reverse(
+            'news:detail', args=(rng.randint(1, volumes['news']),)
+        )
+
+    return {
+        'news:home anonymous': lambda: (
+            rng.choice(anonymous).get(reverse('news:home')), 200
+        ),
+        'news:home user': lambda: (
+            rng.choice(users).get(reverse('news:home')), 200
+        ),
+        'news:detail anonymous': lambda: (
+            rng.choice(anonymous).get(random_news()), 200
+        ),
+        'news:detail user': lambda: (
+            rng.choice(users).get(random_news()), 200
+        ),
+        'news:comment post': lambda: (
+            rng.choice(users).post(
+                random_news(), data={'text': 'Новый комментарий'}
+            ), 302
+        ),
+    }
+
+
+def note_scenarios(volumes, rng):
+    from django.urls import reverse
+
+    from notes.models import Note
+
+    users = make_clients(CLIENTS, rng, volumes['users'])
+    slugs = {
+        client.user.pk: list(
+            Note.objects.filter(author=client.user).values_list(
+                'slug', flat=True
+            )
+        ) or [None]
+        for client in users
+    }
+    counter = iter(range(sys.maxsize))
+
+    def detail():
+        client = rng.choice(users)
+        slug = rng.choice(slugs[client.user.pk])
+        if slug is None:
+            return client.get(reverse('notes:list')), 200
+        return client.get(reverse('notes:detail', args=(slug,))), 200
+
+    return {
+        'notes:list': lambda: (
+            rng.choice(users).get(reverse('notes:list')), 200
+        ),
+        'notes:detail': detail,
+        'notes:add post': lambda: (
+            rng.choice(users).post(reverse('notes:add'), data={
+                'title': 'Новая заметка', 'text': 'Текст',
+                'slug': f'bench-{time.time_ns()}-{next(counter)}',
+            }), 302
+        ),
+    }
+
+
+def percentile(ordered, rank):
+    return ordered[max(int(len(ordered) * rank / 100 + 0.5) - 1, 0)]
+
+
+def call(scenario, name):
+    response, status = scenario()
+    if response.status_code != status:
+        raise RuntimeError(
+            f'{name}: ответ {response.status_code}, ожидался {status}'
+        )
+
+
+def measure(name, scenario, iterations, memory_iterations):
+    from django.db import connection
+
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    # Прогрев: кеши страниц, шаблоны, соединение с базой.
+    for _ in range(min(iterations // 10 + 1, 50)):
+        call(scenario, name)
+    timings = []
+    with connection.execute_wrapper(count):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            call(scenario, name)
+            timings.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    for _ in range(memory_iterations):
+        call(scenario, name)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        'ops_per_sec': round(iterations / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'queries': round(queries / iterations, 2),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_project(project, options, results):
+    if options['data_dir'] is not None:
+        measure_project(project, options, options['data_dir'], results)
+        return
+    with tempfile.TemporaryDirectory(prefix='bench_views_') as directory:
+        measure_project(project, options, Path(directory), results)
+
+
+def measure_project(project, options, data_dir, results):
+    volumes = options['volumes']
+    suffix = '-'.join(str(volumes[name]) for name in PROJECTS[project])
+    database = data_dir / f'{project}-{options["profile"]}-{suffix}.db'
+    # Отметка появляется после наполнения: прерванное наполнение
+    # начинается заново, а не оставляет полупустую базу.
+    marker = database.with_suffix('.seeded')
+    seeded = marker.exists()
+    if not seeded:
+        database.unlink(missing_ok=True)
+    settings_module = django_setup.PROJECTS[project]
+    if options['profile'] == 'prod':
+        settings_module += '_prod'
+    django_setup.setup(
+        project, database=database, settings_module=settings_module,
+        ALLOWED_HOSTS=['testserver'],
+    )
+    rng = random.Random(options['seed'])
+    if not seeded:
+        start = time.perf_counter()
+        django_setup.migrate()
+        (seed_news if project == 'ya_news' else seed_notes)(volumes, rng)
+        marker.touch()
+        print(f'{project}: база наполнена за '
+              f'{time.perf_counter() - start:.0f} с', file=sys.stderr)
+    scenarios = (
+        news_scenarios if project == 'ya_news' else note_scenarios
+    )(volumes, rng)
+    for name, scenario in scenarios.items():
+        if options['only'] and name not in options['only']:
+            continue
+        results.put((name, measure(
+            name, scenario, options['iterations'],
+            options['memory_iterations']
+        )))
+    from django.db import connections
+
+    connections.close_all()
+    results.put(None)
+
+
+def run(args):
+    volumes = scaled_volumes(args.scale)
+    options = {
+        'volumes': volumes, 'data_dir': args.data_dir, 'seed': args.seed,
+        'profile': args.profile, 'iterations': args.iterations,
+        'memory_iterations': args.memory_iterations, 'only': args.only,
+    }
+    context = multiprocessing.get_context('spawn')
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'profile': args.profile,
+            'volumes': volumes,
+            'iterations': args.iterations,
+        },
+        'results': {},
+    }
+    # Каждый проект в своём процессе: Django настраивается один раз.
+    for project in args.projects:
+        results = context.Queue()
+        process = context.Process(
+            target=run_project, args=(project, options, results)
+        )
+        process.start()
+        while True:
+            item = results.get()
+            if item is None:
+                break
+            name, metrics = item
+            report['results'][name] = metrics
+            print_row(name, metrics)
+        process.join()
+        if process.exitcode:
+            raise SystemExit(f'{project}: процесс завершился с ошибкой')
+    return report
+
+
+def print_row(name, metrics):
+    print(f'{name:<24}{metrics["ops_per_sec"]:>10.1f}'
+          f'{metrics["p50_ms"]:>10.2f}{metrics["p99_ms"]:>10.2f}'
+          f'{metrics["queries"]:>10.2f}{metrics["peak_kib"]:>12.0f}')
+
+
+def compare(baseline, current, threshold):
+    """
+    Сравнивает результаты с базовыми; возвращает список ухудшений.
+
+    Время, пик памяти и ops/sec сравниваются с допуском threshold (доля,
+    для p99 - в P99_TOLERANCE раз больше), число запросов - точно: любой
+    лишний запрос - это регрессия.
+    """
+    regressions = []
+    print(f'\n{"сценарий":<24}{"метрика":<13}{"было":>12}{"стало":>12}'
+          f'{"изменение":>11}')
+    for name, metrics in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if old is None:
+                continue
+            change = (value - old) / old if old else 0.0
+            limit = threshold * (P99_TOLERANCE if metric == 'p99_ms' else 1)
+            if metric == 'queries':
+                worse = value > old
+            elif metric in HIGHER_IS_WORSE:
+                worse = change > limit
+            else:
+                worse = -change > limit
+            mark = '  <-' if worse else ''
+            print(f'{name:<24}{metric:<13}{old:>12}{value:>12}'
+                  f'{change:>+10.1%}{mark}')
+            if worse:
+                regressions.append((name, metric, old, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--projects', nargs='+', choices=PROJECTS,
+                        default=list(PROJECTS))
+    parser.add_argument('--profile', choices=('default', 'prod'),
+                        default='default',
+                        help='settings или settings_prod проекта.')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Множитель объёмов данных.')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--memory-iterations', type=int, default=20)
+    parser.add_argument('--only', nargs='+', help='Только эти сценарии.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', type=Path,
+                        help='Каталог для повторного использования баз.')
+    parser.add_argument('--output', type=Path, help='Файл для JSON.')
+    parser.add_argument('--baseline', type=Path,
+                        help='JSON прежнего прогона для сравнения.')
+    parser.add_argument('--results', type=Path,
+                        help='Сравнить готовый JSON, не запуская прогон.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Допустимое ухудшение, доля (0.1 = 10%%).')
+    args = parser.parse_args()
+
+    if args.results is not None:
+        report = json.loads(args.results.read_text())
+    else:
+        print(f'{"сценарий":<24}{"ops/s":>10}{"p50, мс":>10}'
+              f'{"p99, мс":>10}{"запросы":>10}{"пик, КиБ":>12}')
+        report = run(args)
+    if args.output is not None:
+        args.output.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2) + '\n'
+        )
+    if args.baseline is not None:
+        regressions = compare(
+            json.loads(args.baseline.read_text()), report, args.threshold
+        )
+        if regressions:
+            print(f'\nухудшений: {len(regressions)}')
+            return 1
+        print('\nухудшений нет')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Подготовка Django-проекта для запуска бенчмарков вне manage.py."""
+import os
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PROJECTS = {
+    'ya_news': 'yanews.settings',
+    'ya_note': 'yanote.settings',
+}
+
+
+def setup(project, database=None, settings_module=None, **overrides):
+    """
+    Настраивает Django для проекта project ('ya_news' или 'ya_note').
+
+    database - путь к отдельному файлу SQLite, чтобы бенчмарк не трогал
+    рабочую базу; overrides - дополнительные настройки.
+    """
+    sys.path.insert(0, str(REPO_DIR / project))
+    os.environ['DJANGO_SETTINGS_MODULE'] = (
+        settings_module or PROJECTS[project]
+    )
+    import django
+    from django.conf import settings
+
+    if database is not None:
+        settings.DATABASES['default']['NAME'] = str(database)
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+
+def migrate():
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0, interactive=False)
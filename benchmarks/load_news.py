@@ -0,0 +1,232 @@
+"""
+Нагрузочный тест главной страницы и страниц новостей: WSGI против ASGI.
+
+Создаёт отдельную базу SQLite, наполняет её и по очереди поднимает на
+одном ядре (taskset -c 0):
+    wsgi        gunicorn, 1 процесс gthread;
+    asgi-sync   uvicorn, синхронные представления;
+    asgi-async  uvicorn, NEWS_ASYNC_ROUTES = ('home', 'detail').
+Нагрузку даёт встроенный клиент на asyncio с keep-alive соединениями;
+часть соединений (--auth-share) ходит с cookie сессии пользователя.
+
+Серверы в requirements.txt не входят:
+    pip install gunicorn uvicorn
+    python benchmarks/load_news.py --connections 300 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import django_setup
+
+PROJECT_DIR = django_setup.REPO_DIR / 'ya_news'
+SETTINGS = '''\
+from yanews.settings import *  # noqa: F401, F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['127.0.0.1']
+DATABASES['default']['NAME'] = {database!r}  # noqa: F405
+NEWS_ASYNC_ROUTES = {routes!r}
+NEWS_ASYNC_WORKERS = {workers!r}
+'''
+MODES = {
+    'wsgi': ((), 'gunicorn'),
+    'asgi-sync': ((), 'uvicorn'),
+    'asgi-async': (('home', 'detail'), 'uvicorn'),
+}
+
+
+def seed(args):
+    from django.contrib.auth import (
+        BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY,
+    )
+    from django.contrib.auth.models import User
+    from django.contrib.sessions.backends.db import SessionStore
+
+    from news.models import Comment, News
+
+    News.objects.bulk_create(
+        News(title=f'Новость {number}', text='Текст новости. ' * 20)
+        for number in range(args.news)
+    )
+    user = User.objects.create(username='bench')
+    news_ids = list(News.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        Comment(news_id=news_id, author=user, text='Комментарий ' * 5)
+        for news_id in news_ids
+        for _ in range(args.comments)
+    )
+    News.objects.recount_comments()
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return news_ids, session.session_key
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(server, port, args):
+    if server == 'gunicorn':
+        command = [
+            'gunicorn', 'yanews.wsgi', '-w', '1', '-k', 'gthread',
+            '--threads', str(args.threads), '--backlog', '2048',
+            '-b', f'127.0.0.1:{port}', '--log-level', 'warning',
+        ]
+    else:
+        command = [
+            'uvicorn', 'yanews.asgi:application', '--port', str(port),
+            '--no-access-log', '--log-level', 'warning',
+            '--backlog', '2048',
+        ]
+    if shutil.which('taskset'):
+        command = ['taskset', '-c', '0'] + command
+    process = subprocess.Popen(command, cwd=PROJECT_DIR, env=os.environ)
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{server} не запустился')
+
+
+async def worker(port, paths, cookie, revalidate, deadline, latencies,
+                 errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    headers = f'Cookie: sessionid={cookie}\r\n' if cookie else ''
+    etags = {}
+    try:
+        while time.monotonic() < deadline:
+            path = random.choice(paths)
+            start = time.perf_counter()
+            condition = (
+                f'If-None-Match: {etags[path]}\r\n' if path in etags else ''
+            )
+            writer.write(
+                f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                f'{headers}{condition}\r\n'.encode()
+            )
+            head = await reader.readuntil(b'\r\n\r\n')
+            status = int(head.split(b' ', 2)[1])
+            length = 0
+            for line in head.split(b'\r\n'):
+                name, _, value = line.partition(b':')
+                if name.lower() == b'content-length':
+                    length = int(value)
+                elif name.lower() == b'etag' and revalidate:
+                    etags[path] = value.strip().decode()
+            await reader.readexactly(length)
+            if status not in (200, 304):
+                errors.append(status)
+            latencies.append(time.perf_counter() - start)
+            if b'connection: close' in head.lower():
+                writer.close()
+                reader, writer = await asyncio.open_connection(
+                    '127.0.0.1', port
+                )
+    except (OSError, asyncio.IncompleteReadError) as error:
+        errors.append(type(error).__name__)
+    finally:
+        writer.close()
+
+
+async def load(port, args, paths, cookie):
+    latencies, errors = [], []
+    deadline = time.monotonic() + args.duration
+    authenticated = int(args.connections * args.auth_share)
+    await asyncio.gather(*(
+        worker(
+            port, paths, cookie if number < authenticated else None,
+            args.revalidate, deadline, latencies, errors
+        )
+        for number in range(args.connections)
+    ))
+    return latencies, errors
+
+
+def percentile(values, rank):
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * rank / 100 + 0.5) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--connections', type=int, default=300)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--news', type=int, default=200)
+    parser.add_argument('--comments', type=int, default=30)
+    parser.add_argument('--threads', type=int, default=32,
+                        help='Потоки gunicorn gthread.')
+    parser.add_argument('--auth-share', type=float, default=0.1,
+                        help='Доля соединений с cookie сессии.')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Повторять запросы с If-None-Match, как '
+                             'браузер.')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='NEWS_ASYNC_WORKERS для asgi-async.')
+    parser.add_argument('--modes', nargs='+', choices=MODES,
+                        default=list(MODES))
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix='load_news_'))
+    database = workdir / 'db.sqlite3'
+    django_setup.setup('ya_news', database=database)
+    django_setup.migrate()
+    news_ids, cookie = seed(args)
+    paths = ['/'] + [f'/news/{news_id}/' for news_id in news_ids]
+
+    print(f'{args.connections} соединений, {args.duration:.0f} с, '
+          f'{len(news_ids)} новостей, {args.auth_share:.0%} с сессией'
+          f'{", с If-None-Match" if args.revalidate else ""}')
+    print(f'{"режим":<12}{"запросов/с":>12}{"p50, мс":>10}'
+          f'{"p99, мс":>10}{"ошибки":>8}')
+    for mode in args.modes:
+        routes, server = MODES[mode]
+        settings_dir = workdir / mode
+        settings_dir.mkdir()
+        (settings_dir / 'load_settings.py').write_text(
+            SETTINGS.format(
+                database=str(database), routes=routes, workers=args.workers
+            )
+        )
+        os.environ['PYTHONPATH'] = os.pathsep.join(
+            (str(settings_dir), str(PROJECT_DIR))
+        )
+        os.environ['DJANGO_SETTINGS_MODULE'] = 'load_settings'
+        port = free_port()
+        process = start_server(server, port, args)
+        try:
+            # Прогрев: кеш страниц и соединения с базой.
+            asyncio.run(load(port, argparse.Namespace(
+                duration=2, connections=10, auth_share=args.auth_share,
+                revalidate=False
+            ), paths, cookie))
+            latencies, errors = asyncio.run(load(port, args, paths, cookie))
+        finally:
+            process.terminate()
+            process.wait()
+        print(f'{mode:<12}{len(latencies) / args.duration:>12.0f}'
+              f'{percentile(latencies, 50) * 1000:>10.1f}'
+              f'{percentile(latencies, 99) * 1000:>10.1f}'
+              f'{len(errors):>8}')
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Параллельный запуск тестов проекта по шардам.
+
+Запускает --workers процессов pytest с плагином pytest_shard: каждый
+выполняет свою часть тестов со своей тестовой базой. Затем печатает
+общий итог в том же виде, что pytest -vv --tb=line: строку на тест,
+строки упавших проверок и итоговую строку с числом тестов. Код выхода
+такой же, как у pytest. Запуск из корня репозитория:
+    python parallel_tests.py ya_news --workers 4
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent
+# Подписи исходов в строке теста, как у pytest -v.
+OUTCOMES = (
+    ('failed', 'FAILED'),
+    ('passed', 'PASSED'),
+    ('skipped', 'SKIPPED'),
+    ('xfailed', 'XFAIL'),
+    ('xpassed', 'XPASS'),
+    ('error', 'ERROR'),
+)
+# Порядок в итоговой строке pytest.
+SUMMARY_ORDER = (
+    'failed', 'passed', 'skipped', 'xfailed', 'xpassed', 'warning', 'error',
+)
+PLURALS = ('warning', 'error')
+NO_TESTS_COLLECTED = 5
+
+
+def run_shards(project, workers, pytest_args, directory):
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(
+            filter(None, (str(REPO_DIR), os.environ.get('PYTHONPATH')))
+        ),
+    }
+    processes = []
+    for shard in range(workers):
+        log = open(directory / f'{shard}.log', 'wb')
+        processes.append((shard, log, subprocess.Popen(
+            [
+                sys.executable, '-m', 'pytest', '-p', 'pytest_shard',
+                '--num-shards', str(workers), '--shard-id', str(shard),
+                '--shard-report', str(directory / f'{shard}.json'),
+                *pytest_args,
+            ],
+            cwd=project, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )))
+    for _, log, process in processes:
+        process.wait()
+        log.close()
+    return [(shard, process.returncode) for shard, _, process in processes]
+
+
+def line(text, fill, width):
+    return f' {text} '.center(width, fill) if text else fill * width
+
+
+def exit_status(statuses):
+    """Общий код выхода: ошибка любого шарда важнее пустых шардов."""
+    failures = [status for status in statuses if status not in (
+        pytest.ExitCode.OK, NO_TESTS_COLLECTED
+    )]
+    if failures:
+        return max(failures)
+    if all(status == NO_TESTS_COLLECTED for status in statuses):
+        return NO_TESTS_COLLECTED
+    return pytest.ExitCode.OK
+
+
+def report(reports, workers, elapsed, tb, width):
+    # Ошибка сбора модуля приходит от каждого шарда - оставляем одну.
+    tests = sorted(
+        {
+            test['nodeid']: test
+            for shard in reversed(reports) for test in shard['tests']
+        }.values(),
+        key=lambda test: test['index']
+    )
+    labels = dict(OUTCOMES)
+    print(line('test session starts', '=', width))
+    print(f'platform {sys.platform} -- Python {platform.python_version()}, '
+          f'pytest-{pytest.__version__}')
+    print(f'collected {len(tests)} items, шардов: {workers}\n')
+    for number, test in enumerate(tests, 1):
+        progress = f'[{number * 100 // len(tests):3d}%]'
+        status = f'{test["nodeid"]} {labels[test["outcome"]]}'
+        print(f'{status:<{width - len(progress) - 1}} {progress}')
+    failed = [test for test in tests if test['outcome'] in ('failed', 'error')]
+    if failed and tb != 'no':
+        print(line('FAILURES', '=', width))
+        for test in failed:
+            if tb == 'line':
+                print(test['crash'])
+            else:
+                print(line(test['nodeid'], '_', width))
+                print(test['longrepr'])
+    if failed:
+        print(line('short test summary info', '=', width))
+        for test in failed:
+            print(f'{labels[test["outcome"]]} {test["nodeid"]}')
+    counts = Counter(test['outcome'] for test in tests)
+    counts['warning'] = len(
+        set().union(*(shard['warnings'] for shard in reports))
+    )
+    parts = [
+        f'{counts[outcome]} {outcome}'
+        + ('s' if outcome in PLURALS and counts[outcome] > 1 else '')
+        for outcome in SUMMARY_ORDER if counts[outcome]
+    ]
+    summary = ', '.join(parts) or 'no tests ran'
+    print(line(f'{summary} in {elapsed:.2f}s', '=', width))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('project', type=Path,
+                        help='Каталог проекта с pytest.ini.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--tb', default='line',
+                        choices=('auto', 'long', 'short', 'line', 'no'))
+    args, pytest_args = parser.parse_known_args()
+
+    width = shutil.get_terminal_size().columns
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='parallel_tests_') as directory:
+        directory = Path(directory)
+        results = run_shards(
+            args.project, args.workers, ['--tb', args.tb, *pytest_args],
+            directory
+        )
+        elapsed = time.perf_counter() - start
+        reports = []
+        for shard, status in results:
+            path = directory / f'{shard}.json'
+            if not path.exists():
+                # Шард не дошёл до конца сессии: показываем его вывод.
+                sys.stdout.write(
+                    (directory / f'{shard}.log').read_text(errors='replace')
+                )
+                return status or pytest.ExitCode.INTERNAL_ERROR
+            reports.append(json.loads(path.read_text()))
+    report(reports, args.workers, elapsed, args.tb, width)
+    return exit_status([shard['exitstatus'] for shard in reports])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
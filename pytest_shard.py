@@ -0,0 +1,132 @@
+"""
+Плагин pytest: запуск части тестов проекта (шарда) и отчёт в JSON.
+
+Подключается через -p pytest_shard (корень репозитория в PYTHONPATH):
+    pytest -p pytest_shard --num-shards 4 --shard-id 0 --shard-report r.json
+Шард получает каждый num-shards-й тест в порядке сбора, так что
+медленные тесты из одного модуля расходятся по разным процессам. Если
+в TEST у базы задано имя файла SQLite, к нему добавляется номер шарда,
+чтобы процессы не делили тестовую базу; база в памяти и так своя у
+каждого процесса. Отчёт собирает parallel_tests.py.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('shard', 'запуск части тестов')
+    group.addoption('--num-shards', type=int, default=1,
+                    help='Число шардов.')
+    group.addoption('--shard-id', type=int, default=0,
+                    help='Номер шарда, от 0.')
+    group.addoption('--shard-report', type=Path,
+                    help='Файл для JSON-отчёта шарда.')
+
+
+def _memory_database(name):
+    return name == ':memory:' or 'mode=memory' in str(name)
+
+
+def _suffix_test_databases(shard_id):
+    from django.conf import settings
+
+    for database in settings.DATABASES.values():
+        test = database.setdefault('TEST', {})
+        name = test.get('NAME')
+        if name and not _memory_database(name):
+            test['NAME'] = f'{name}_shard{shard_id}'
+
+
+class ShardReport:
+    """Исходы тестов шарда для отчёта."""
+
+    def __init__(self, path, shard_id, num_shards):
+        self.path = path
+        self.shard_id = shard_id
+        self.num_shards = num_shards
+        self.order = {}
+        self.tests = {}
+        self.warnings = set()
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items):
+        # Номер теста в общем порядке сбора, до разбиения на шарды.
+        self.order = {
+            item.nodeid: number * self.num_shards + self.shard_id
+            for number, item in enumerate(items)
+        }
+
+    def pytest_warning_recorded(self, warning_message):
+        # Предупреждения при загрузке проекта повторяются в каждом шарде.
+        self.warnings.add(
+            f'{warning_message.filename}:{warning_message.lineno}: '
+            f'{warning_message.message}'
+        )
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self.tests[report.nodeid] = {
+                'nodeid': report.nodeid, 'index': -1, 'outcome': 'error',
+                'duration': 0.0, 'crash': report.longreprtext,
+                'longrepr': report.longreprtext,
+            }
+
+    def pytest_runtest_logreport(self, report):
+        test = self.tests.setdefault(report.nodeid, {
+            'nodeid': report.nodeid,
+            'index': self.order.get(report.nodeid, -1),
+            'outcome': 'passed', 'duration': 0.0, 'crash': '', 'longrepr': '',
+        })
+        test['duration'] += report.duration
+        if report.when == 'call' and hasattr(report, 'wasxfail'):
+            test['outcome'] = 'xpassed' if report.passed else 'xfailed'
+        elif report.skipped and test['outcome'] == 'passed':
+            test['outcome'] = 'skipped'
+        elif report.failed:
+            test['outcome'] = 'failed' if report.when == 'call' else 'error'
+            test['longrepr'] = report.longreprtext
+            # Та же строка, что печатает pytest --tb=line.
+            crash = getattr(report.longrepr, 'reprcrash', None)
+            test['crash'] = (
+                str(crash) if crash is not None else test['longrepr'][:50]
+            )
+
+    def pytest_sessionfinish(self, session, exitstatus):
+        self.path.write_text(json.dumps({
+            'shard': self.shard_id,
+            'exitstatus': int(exitstatus),
+            'warnings': sorted(self.warnings),
+            'tests': list(self.tests.values()),
+        }, ensure_ascii=False))
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    # trylast: настройки Django к этому моменту загружает pytest-django.
+    num_shards = config.getoption('num_shards')
+    shard_id = config.getoption('shard_id')
+    if not 0 <= shard_id < num_shards:
+        raise ValueError('--shard-id должен быть от 0 до --num-shards - 1')
+    if num_shards > 1:
+        _suffix_test_databases(shard_id)
+    path = config.getoption('shard_report')
+    if path is not None:
+        config.pluginmanager.register(
+            ShardReport(path, shard_id, num_shards), 'shard-report'
+        )
+
+
+def pytest_collection_modifyitems(config, items):
+    num_shards = config.getoption('num_shards')
+    if num_shards == 1:
+        return
+    shard_id = config.getoption('shard_id')
+    selected, deselected = [], []
+    for number, item in enumerate(items):
+        (selected if number % num_shards == shard_id else deselected).append(
+            item
+        )
+    config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
@@ -14,6 +14,44 @@ print_message () {
     echo -e "${left_filler_len// /$symbol}$message${right_filler_len// /$symbol}\033[0m"
 }
 
+fail_ya_news () {
+    print_message " При запуске упали ваши тесты для проекта YaNews. Проверьте тесты этого проекта " "=" 1
+    echo \`\`\` 1>&2
+    exit $1
+}
+
+fail_ya_note () {
+    print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
+    echo \`\`\` 1>&2
+    exit $1
+}
+
+run_parallel () {
+    # Run both projects at once, each split into TEST_WORKERS shards by
+    # parallel_tests.py, then print the outputs in the usual order.
+    local news_log=$(mktemp)
+    local note_log=$(mktemp)
+    trap "rm -f $news_log $note_log" EXIT
+    (
+        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings_test"}"
+        python parallel_tests.py ya_news --workers "$TEST_WORKERS" --tb=line "${db_args[@]}"
+    ) > "$news_log" 2>&1 &
+    local news_pid=$!
+    DJANGO_SETTINGS_MODULE="yanote.settings_test" \
+        python parallel_tests.py ya_note --workers "$TEST_WORKERS" --tb=line "${db_args[@]}" \
+        > "$note_log" 2>&1 &
+    local note_pid=$!
+    wait $news_pid
+    local news_status=$?
+    wait $note_pid
+    local note_status=$?
+    cat "$news_log" 1>&2
+    if [[ $news_status -ne 0 ]]; then fail_ya_news $news_status; fi
+    cat "$note_log" 1>&2
+    if [[ $note_status -ne 0 ]]; then fail_ya_note $note_status; fi
+    exit 0
+}
+
 
 if python -m flake8 --config=setup.cfg 1>&2;
 then
@@ -21,27 +59,28 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
+        # TEST_DB=reuse keeps the test databases between runs until the
+        # migrations change; TEST_DB=nomigrations builds them from models
+        # (see yacommon/testdb.py).
+        db_args=()
+        if [[ "$TEST_DB" == "reuse" ]]; then db_args=(--reuse-db); fi
+        # TEST_WORKERS=N runs the projects concurrently in N shards each.
+        if [[ "${TEST_WORKERS:-1}" -gt 1 ]]; then run_parallel; fi
         cd ya_news
-        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
-        if pytest --tb=line 1>&2;
+        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings_test"}"
+        if pytest --tb=line "${db_args[@]}" 1>&2;
         then
             cd ../ya_note
             unset DJANGO_SETTINGS_MODULE
-            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings"}"
-            if pytest --tb=line 1>&2;
+            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings_test"}"
+            if pytest --tb=line "${db_args[@]}" 1>&2;
             then
                 exit 0
             else
-                status=$?
-                print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
-                echo \`\`\` 1>&2
-                exit $status
+                fail_ya_note $?
             fi
         else
-            status=$?
-            print_message " При запуске упали ваши тесты для проекта YaNews. Проверьте тесты этого проекта " "=" 1
-            echo \`\`\` 1>&2
-            exit $status
+            fail_ya_news $?
         fi
     else
         status=$?
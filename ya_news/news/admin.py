@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Comment, News
+from .models import BadWord, Comment, News
 
 
 class CommentInline(admin.StackedInline):
@@ -10,6 +10,13 @@ class CommentInline(admin.StackedInline):
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
+    list_display = ('title', 'date', 'comment_count')
+    readonly_fields = ('comment_count',)
     inlines = [
         CommentInline,
     ]
+
+
+@admin.register(BadWord)
+class BadWordAdmin(admin.ModelAdmin):
+    search_fields = ('word',)
@@ -0,0 +1,115 @@
+"""
+Асинхронные версии главной страницы и страницы новости.
+
+Под ASGI синхронное представление занимает поток из общего пула
+sync_to_async на всё время запроса. Здесь анониму без cookie сессии
+ответ 304 и закешированная главная страница отдаются прямо в цикле
+событий, без потоков и без базы. Всё остальное - запросы к базе
+и рендер шаблона - выполняют обычные синхронные представления в
+отдельном пуле из NEWS_ASYNC_WORKERS потоков, так что цикл событий не
+блокируется, а число одновременных соединений с базой ограничено.
+
+Какие маршруты обслуживают эти представления, задаёт NEWS_ASYNC_ROUTES.
+"""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import caching, conditions
+from .views import NewsDetailView, NewsList
+
+_executor = None
+_news_list = NewsList.as_view()
+_news_detail = NewsDetailView.as_view()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.NEWS_ASYNC_WORKERS,
+            thread_name_prefix='news-async',
+        )
+    return _executor
+
+
+def _call_view(view, request, *args, **kwargs):
+    """Вызывает и рендерит синхронное представление в потоке пула."""
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        return response
+    finally:
+        # Потоки пула живут дольше запроса, а request_finished закрывает
+        # соединения только в своём потоке.
+        close_old_connections()
+
+
+async def run_view(view, request, *args, **kwargs):
+    """Выполняет синхронное представление в пуле, не блокируя цикл."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), partial(
+        context.run, _call_view, view, request, *args, **kwargs
+    ))
+
+
+def _has_session(request):
+    return settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def _from_cache(request, state, get_content=None):
+    """
+    Ответ анониму по кешу: 304 или готовая страница.
+
+    Без cookie сессии пользователь заведомо аноним, а валидаторы
+    и страница уже в кеше - база не нужна. None означает, что страницу
+    нужно строить в пуле.
+    """
+    if (state is None or _has_session(request)
+            or request.method not in ('GET', 'HEAD')):
+        return None
+    etag = quote_etag(conditions.user_etag(request, state))
+    last_modified = int(
+        conditions.anonymous_last_modified(request, state).timestamp()
+    )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        content = get_content() if get_content is not None else None
+        if content is None:
+            return None
+        response = HttpResponse(content)
+    response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers.setdefault('ETag', etag)
+    return response
+
+
+async def news_list(request, *args, **kwargs):
+    """Главная страница."""
+    response = _from_cache(
+        request, caching.get_state(),
+        partial(caching.get_home_page, count_miss=False)
+    )
+    if response is None:
+        response = await run_view(_news_list, request, *args, **kwargs)
+    return response
+
+
+async def news_detail(request, pk, *args, **kwargs):
+    """Страница новости; POST с комментарием тоже уходит в пул."""
+    response = _from_cache(request, caching.get_state(pk))
+    if response is None:
+        response = await run_view(
+            _news_detail, request, *args, pk=pk, **kwargs
+        )
+    return response
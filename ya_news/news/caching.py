@@ -0,0 +1,151 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from . import replicas
+
+HOME_PAGE_KEY = 'news:home'
+COMMENTS_BLOCK_KEY = 'news:comments:{news_id}'
+HOME_STATE_KEY = 'news:home:state'
+NEWS_STATE_KEY = 'news:state:{news_id}'
+HOME_CHANGED_KEY = 'news:home:changed'
+NEWS_CHANGED_KEY = 'news:changed:{news_id}'
+COUNTER_KEY = 'news:cache:{block}:{result}'
+BLOCKS = ('home', 'comments')
+RESULTS = ('hits', 'misses')
+
+
+def _cache():
+    return caches[settings.NEWS_CACHE_ALIAS]
+
+
+def _count(block, result):
+    key = COUNTER_KEY.format(block=block, result=result)
+    cache = _cache()
+    if cache.add(key, 1, timeout=None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Счётчик вытеснили между add и incr - начинаем заново.
+        cache.set(key, 1, timeout=None)
+
+
+def _get(block, key, count_miss=True):
+    value = _cache().get(key)
+    if value is not None or count_miss:
+        _count(block, 'misses' if value is None else 'hits')
+    return value
+
+
+def get_home_page(count_miss=True):
+    """
+    Возвращает закешированную главную страницу для анонима.
+
+    count_miss=False - для проверки, после которой промах всё равно
+    засчитает представление, которое отрисует страницу.
+    """
+    return _get('home', HOME_PAGE_KEY, count_miss)
+
+
+def _set(key, value):
+    """
+    Кладёт в кеш страниц то, что прочитано из основной базы.
+
+    Прочитанное с реплики могло отстать: в кеше оно пережило бы
+    синхронизацию реплики, ведь кеш сбрасывают только записи.
+    """
+    if not replicas.used_replica():
+        _cache().set(key, value, settings.NEWS_CACHE_TIMEOUT)
+
+
+def set_home_page(content):
+    _set(HOME_PAGE_KEY, content)
+
+
+def get_comments_block(news_id):
+    """Возвращает закешированный блок комментариев новости."""
+    return _get('comments', COMMENTS_BLOCK_KEY.format(news_id=news_id))
+
+
+def set_comments_block(news_id, content):
+    _set(COMMENTS_BLOCK_KEY.format(news_id=news_id), content)
+
+
+def get_state(news_id=None):
+    """Закешированные валидаторы главной страницы или новости."""
+    if news_id is None:
+        return _cache().get(HOME_STATE_KEY)
+    return _cache().get(NEWS_STATE_KEY.format(news_id=news_id))
+
+
+def set_state(state, news_id=None):
+    key = (
+        HOME_STATE_KEY if news_id is None
+        else NEWS_STATE_KEY.format(news_id=news_id)
+    )
+    _set(key, state)
+
+
+def get_changed_at(news_id=None):
+    """
+    Время последнего изменения главной страницы или новости.
+
+    Если отметки в кеше нет (например, после рестарта), изменением
+    считается текущий момент: так клиент в худшем случае получит
+    страницу целиком, но никогда не получит устаревший ответ 304.
+    """
+    key = (
+        HOME_CHANGED_KEY if news_id is None
+        else NEWS_CHANGED_KEY.format(news_id=news_id)
+    )
+    now = timezone.now()
+    cache = _cache()
+    if cache.add(key, now, timeout=None):
+        return now
+    return cache.get(key, now)
+
+
+def invalidate(news_id=None):
+    """
+    Сбрасывает главную страницу и блок комментариев новости.
+
+    Без news_id сбрасывается только главная страница. Ключи удаляются
+    сразу и ещё раз после коммита транзакции, чтобы параллельный запрос
+    не успел закешировать незакоммиченное состояние. Заодно обновляются
+    отметки времени изменения, из которых строятся ETag и Last-Modified.
+    """
+    keys = [HOME_PAGE_KEY, HOME_STATE_KEY]
+    changed = [HOME_CHANGED_KEY]
+    if news_id is not None:
+        keys += [
+            COMMENTS_BLOCK_KEY.format(news_id=news_id),
+            NEWS_STATE_KEY.format(news_id=news_id),
+        ]
+        changed.append(NEWS_CHANGED_KEY.format(news_id=news_id))
+
+    def drop():
+        cache = _cache()
+        cache.delete_many(keys)
+        now = timezone.now()
+        cache.set_many(dict.fromkeys(changed, now), timeout=None)
+
+    drop()
+    transaction.on_commit(drop)
+
+
+def get_stats():
+    """Счётчики попаданий и промахов по каждому кешируемому блоку."""
+    keys = {
+        (block, result): COUNTER_KEY.format(block=block, result=result)
+        for block in BLOCKS
+        for result in RESULTS
+    }
+    values = _cache().get_many(keys.values())
+    return {
+        block: {
+            result: values.get(keys[block, result], 0) for result in RESULTS
+        }
+        for block in BLOCKS
+    }
@@ -0,0 +1,101 @@
+"""
+Валидаторы для условных GET-запросов к страницам новостей.
+
+ETag и Last-Modified строятся из самых свежих News.date и Comment.created,
+счётчиков комментариев и отметки времени последнего изменения, которую
+ставят обработчики сигналов. Результат кешируется рядом с самими
+страницами и сбрасывается теми же сигналами, поэтому ответ 304 отдаётся
+без запросов к базе.
+"""
+from datetime import datetime, time
+from hashlib import md5
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from . import caching
+from .models import Comment, News
+
+
+def _last_comment():
+    return Subquery(
+        Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by('-created').values('created')[:1]
+    )
+
+
+def _build_state(rows, changed_at):
+    last_modified = changed_at
+    for news_date, _, last_comment in rows:
+        last_modified = max(
+            last_modified,
+            timezone.make_aware(datetime.combine(news_date, time.min)),
+            last_comment or last_modified,
+        )
+    fingerprint = repr((rows, changed_at.isoformat())).encode()
+    return {
+        'etag': md5(fingerprint).hexdigest(),
+        'last_modified': last_modified,
+    }
+
+
+def get_home_state():
+    state = caching.get_state()
+    if state is None:
+        rows = list(News.objects.annotate(
+            last_comment=_last_comment()
+        ).values_list(
+            'date', 'comment_count', 'last_comment'
+        )[:settings.NEWS_COUNT_ON_HOME_PAGE])
+        state = _build_state(rows, caching.get_changed_at())
+        caching.set_state(state)
+    return state
+
+
+def get_news_state(news_id):
+    state = caching.get_state(news_id)
+    if state is None:
+        rows = list(News.objects.filter(pk=news_id).annotate(
+            last_comment=_last_comment()
+        ).values_list('date', 'comment_count', 'last_comment'))
+        if not rows:
+            return None
+        state = _build_state(rows, caching.get_changed_at(news_id))
+        caching.set_state(state, news_id)
+    return state
+
+
+def user_etag(request, state):
+    if state is None:
+        return None
+    return f'{state["etag"]}-{request.user.pk or 0}'
+
+
+def anonymous_last_modified(request, state):
+    """
+    Last-Modified отдаём только анонимам.
+
+    Страница авторизованного пользователя зависит от него самого,
+    а дата изменения этого не отражает - для них достаточно ETag.
+    """
+    if state is None or request.user.is_authenticated:
+        return None
+    return state['last_modified']
+
+
+def news_list_etag(request, *args, **kwargs):
+    return user_etag(request, get_home_state())
+
+
+def news_list_last_modified(request, *args, **kwargs):
+    return anonymous_last_modified(request, get_home_state())
+
+
+def news_detail_etag(request, pk, *args, **kwargs):
+    return user_etag(request, get_news_state(pk))
+
+
+def news_detail_last_modified(request, pk, *args, **kwargs):
+    return anonymous_last_modified(request, get_news_state(pk))
@@ -2,12 +2,8 @@ from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
 from .models import Comment
+from .moderation import BAD_WORDS, get_matcher  # noqa: F401
 
-BAD_WORDS = (
-    'редиска',
-    'негодяй',
-    # Дополните список на своё усмотрение.
-)
 WARNING = 'Не ругайтесь!'
 
 
@@ -20,8 +16,6 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if get_matcher().search(text.lower()) is not None:
+            raise ValidationError(WARNING)
         return text
@@ -0,0 +1,57 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает новости или комментарии в файл JSON Lines или CSV, '
+        'читая базу пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Путь к файлу; по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--model', choices=tuple(transfer.MODELS), default='news',
+            help='Что выгружать: новости или комментарии.'
+        )
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько записей читать из базы за раз.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        path = options['path']
+        file_format = options['format'] or transfer.guess_format(path)
+        started = perf_counter()
+        rows = transfer.export_rows(options['model'], options['chunk_size'])
+        try:
+            if path == '-':
+                total = transfer.write_rows(
+                    rows, self.stdout, options['model'], file_format
+                )
+            else:
+                with open(path, 'w', encoding='utf-8', newline='') as stream:
+                    total = transfer.write_rows(
+                        rows, stream, options['model'], file_format
+                    )
+        except OSError as error:
+            raise CommandError(error)
+        elapsed = perf_counter() - started
+        # Отчёт в stderr, чтобы не смешивать его с данными в stdout.
+        self.stderr.write(
+            f'Выгружено записей: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} записей/с)',
+            style_func=self.style.SUCCESS
+        )
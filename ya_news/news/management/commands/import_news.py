@@ -0,0 +1,59 @@
+import sys
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости или комментарии из файла JSON Lines или CSV '
+        'пачками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или "-" для stdin.')
+        parser.add_argument(
+            '--model', choices=tuple(transfer.MODELS), default='news',
+            help='Что загружать: новости или комментарии.'
+        )
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько записей вставлять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        path = options['path']
+        file_format = options['format'] or transfer.guess_format(path)
+        started = perf_counter()
+
+        def report(total):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Загружено записей: {total}')
+
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        try:
+            total = transfer.import_rows(
+                transfer.read_rows(stream, file_format),
+                options['model'], options['chunk_size'], on_chunk=report
+            )
+        except (OSError, transfer.TransferError) as error:
+            raise CommandError(error)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f'Загружено записей: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} записей/с)'
+        )
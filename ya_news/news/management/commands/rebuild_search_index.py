@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from news import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс новостей и комментариев.'
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('Поиск работает только на SQLite с FTS5.')
+        search.install()
+        search.rebuild()
+        self.stdout.write('Индекс перестроен.')
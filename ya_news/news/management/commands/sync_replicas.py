@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news import replicas
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики NEWS_REPLICAS каждые '
+        'NEWS_REPLICA_SYNC_INTERVAL секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Скопировать один раз и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.NEWS_REPLICAS:
+            raise CommandError('Реплики не заданы: NEWS_REPLICAS пуст.')
+        while True:
+            started = time.monotonic()
+            for alias in settings.NEWS_REPLICAS:
+                replicas.sync(alias)
+            if options['once']:
+                self.stdout.write(
+                    f'Скопировано реплик: {len(settings.NEWS_REPLICAS)}'
+                )
+                return
+            time.sleep(max(
+                settings.NEWS_REPLICA_SYNC_INTERVAL
+                - (time.monotonic() - started), 0
+            ))
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+# Схема поиска на момент миграции: news.search может меняться дальше,
+# а миграция должна создавать то же, что и раньше.
+TOKENIZER = "tokenize='unicode61 remove_diacritics 2'"
+SCHEMA = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS news_news_fts USING fts5('
+    "title, text, content='news_news', content_rowid='id', "
+    f'{TOKENIZER})',
+    'CREATE TRIGGER IF NOT EXISTS news_news_fts_insert '
+    'AFTER INSERT ON news_news BEGIN '
+    'INSERT INTO news_news_fts(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+    'CREATE TRIGGER IF NOT EXISTS news_news_fts_delete '
+    'AFTER DELETE ON news_news BEGIN '
+    'INSERT INTO news_news_fts(news_news_fts, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    'CREATE TRIGGER IF NOT EXISTS news_news_fts_update '
+    'AFTER UPDATE OF title, text ON news_news BEGIN '
+    'INSERT INTO news_news_fts(news_news_fts, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); "
+    'INSERT INTO news_news_fts(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+    'CREATE VIRTUAL TABLE IF NOT EXISTS news_comment_fts USING fts5('
+    "text, content='news_comment', content_rowid='id', "
+    f'{TOKENIZER})',
+    'CREATE TRIGGER IF NOT EXISTS news_comment_fts_insert '
+    'AFTER INSERT ON news_comment BEGIN '
+    'INSERT INTO news_comment_fts(rowid, text) '
+    'VALUES (new.id, new.text); END',
+    'CREATE TRIGGER IF NOT EXISTS news_comment_fts_delete '
+    'AFTER DELETE ON news_comment BEGIN '
+    'INSERT INTO news_comment_fts(news_comment_fts, rowid, text) '
+    "VALUES ('delete', old.id, old.text); END",
+    'CREATE TRIGGER IF NOT EXISTS news_comment_fts_update '
+    'AFTER UPDATE OF text ON news_comment BEGIN '
+    'INSERT INTO news_comment_fts(news_comment_fts, rowid, text) '
+    "VALUES ('delete', old.id, old.text); "
+    'INSERT INTO news_comment_fts(rowid, text) '
+    'VALUES (new.id, new.text); END',
+    "INSERT INTO news_news_fts(news_news_fts) VALUES ('rebuild')",
+    "INSERT INTO news_comment_fts(news_comment_fts) VALUES ('rebuild')",
+)
+DROP_SCHEMA = (
+    'DROP TRIGGER IF EXISTS news_news_fts_insert',
+    'DROP TRIGGER IF EXISTS news_news_fts_delete',
+    'DROP TRIGGER IF EXISTS news_news_fts_update',
+    'DROP TABLE IF EXISTS news_news_fts',
+    'DROP TRIGGER IF EXISTS news_comment_fts_insert',
+    'DROP TRIGGER IF EXISTS news_comment_fts_delete',
+    'DROP TRIGGER IF EXISTS news_comment_fts_update',
+    'DROP TABLE IF EXISTS news_comment_fts',
+)
+
+
+def execute(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_badword'),
+    ]
+
+    operations = [
+        migrations.RunPython(execute(SCHEMA), execute(DROP_SCHEMA)),
+    ]
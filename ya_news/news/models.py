@@ -1,16 +1,58 @@
+from collections import defaultdict
 from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def recount_comments(self):
+        """
+        Пересчитывает счётчик комментариев одним UPDATE.
+
+        Возвращает количество обновлённых новостей.
+        """
+        comment_count = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=Count('pk')
+        ).values('count')
+        return self.update(
+            comment_count=Coalesce(Subquery(comment_count), 0)
+        )
+
+    def add_comments(self, counts):
+        """
+        Прибавляет к счётчикам число новых комментариев.
+
+        counts - {id новости: число комментариев}; один UPDATE на каждое
+        различное число.
+        """
+        by_count = defaultdict(list)
+        for news_id, count in counts.items():
+            by_count[count].append(news_id)
+        for count, ids in by_count.items():
+            self.filter(pk__in=ids).update(
+                comment_count=F('comment_count') + count
+            )
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('date',), name='news_date_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -32,6 +74,27 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'), name='comment_news_created_idx'
+            ),
+            models.Index(
+                fields=('author', 'created'),
+                name='comment_author_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+
+class BadWord(models.Model):
+    word = models.CharField('Слово', max_length=100, unique=True)
+
+    class Meta:
+        ordering = ('word',)
+        verbose_name = 'Запрещённое слово'
+        verbose_name_plural = 'Запрещённые слова'
+
+    def __str__(self):
+        return self.word
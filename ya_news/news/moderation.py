@@ -0,0 +1,130 @@
+"""
+Проверка комментариев на запрещённые слова.
+
+Все слова собираются в автомат Ахо - Корасик, который находит любое из них
+за один проход по тексту, сколько бы слов ни было в списке. Автомат
+строится один раз на процесс и пересобирается, когда меняется список:
+слова берутся из BAD_WORDS, из файла BAD_WORDS_FILE и из таблицы BadWord.
+
+Об изменении списка процессы узнают по версии в кеше NEWS_CACHE_ALIAS.
+Остальные процессы увидят новую версию, только если этот кеш общий
+(как в settings_prod); с locmem новое слово действует в других
+процессах лишь после их перезапуска.
+"""
+from collections import deque
+from threading import Lock
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+BAD_WORDS = (
+    'редиска',
+    'негодяй',
+    # Дополните список на своё усмотрение.
+)
+VERSION_KEY = 'news:bad_words:version'
+
+
+def _cache():
+    return caches[settings.NEWS_CACHE_ALIAS]
+
+
+class WordMatcher:
+    """Автомат Ахо - Корасик для поиска любого слова из набора."""
+
+    def __init__(self, words):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.output = [None]
+        for word in words:
+            if word:
+                self._add(word)
+        self._link()
+
+    def _add(self, word):
+        state = 0
+        for char in word:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            state = next_state
+        self.output[state] = word
+
+    def _link(self):
+        """Строит суффиксные ссылки обходом бора в ширину."""
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.transitions[fallback].get(
+                    char, 0
+                )
+                if self.output[next_state] is None:
+                    self.output[next_state] = self.output[
+                        self.fail[next_state]
+                    ]
+
+    def search(self, text):
+        """Возвращает первое найденное слово или None."""
+        transitions, fail, output = self.transitions, self.fail, self.output
+        state = 0
+        for char in text:
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+
+def read_words(path):
+    """Читает слова из файла: по одному в строке, # - комментарий."""
+    with open(path, encoding='utf-8') as words_file:
+        for line in words_file:
+            word = line.strip()
+            if word and not word.startswith('#'):
+                yield word
+
+
+def load_words():
+    from .models import BadWord
+
+    words = set(BAD_WORDS)
+    if settings.BAD_WORDS_FILE:
+        words.update(read_words(settings.BAD_WORDS_FILE))
+    words.update(BadWord.objects.values_list('word', flat=True))
+    return {word.lower() for word in words}
+
+
+_matcher = None
+_matcher_version = None
+_lock = Lock()
+
+
+def get_matcher():
+    """Возвращает автомат, пересобирая его после изменения списка слов."""
+    global _matcher, _matcher_version
+    version = _cache().get(VERSION_KEY)
+    if _matcher is not None and version == _matcher_version:
+        return _matcher
+    with _lock:
+        if _matcher is None or version != _matcher_version:
+            _matcher = WordMatcher(load_words())
+            _matcher_version = version
+    return _matcher
+
+
+def words_changed():
+    """Сообщает всем процессам с общим кешем о новом списке слов."""
+    global _matcher
+    _matcher = None
+    _cache().set(VERSION_KEY, uuid4().hex, timeout=None)
@@ -0,0 +1,58 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+CURSOR_SEPARATOR = '|'
+# Границы INTEGER в SQLite: больший pk база не примет в параметре.
+MIN_PK, MAX_PK = -2 ** 63, 2 ** 63 - 1
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или сформирован не нами."""
+
+
+def encode_cursor(comment):
+    """Кодирует позицию комментария в строку для URL."""
+    raw = f'{comment.created.isoformat()}{CURSOR_SEPARATOR}{comment.pk}'
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Возвращает пару (created, pk), закодированную в курсоре."""
+    try:
+        raw = urlsafe_b64decode(cursor.encode()).decode()
+        created, pk = raw.split(CURSOR_SEPARATOR)
+        created, pk = datetime.fromisoformat(created), int(pk)
+    except (BinasciiError, UnicodeError, ValueError) as error:
+        raise InvalidCursor(cursor) from error
+    # Мы кодируем только время с часовым поясом и настоящие pk.
+    if created.tzinfo is None or not MIN_PK <= pk <= MAX_PK:
+        raise InvalidCursor(cursor)
+    return created, pk
+
+
+def paginate_comments(queryset, cursor=None, per_page=None):
+    """
+    Отдаёт страницу комментариев после курсора.
+
+    Комментарии упорядочены по (created, pk), поэтому следующая
+    страница выбирается условием по ключу, а не OFFSET, и её стоимость
+    не зависит от длины обсуждения. Возвращает список комментариев
+    и курсор следующей страницы (None, если страница последняя).
+    """
+    if per_page is None:
+        per_page = settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+    queryset = queryset.order_by('created', 'pk')
+    if cursor:
+        created, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    comments = list(queryset[:per_page + 1])
+    if len(comments) <= per_page:
+        return comments, None
+    comments = comments[:per_page]
+    return comments, encode_cursor(comments[-1])
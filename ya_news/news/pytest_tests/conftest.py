@@ -1,24 +1,286 @@
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from copy import deepcopy
 from datetime import timedelta
+from urllib.parse import urlsplit
 
 import pytest
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection
 from django.test.client import Client
-from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from django.utils import timezone
+from pytest_lazyfixture import is_lazy_fixture
 
 from news.models import Comment, News
 
+# Наибольшее число SQL-запросов на один GET по имени маршрута. Сессия и
+# пользователь - это два запроса для авторизованного клиента.
+QUERY_BUDGETS = {
+    'news:home': 4,
+    'news:detail': 5,
+    'news:comments': 3,
+    'news:cache_stats': 2,
+    'news:search': 3,
+    'news:edit': 3,
+    'news:delete': 3,
+    'users:signup': 2,
+    'users:login': 2,
+    'users:logout': 4,
+}
+# Фикстуры, которые раньше создавали записи на каждый тест, а теперь
+# отдают копии общих записей из seed.
+SEEDED_FIXTURES = frozenset((
+    'author', 'user', 'news', 'author_client', 'user_client',
+))
+SEEDED_USERNAMES = ('Автор', 'Пользователь')
+SEEDED_NEWS_TITLE = 'Заголовок_новости'
+SEED = pytest.StashKey()
+
+
+class Seed:
+    """
+    Общие записи для всех тестов, создаются один раз за сессию.
+
+    Записи закоммичены до начала тестов, а обычный тест идёт внутри
+    транзакции и откатывается, так что каждый видит их нетронутыми.
+    Записи, фикстуры которых тест не запросил, удаляются в начале его
+    транзакции: тест видит в базе то же, что видел бы, если бы
+    фикстуры создавали записи сами. Транзакционный тест после себя
+    очищает базу, и следующему такому тесту записи создаются заново.
+    Объекты отдаются копиями: тест может менять их поля, не задевая
+    других.
+    """
+
+    def __init__(self):
+        # Сколько стоило создать запись каждой фикстуры и сколько тесты
+        # потратили на фикстуры общих записей - для отчёта, который
+        # печатается с переменной окружения SEED_REPORT=1.
+        self.build_time = {}
+        self.fixture_time = 0.0
+        self.usage = Counter()
+        self.tests = 0
+
+    @contextmanager
+    def timed(self, name):
+        start = time.perf_counter()
+        yield
+        self.build_time[name] = time.perf_counter() - start
+
+    def clear(self):
+        """Удаляет общие записи из базы."""
+        get_user_model().objects.filter(
+            username__in=SEEDED_USERNAMES
+        ).delete()
+        News.objects.filter(title=SEEDED_NEWS_TITLE).delete()
+
+    def build(self):
+        # С pytest --reuse-db база переживает запуск, и прерванная
+        # сессия могла не удалить свои записи.
+        self.clear()
+        user_model = get_user_model()
+        with self.timed('author'):
+            self.author = user_model.objects.create(
+                username=SEEDED_USERNAMES[0]
+            )
+        with self.timed('user'):
+            self.user = user_model.objects.create(
+                username=SEEDED_USERNAMES[1]
+            )
+        with self.timed('news'):
+            self.news = News.objects.create(
+                title=SEEDED_NEWS_TITLE,
+                text='Текст_новости',
+            )
+        self.cookies = {}
+        for name in ('author', 'user'):
+            with self.timed(f'{name}_client'):
+                client = Client()
+                client.force_login(getattr(self, name))
+                self.cookies[name] = client.cookies
+
+    def exists(self):
+        return News.objects.filter(pk=self.news.pk).exists()
+
+    def hide(self, requested):
+        """Удаляет записи, фикстуры которых не запрошены."""
+        usernames = [
+            username
+            for name, username in zip(('author', 'user'), SEEDED_USERNAMES)
+            if name not in requested
+        ]
+        # Ссылок на эти записи нет: их создали бы только фикстуры,
+        # которые зависят от спрятанных. Поэтому хватает одного DELETE
+        # без сбора связанных объектов и сигналов.
+        if usernames:
+            get_user_model().objects.filter(
+                username__in=usernames
+            )._raw_delete(DEFAULT_DB_ALIAS)
+        if 'news' not in requested:
+            News.objects.filter(
+                title=SEEDED_NEWS_TITLE
+            )._raw_delete(DEFAULT_DB_ALIAS)
+
+    def client(self, name):
+        """Клиент с сессией пользователя name без нового входа."""
+        client = Client()
+        client.cookies = deepcopy(self.cookies[name])
+        return client
+
+    def report(self):
+        """Строки отчёта: во сколько обошлись бы записи на каждый тест."""
+        per_test = sum(
+            self.build_time[name] * count
+            for name, count in self.usage.items()
+        )
+        seed_time = sum(self.build_time.values())
+        saved = per_test - self.fixture_time - seed_time
+        lines = [
+            f'тестов с общими записями: {self.tests}',
+            f'создание записей один раз: {seed_time * 1000:.1f} мс',
+            f'фикстуры в тестах: {self.fixture_time * 1000:.1f} мс',
+            f'создание на каждый тест заняло бы: {per_test * 1000:.1f} мс',
+        ]
+        if self.tests:
+            lines.append(
+                f'экономия: {saved * 1000:.1f} мс, '
+                f'{saved / self.tests * 1000:.2f} мс на тест'
+            )
+        return lines
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    start = time.perf_counter()
+    yield
+    seed = request.config.stash.get(SEED, None)
+    if seed is not None and fixturedef.argname in SEEDED_FIXTURES:
+        seed.fixture_time += time.perf_counter() - start
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    seed = config.stash.get(SEED, None)
+    if seed is None or not os.environ.get('SEED_REPORT'):
+        return
+    terminalreporter.section('общие записи фикстур')
+    for line in seed.report():
+        terminalreporter.write_line(line)
+
+
+def is_transactional(request):
+    marker = request.node.get_closest_marker('django_db')
+    return (
+        marker is not None and marker.kwargs.get('transaction', False)
+        or 'transactional_db' in request.fixturenames
+    )
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker, pytestconfig):
+    """
+    Фикстура один раз за сессию создаёт общие записи.
+
+    Записи создаются сразу за тестовой базой, до транзакции первого
+    теста: иначе их откатил бы первый же тест.
+    """
+    seed = Seed()
+    with django_db_blocker.unblock():
+        seed.build()
+    pytestconfig.stash[SEED] = seed
+    yield
+    with django_db_blocker.unblock():
+        seed.clear()
+
+
+@pytest.fixture(scope='session')
+def seed_data(django_db_setup, pytestconfig):
+    """Фикстура общих записей, созданных для сессии."""
+    return pytestconfig.stash[SEED]
+
+
+@pytest.fixture
+def seed(seed_data, db, request):
+    """Фикстура общих записей для теста."""
+    if is_transactional(request) and not seed_data.exists():
+        # Предыдущий транзакционный тест очистил базу.
+        seed_data.build()
+    return seed_data
+
+
+@pytest.fixture(autouse=True)
+def hide_seed(request):
+    """Фикстура прячет от теста с базой незапрошенные общие записи."""
+    if (
+        request.node.get_closest_marker('django_db') is None
+        and not {'db', 'transactional_db'} & set(request.fixturenames)
+    ):
+        return
+    # Фикстуры из lazy_fixture попадают в fixturenames, только когда
+    # созданы.
+    callspec = getattr(request.node, 'callspec', None)
+    for value in callspec.params.values() if callspec else ():
+        if is_lazy_fixture(value):
+            request.getfixturevalue(value.name)
+    requested = SEEDED_FIXTURES & set(request.fixturenames)
+    # seed заново создаёт записи после транзакционного теста, поэтому
+    # прятать можно только после неё.
+    seed_data = request.getfixturevalue('seed' if requested else 'seed_data')
+    start = time.perf_counter()
+    seed_data.hide(requested)
+    seed_data.fixture_time += time.perf_counter() - start
+    if requested:
+        seed_data.tests += 1
+        seed_data.usage.update(requested)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Фикстура очищает кеш страниц перед каждым тестом."""
+    cache.clear()
+
+
+@pytest.fixture
+def assert_query_budget():
+    """
+    Фикстура проверяет, что запрос к адресу укладывается в бюджет.
+
+    Бюджет берётся из QUERY_BUDGETS по имени маршрута; при превышении
+    тест падает со списком выполненных запросов.
+    """
+    @contextmanager
+    def check(url):
+        view_name = resolve(urlsplit(url).path).view_name
+        budget = QUERY_BUDGETS[view_name]
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        if len(context) > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(context.captured_queries, 1)
+            )
+            pytest.fail(
+                f'{view_name}: {len(context)} SQL-запросов при бюджете '
+                f'{budget}:\n{queries}'
+            )
+
+    return check
+
 
 @pytest.fixture
-def author(django_user_model):
-    """Фикстура для создания автора."""
-    return django_user_model.objects.create(username='Автор')
+def author(seed):
+    """Фикстура автора из общих записей."""
+    return deepcopy(seed.author)
 
 
 @pytest.fixture
-def user(django_user_model):
-    """Фикстура для создания пользователя."""
-    return django_user_model.objects.create(username='Пользователь')
+def user(seed):
+    """Фикстура пользователя из общих записей."""
+    return deepcopy(seed.user)
 
 
 @pytest.fixture
@@ -33,6 +295,24 @@ def url_news_detail(news):
     return reverse('news:detail', args=(news.id,))
 
 
+@pytest.fixture
+def url_news_comments(news):
+    """Фикстура фрагмента со следующей страницей комментариев."""
+    return reverse('news:comments', args=(news.id,))
+
+
+@pytest.fixture
+def url_news_search():
+    """Фикстура страницы поиска."""
+    return reverse('news:search')
+
+
+@pytest.fixture
+def url_cache_stats():
+    """Фикстура страницы со счётчиками кеша."""
+    return reverse('news:cache_stats')
+
+
 @pytest.fixture
 def url_users_signup():
     """Фикстура страницы регистрации."""
@@ -64,29 +344,21 @@ def url_comment_edit(comment):
 
 
 @pytest.fixture
-def author_client(author):
-    """Фикстура для создания клиента с автором."""
-    client = Client()
-    client.force_login(author)
-    return client
+def author_client(seed, author):
+    """Фикстура клиента, вошедшего как автор."""
+    return seed.client('author')
 
 
 @pytest.fixture
-def user_client(user):
-    """Фикстура для создания клиента с пользователя не автор."""
-    client = Client()
-    client.force_login(user)
-    return client
+def user_client(seed, user):
+    """Фикстура клиента, вошедшего как пользователь не автор."""
+    return seed.client('user')
 
 
 @pytest.fixture
-def news():
-    """Фикстура для создания новости."""
-    news = News.objects.create(
-        title='Заголовок_новости',
-        text='Текст_новости',
-    )
-    return news
+def news(seed):
+    """Фикстура новости из общих записей."""
+    return deepcopy(seed.news)
 
 
 @pytest.fixture
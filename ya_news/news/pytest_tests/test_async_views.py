@@ -0,0 +1,102 @@
+import importlib
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.urls import clear_url_caches, resolve
+
+import news.urls
+import yanews.urls
+from news import async_views
+from news.models import Comment
+
+# Пул обращается к базе из своих потоков, поэтому данные тестов должны
+# быть закоммичены.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def reload_urls():
+    importlib.reload(news.urls)
+    importlib.reload(yanews.urls)
+    clear_url_caches()
+
+
+@pytest.fixture(autouse=True)
+def async_routes():
+    """Фикстура переключает home и detail на асинхронные представления."""
+    with override_settings(NEWS_ASYNC_ROUTES=('home', 'detail')):
+        reload_urls()
+        yield
+    reload_urls()
+
+
+@pytest.fixture
+def forbid_pool(monkeypatch):
+    """Фикстура возвращает функцию, после вызова которой пул запрещён."""
+    async def fail(*args, **kwargs):
+        pytest.fail('Запрос ушёл в пул потоков.')
+
+    def forbid():
+        monkeypatch.setattr(async_views, 'run_view', fail)
+
+    return forbid
+
+
+def test_routes_are_async(url_news_home, url_news_detail):
+    assert resolve(url_news_home).func is async_views.news_list
+    assert resolve(url_news_detail).func is async_views.news_detail
+
+
+def test_views_run_in_bounded_pool(settings):
+    """Проверить, что представления выполняются в потоках пула."""
+    def view(request):
+        return threading.current_thread().name
+
+    name = async_to_sync(async_views.run_view)(view, None)
+    assert name.startswith('news-async')
+    assert async_views.get_executor()._max_workers == (
+        settings.NEWS_ASYNC_WORKERS
+    )
+
+
+def test_home_page_from_cache_without_pool(
+        news_for_main_page, client, url_news_home, forbid_pool):
+    """Проверить, что анониму закешированная страница отдаётся из цикла."""
+    rendered = client.get(url_news_home)
+    assert rendered.status_code == HTTPStatus.OK
+    assert len(rendered.context['object_list']) == 10
+    forbid_pool()
+    cached = client.get(url_news_home)
+    assert cached.content == rendered.content
+    assert cached['ETag'] == rendered['ETag']
+    response = client.get(url_news_home, HTTP_IF_NONE_MATCH=rendered['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_detail_not_modified_without_pool(
+        comment, client, url_news_detail, forbid_pool):
+    """Проверить, что 304 по странице новости отдаётся из цикла."""
+    response = client.get(url_news_detail)
+    assert response.status_code == HTTPStatus.OK
+    assert comment.text in response.content.decode()
+    forbid_pool()
+    response = client.get(url_news_detail, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_missing_news(client, url_news_home):
+    response = client.get(url_news_home + 'news/0/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_author_comments_through_async_route(
+        author_client, news, url_news_detail):
+    """Проверить, что авторизованный пользователь видит форму и пишет."""
+    response = author_client.get(url_news_detail)
+    assert 'form' in response.context
+    response = author_client.post(url_news_detail, data={'text': 'Отзыв'})
+    assert response.status_code == HTTPStatus.FOUND
+    news.refresh_from_db()
+    assert news.comment_count == Comment.objects.count() == 1
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from yacommon.auth import CachedModelBackend
+from yanews import settings_prod
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def cached_auth(settings):
+    """Фикстура включает сессии и пользователя из кеша, как в боевом."""
+    settings.SESSION_ENGINE = settings_prod.SESSION_ENGINE
+    settings.AUTHENTICATION_BACKENDS = settings_prod.AUTHENTICATION_BACKENDS
+
+
+@pytest.fixture
+def cached_client(cached_auth, author):
+    client = Client()
+    client.force_login(author)
+    return client
+
+
+def tables(context):
+    """Таблицы, из которых читают запросы (без JOIN)."""
+    return {
+        query['sql'].split(' FROM ')[1].split()[0].strip('"')
+        for query in context.captured_queries
+        if ' FROM ' in query['sql']
+    }
+
+
+def test_cache_hit_skips_session_and_user(cached_client, url_news_detail):
+    """Проверить, что при попадании в кеш нет запросов сессии и автора."""
+    cached_client.get(url_news_detail)
+    with CaptureQueriesContext(connection) as context:
+        response = cached_client.get(url_news_detail)
+    assert response.context['user'].is_authenticated
+    assert tables(context).isdisjoint({'django_session', 'auth_user'})
+
+
+def test_user_save_invalidates_cache(cached_auth, author):
+    """Проверить, что сохранение пользователя сбрасывает кеш."""
+    backend = CachedModelBackend()
+    backend.get_user(author.pk)
+    author.first_name = 'Новое имя'
+    author.save()
+    assert backend.get_user(author.pk).first_name == 'Новое имя'
+
+
+def test_deleted_user_is_not_served(cached_auth, author):
+    backend = CachedModelBackend()
+    backend.get_user(author.pk)
+    pk = author.pk
+    author.delete()
+    assert backend.get_user(pk) is None
+
+
+def test_prod_shares_session_and_user_cache():
+    """Проверить, что в боевом профиле кеш сессий и пользователей общий."""
+    for alias in (
+        settings_prod.SESSION_CACHE_ALIAS, settings_prod.AUTH_USER_CACHE_ALIAS
+    ):
+        assert 'locmem' not in settings_prod.CACHES[alias]['BACKEND']
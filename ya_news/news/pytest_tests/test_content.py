@@ -1,8 +1,13 @@
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+
 import pytest
 from django.conf import settings
 
+from news import caching
 from news.forms import CommentForm
-from news.models import News
+from news.models import Comment, News
+from yanews import settings_prod
 
 pytestmark = pytest.mark.django_db
 
@@ -10,11 +15,104 @@ ANONYMOUS_CLIENT = pytest.lazy_fixture('client')
 AUTHOR_CLIENT = pytest.lazy_fixture('author_client')
 
 
+def encode_raw_cursor(raw):
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
 def test_ten_news_on_main_page(news_for_main_page, client, url_news_home):
     """Проверить, что на главной странице выводится десять новостей."""
     assert News.objects.count() == settings.NEWS_COUNT_ON_HOME_PAGE + 1
 
 
+def test_main_page_single_query(
+        news_for_main_page, comment, client, url_news_home,
+        django_assert_num_queries):
+    """
+    Проверить, что главная страница строится одним запросом
+    (плюс запрос валидаторов ETag/Last-Modified при пустом кеше).
+    """
+    with django_assert_num_queries(2):
+        client.get(url_news_home)
+
+
+def test_main_page_cached_for_anonymous(
+        news_for_main_page, client, url_news_home,
+        django_assert_num_queries):
+    """Проверить, что повторный запрос анонима отдаётся из кеша."""
+    first = client.get(url_news_home)
+    with django_assert_num_queries(0):
+        second = client.get(url_news_home)
+    assert second.content == first.content
+    assert caching.get_stats()['home'] == {'hits': 1, 'misses': 1}
+
+
+def test_cache_invalidated_by_new_comment(
+        client, user_client, news, url_news_home, url_news_detail):
+    """
+    Проверить, что новый комментарий сбрасывает кеш главной
+    страницы и блока комментариев.
+    """
+    client.get(url_news_home)
+    client.get(url_news_detail)
+    user_client.post(url_news_detail, data={'text': 'Свежий комментарий'})
+    assert 'Комментариев: 1' in client.get(url_news_home).content.decode()
+    response = client.get(url_news_detail)
+    assert 'Свежий комментарий' in response.content.decode()
+
+
+def test_cache_stats(client, settings, url_news_home, url_cache_stats):
+    """Проверить, что счётчики кеша отдаются в формате Prometheus."""
+    settings.NEWS_CACHE_STATS_IPS = ('127.0.0.1',)
+    client.get(url_news_home)
+    client.get(url_news_home)
+    content = client.get(url_cache_stats).content.decode()
+    assert 'news_cache_hits_total{block="home"} 1' in content
+    assert 'news_cache_misses_total{block="home"} 1' in content
+
+
+def test_prod_page_cache_is_shared():
+    """Проверить, что в боевом профиле кеш страниц общий для процессов."""
+    alias = settings_prod.NEWS_CACHE_ALIAS
+    assert 'locmem' not in settings_prod.CACHES[alias]['BACKEND']
+
+
+def test_cache_stats_for_staff(admin_client, url_cache_stats):
+    """Проверить, что сотрудник видит счётчики кеша с любого адреса."""
+    response = admin_client.get(url_cache_stats)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_conditional_get_main_page(
+        news_for_main_page, client, user_client, url_news_home,
+        django_assert_num_queries):
+    """
+    Проверить, что главная страница отдаёт валидаторы
+    и отвечает 304 без запросов к базе.
+    """
+    response = client.get(url_news_home)
+    etag = response['ETag']
+    with django_assert_num_queries(0):
+        response = client.get(url_news_home, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(
+        url_news_home, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = user_client.get(url_news_home, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert not response.has_header('Last-Modified')
+
+
+def test_conditional_get_detail_changes_on_edit(
+        author_client, client, comment, url_news_detail, url_comment_edit):
+    """Проверить, что правка комментария меняет ETag новости."""
+    etag = client.get(url_news_detail)['ETag']
+    author_client.post(url_comment_edit, data={'text': 'Исправленный текст'})
+    response = client.get(url_news_detail, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
 def test_sort_news(news_for_main_page, client, url_news_home):
     """
     Проверить, что новости должны быть
@@ -43,6 +141,44 @@ def test_sort_comment(client, author, news,
     assert all_dates == sorted_dates
 
 
+def test_comments_keyset_pagination(
+        client, author, news, url_news_detail, url_news_comments, settings):
+    """
+    Проверить, что комментарии отдаются страницами по курсору
+    без пропусков и повторов.
+    """
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 2
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(5)
+    )
+    response = client.get(url_news_detail)
+    seen = [comment.pk for comment in response.context['comments']]
+    cursor = response.context['next_cursor']
+    while cursor:
+        response = client.get(url_news_comments, {'cursor': cursor})
+        seen += [comment.pk for comment in response.context['comments']]
+        cursor = response.context['next_cursor']
+    expected = list(
+        Comment.objects.order_by('created', 'pk').values_list('pk', flat=True)
+    )
+    assert seen == expected
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    (
+        'мусор',
+        encode_raw_cursor('2020-01-01T00:00:00+00:00|' + '9' * 30),
+        encode_raw_cursor('2020-01-01T00:00:00|1'),
+    ),
+)
+def test_comments_invalid_cursor(client, url_news_comments, cursor):
+    """Проверить, что неверный курсор приводит к 404."""
+    response = client.get(url_news_comments, {'cursor': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.parametrize(
     'parametrized_client, expected_status, form',
     ((ANONYMOUS_CLIENT, False, None),
@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from yacommon.backends.sqlite3.base import DatabaseWrapper as ImmediateWrapper
+from yanews import settings_prod
+
+
+@pytest.fixture
+def file_connection(tmp_path, django_db_blocker):
+    """Фикстура возвращает новое соединение с файловой базой SQLite."""
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')},
+        alias='pragmas',
+    )
+    with django_db_blocker.unblock():
+        yield wrapper
+        wrapper.close()
+
+
+def pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def test_prod_pragmas_applied(settings, file_connection):
+    """Проверить, что PRAGMA профиля применяются к новому соединению."""
+    settings.SQLITE_PRAGMAS = settings_prod.SQLITE_PRAGMAS
+    assert pragma(file_connection, 'journal_mode') == 'wal'
+    assert pragma(file_connection, 'busy_timeout') == 20000
+    assert pragma(file_connection, 'synchronous') == 1
+    assert pragma(file_connection, 'cache_size') == -64 * 1024
+
+
+def test_default_profile_keeps_sqlite_defaults(file_connection):
+    assert pragma(file_connection, 'journal_mode') == 'delete'
+
+
+def test_immediate_backend_locks_on_begin(tmp_path, django_db_blocker):
+    """Проверить, что транзакция сразу берёт блокировку записи."""
+    name = str(tmp_path / 'db.sqlite3')
+    wrapper = ImmediateWrapper(
+        {**connection.settings_dict, 'NAME': name}, alias='immediate'
+    )
+    other = sqlite3.connect(name, timeout=0)
+    with django_db_blocker.unblock():
+        wrapper._start_transaction_under_autocommit()
+        try:
+            with pytest.raises(sqlite3.OperationalError, match='locked'):
+                other.execute('BEGIN IMMEDIATE')
+        finally:
+            other.close()
+            wrapper.close()
+
+
+def test_prod_profile_keeps_connections():
+    database = settings_prod.DATABASES['default']
+    assert database['ENGINE'] == 'yacommon.backends.sqlite3'
+    assert database['CONN_MAX_AGE'] > 0
+    assert database['OPTIONS']['timeout'] > 0
@@ -1,11 +1,16 @@
 import random
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
+from news import moderation
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import BadWord, Comment, News
 
 
 pytestmark = pytest.mark.django_db
@@ -24,6 +29,62 @@ def test_create_comment_with_bad_words(user_client, news, url_news_detail):
     assertFormError(response, form='form', field='text', errors=WARNING)
 
 
+def test_bad_words_from_table(user_client, news, url_news_detail):
+    """Проверить, что слова из таблицы BadWord тоже запрещены."""
+    BadWord.objects.create(word='Бяка')
+    response = user_client.post(url_news_detail, data={'text': 'Ты бяка!'})
+    assert not Comment.objects.exists()
+    assertFormError(response, form='form', field='text', errors=WARNING)
+
+
+def test_bad_words_from_file(
+        user_client, news, url_news_detail, settings, tmp_path):
+    """Проверить, что слова из файла BAD_WORDS_FILE тоже запрещены."""
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# модерация\nзлодей\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = words_file
+    moderation.words_changed()
+    response = user_client.post(url_news_detail, data={'text': 'Злодей!'})
+    assert not Comment.objects.exists()
+    assertFormError(response, form='form', field='text', errors=WARNING)
+
+
+def test_bad_word_reaches_other_process(settings, tmp_path, monkeypatch):
+    """
+    Проверить, что слово, добавленное в другом процессе, действует и
+    здесь, если кеш общий.
+    """
+    settings.CACHES = {
+        **settings.CACHES,
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': tmp_path,
+        },
+    }
+    settings.NEWS_CACHE_ALIAS = 'shared'
+    matcher = moderation.get_matcher()
+    version = moderation._matcher_version
+    assert matcher.search('злодей') is None
+    # Другой процесс: свой экземпляр кеша над теми же файлами.
+    other = FileBasedCache(tmp_path, {})
+    with monkeypatch.context() as patch:
+        patch.setattr(moderation, '_cache', lambda: other)
+        BadWord.objects.create(word='злодей')
+    # Автомат этого процесса другой процесс не трогал.
+    monkeypatch.setattr(moderation, '_matcher', matcher)
+    monkeypatch.setattr(moderation, '_matcher_version', version)
+    assert moderation.get_matcher().search('злодей') == 'злодей'
+
+
+def test_word_matcher_finds_overlapping_words():
+    """Проверить, что автомат находит слова, вложенные друг в друга."""
+    matcher = moderation.WordMatcher(('he', 'she', 'hers', 'his'))
+    assert matcher.search('ushers') == 'she'
+    assert matcher.search('this') == 'his'
+    assert matcher.search('hi there') == 'he'
+    assert matcher.search('hi') is None
+
+
 def test_author_can_edit_comment(author_client, comment,
                                  url_comment_edit, url_news_detail,
                                  author, news):
@@ -107,3 +168,25 @@ def test_authorized_can_leave_comments(
     assert new_comment.text == form_data['text']
     assert new_comment.author == user
     assert new_comment.news == news
+
+
+def test_comment_count_follows_comments(user_client, news, url_news_detail):
+    """
+    Проверить, что счётчик комментариев новости
+    меняется при создании и удалении комментария.
+    """
+    user_client.post(url_news_detail, data=FORM_DATA)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    comment = Comment.objects.get(news=news)
+    user_client.post(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_recount_comments_command(news, comments_for_same_news):
+    """Проверить, что команда пересчитывает счётчики комментариев."""
+    News.objects.update(comment_count=0)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == 2
@@ -0,0 +1,85 @@
+import json
+import time
+from io import StringIO
+from itertools import count
+
+import pytest
+from django.core.management import call_command
+from django.template import engines
+from django.test.client import Client
+
+from yacommon import middleware
+from yacommon.middleware import recorder
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def metrics_client(settings, tmp_path):
+    """Фикстура клиента с включёнными замерами запросов."""
+    settings.REQUEST_METRICS_ENABLED = True
+    settings.REQUEST_METRICS_DIR = tmp_path
+    recorder.clear()
+    yield Client()
+    recorder.clear()
+
+
+def test_server_timing_header(metrics_client, news, url_news_detail):
+    """Проверить, что ответ содержит заголовок Server-Timing."""
+    response = metrics_client.get(url_news_detail)
+    timings = response['Server-Timing']
+    for name in ('db;dur=', 'tpl;dur=', 'total;dur='):
+        assert name in timings
+    assert 'queries"' in timings
+
+
+def test_no_server_timing_when_disabled(client, news, url_news_detail):
+    """Проверить, что выключенные замеры не добавляют заголовок."""
+    response = client.get(url_news_detail)
+    assert not response.has_header('Server-Timing')
+
+
+def test_request_metrics_command(metrics_client, news, url_news_detail):
+    """Проверить, что команда собирает перцентили по представлениям."""
+    for _ in range(3):
+        metrics_client.get(url_news_detail)
+    recorder.flush()
+    stdout = StringIO()
+    call_command('request_metrics', '--json', stdout=stdout)
+    report = json.loads(stdout.getvalue())
+    assert report['news:detail']['requests'] == 3
+    assert report['news:detail']['queries_p50'] >= 1
+
+
+def test_metrics_written_in_background(
+        metrics_client, settings, tmp_path, news, url_news_detail):
+    """Проверить, что замеры пишет фоновый поток, а не запрос."""
+    settings.REQUEST_METRICS_FLUSH_INTERVAL = 60
+    recorder.thread = None
+    metrics_client.get(url_news_detail)
+    assert not list(tmp_path.glob('*.json'))
+    settings.REQUEST_METRICS_FLUSH_INTERVAL = 0.01
+    recorder.thread = None
+    metrics_client.get(url_news_detail)
+    deadline = time.monotonic() + 5
+    while not list(tmp_path.glob('*.json')) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert list(tmp_path.glob('*.json'))
+
+
+def test_nested_templates_counted_once(monkeypatch):
+    """Проверить, что вложенный шаблон входит во время внешнего один раз."""
+    middleware.instrument_templates()
+    # Каждое обращение к часам - ровно секунда.
+    monkeypatch.setattr(middleware, 'perf_counter', count().__next__)
+    engine = engines['django']
+    inner = engine.from_string('{{ value }}')
+    outer = engine.from_string('[{% include inner %}]')
+    stats = {'template': 0.0, 'rendering': False}
+    token = middleware.current_stats.set(stats)
+    try:
+        assert outer.render({'inner': inner, 'value': 1}) == '[1]'
+        assert inner.render({'value': 2}) == '2'
+    finally:
+        middleware.current_stats.reset(token)
+    assert stats == {'template': 2, 'rendering': False}
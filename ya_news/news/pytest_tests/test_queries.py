@@ -0,0 +1,75 @@
+import pytest
+from pytest_django.asserts import assertRedirects
+
+from news import moderation
+from news.models import Comment
+
+pytestmark = pytest.mark.django_db
+
+FORM_DATA = {'text': 'Новый_текст_комментария'}
+# Внутри теста transaction.atomic добавляет SAVEPOINT и RELEASE SAVEPOINT.
+SAVEPOINT_QUERIES = 2
+
+
+@pytest.fixture(autouse=True)
+def bad_word_matcher():
+    """Фикстура заранее собирает автомат запрещённых слов."""
+    return moderation.get_matcher()
+
+
+def test_create_comment_queries(
+        user_client, news, url_news_detail, django_assert_num_queries):
+    """
+    Проверить, что создание комментария - это сессия, пользователь,
+    одно чтение новости и запись комментария со счётчиком.
+    """
+    with django_assert_num_queries(5 + SAVEPOINT_QUERIES):
+        response = user_client.post(url_news_detail, data=FORM_DATA)
+    assertRedirects(
+        response, f'{url_news_detail}#comments', fetch_redirect_response=False
+    )
+
+
+def test_edit_comment_queries(
+        author_client, comment, url_comment_edit, url_news_detail,
+        django_assert_num_queries):
+    """
+    Проверить, что правка комментария - это сессия, пользователь,
+    одно чтение и одна запись.
+    """
+    with django_assert_num_queries(4):
+        response = author_client.post(url_comment_edit, data=FORM_DATA)
+    assertRedirects(
+        response, f'{url_news_detail}#comments', fetch_redirect_response=False
+    )
+    assert Comment.objects.get(pk=comment.pk).text == FORM_DATA['text']
+
+
+def test_delete_comment_queries(
+        author_client, comment, url_comment_delete, url_news_detail,
+        django_assert_num_queries):
+    """
+    Проверить, что удаление комментария - это сессия, пользователь,
+    одно чтение и удаление со счётчиком.
+    """
+    with django_assert_num_queries(5 + SAVEPOINT_QUERIES):
+        response = author_client.post(url_comment_delete)
+    assertRedirects(
+        response, f'{url_news_detail}#comments', fetch_redirect_response=False
+    )
+
+
+@pytest.mark.parametrize(
+    'url', (
+        pytest.lazy_fixture('url_comment_edit'),
+        pytest.lazy_fixture('url_comment_delete'),
+    )
+)
+def test_comment_form_pages_queries(
+        author_client, url, django_assert_num_queries):
+    """
+    Проверить, что страницы правки и удаления читают
+    комментарий вместе с новостью одним запросом.
+    """
+    with django_assert_num_queries(3):
+        author_client.get(url)
@@ -0,0 +1,46 @@
+import pytest
+from django.db import connection
+from pytest_lazyfixture import lazy_fixture
+
+from yacommon.plans import bad_plans
+
+pytestmark = pytest.mark.django_db
+
+URLS = (
+    lazy_fixture('url_news_home'),
+    lazy_fixture('url_news_detail'),
+    lazy_fixture('url_news_comments'),
+    lazy_fixture('url_users_signup'),
+    lazy_fixture('url_users_login'),
+    lazy_fixture('url_users_logout'),
+    lazy_fixture('url_comment_delete'),
+    lazy_fixture('url_comment_edit'),
+)
+CLIENTS = (lazy_fixture('client'), lazy_fixture('author_client'))
+
+
+def collect_selects(client, url):
+    queries = []
+
+    def capture(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        client.get(url)
+    return queries
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Планы запросов SQLite.'
+)
+@pytest.mark.parametrize('parametrized_client', CLIENTS)
+@pytest.mark.parametrize('url', URLS)
+def test_view_queries_use_indexes(url, parametrized_client, comment):
+    """
+    Проверить, что ни один запрос страниц не читает таблицу
+    целиком и не сортирует во временном B-дереве.
+    """
+    plans = bad_plans(collect_selects(parametrized_client, url))
+    assert not plans, '\n\n'.join(plans)
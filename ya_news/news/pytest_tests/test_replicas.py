@@ -0,0 +1,139 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from news import caching, replicas
+
+# Реплика в тестах - отдельное соединение с той же базой (TEST MIRROR),
+# и данные теста должны быть закоммичены, чтобы оно их видело.
+pytestmark = pytest.mark.django_db(
+    transaction=True, databases=['default', 'replica']
+)
+FORM_DATA = {'text': 'Комментарий с основной базы'}
+
+
+@pytest.fixture
+def replica(settings, monkeypatch):
+    """Фикстура включает реплику, которая не отстаёт."""
+    settings.NEWS_REPLICAS = ('replica',)
+    monkeypatch.setattr(replicas, 'lag', lambda alias: 0.0)
+
+
+@pytest.fixture
+def count_queries():
+    """Фикстура считает запросы к основной базе и к реплике."""
+    def count(send):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = send()
+        return response, len(primary), len(replica)
+
+    return count
+
+
+def test_pages_read_from_replica(replica, count_queries, user_client,
+                                 url_news_home, url_news_detail):
+    """Проверить, что главная и страница новости читают реплику."""
+    for url in (url_news_home, url_news_detail):
+        response, primary, read = count_queries(lambda: user_client.get(url))
+        assert response.status_code == HTTPStatus.OK
+        assert primary == 0
+        assert read > 0
+
+
+def test_without_replicas_reads_primary(count_queries, user_client,
+                                        url_news_detail):
+    _, primary, read = count_queries(lambda: user_client.get(url_news_detail))
+    assert primary > 0
+    assert read == 0
+
+
+def test_stale_replica_skipped(replica, settings, monkeypatch, count_queries,
+                               user_client, url_news_detail):
+    """Проверить, что отставшая реплика не используется."""
+    monkeypatch.setattr(
+        replicas, 'lag', lambda alias: settings.NEWS_REPLICA_LAG + 1
+    )
+    _, primary, read = count_queries(lambda: user_client.get(url_news_detail))
+    assert primary > 0
+    assert read == 0
+
+
+def test_comment_pins_author_to_primary(replica, settings, count_queries,
+                                        user_client, client, url_news_detail):
+    """Проверить, что после комментария автор читает основную базу."""
+    response = user_client.post(url_news_detail, data=FORM_DATA)
+    assert settings.NEWS_REPLICA_PIN_COOKIE in response.cookies
+    response, primary, read = count_queries(
+        lambda: user_client.get(url_news_detail)
+    )
+    assert FORM_DATA['text'] in response.content.decode()
+    assert primary > 0
+    assert read == 0
+    _, primary, read = count_queries(lambda: client.get(url_news_detail))
+    assert read > 0
+
+
+def test_pin_expires(replica, settings, count_queries, user_client,
+                     url_news_detail):
+    user_client.cookies[settings.NEWS_REPLICA_PIN_COOKIE] = '0'
+    _, primary, read = count_queries(lambda: user_client.get(url_news_detail))
+    assert primary == 0
+    assert read > 0
+
+
+def test_admin_changelist_reads_replica(replica, count_queries, client):
+    """Проверить, что список новостей в админке читает реплику."""
+    admin = get_user_model().objects.create_superuser('Админ', '', 'пароль')
+    client.force_login(admin)
+    url = reverse('admin:news_news_changelist')
+    response, primary, read = count_queries(lambda: client.get(url))
+    assert response.status_code == HTTPStatus.OK
+    assert primary == 0
+    assert read > 0
+    _, primary, read = count_queries(
+        lambda: client.get(reverse('admin:news_news_add'))
+    )
+    assert read == 0
+
+
+@pytest.mark.parametrize('use_replica', (True, False))
+def test_replica_pages_not_cached(request, use_replica, client, news,
+                                  url_news_home, url_news_detail):
+    """Проверить, что прочитанное с реплики не попадает в кеш страниц."""
+    if use_replica:
+        request.getfixturevalue('replica')
+    client.get(url_news_home)
+    client.get(url_news_detail)
+    cached = (
+        caching.get_home_page(count_miss=False),
+        caching.get_comments_block(news.pk),
+        caching.get_state(),
+        caching.get_state(news.pk),
+    )
+    if use_replica:
+        assert cached == (None,) * len(cached)
+    else:
+        assert None not in cached
+
+
+def test_backup_copies_database(tmp_path):
+    """Проверить, что backup копирует базу и отмечает время копии."""
+    source, target = tmp_path / 'db.sqlite3', tmp_path / 'replica.sqlite3'
+    with sqlite3.connect(source) as connection:
+        connection.execute('CREATE TABLE news (title TEXT)')
+        connection.execute("INSERT INTO news VALUES ('Новость')")
+    connection.close()
+    assert replicas.synced_ago(target) == float('inf')
+    replicas.backup(source, target)
+    with sqlite3.connect(target) as connection:
+        assert connection.execute('SELECT title FROM news').fetchall() == [
+            ('Новость',)
+        ]
+    connection.close()
+    assert replicas.synced_ago(target) < 5
@@ -6,6 +6,9 @@ from pytest_lazyfixture import lazy_fixture
 
 URL_NEWS_HOME = lazy_fixture('url_news_home')
 URL_NEWS_DETAIL = lazy_fixture('url_news_detail')
+URL_NEWS_COMMENTS = lazy_fixture('url_news_comments')
+URL_CACHE_STATS = lazy_fixture('url_cache_stats')
+URL_NEWS_SEARCH = lazy_fixture('url_news_search')
 URL_USERS_SIGNUP = lazy_fixture('url_users_signup')
 URL_USERS_LOGIN = lazy_fixture('url_users_login')
 URL_USERS_LOGOUT = lazy_fixture('url_users_logout')
@@ -26,6 +29,10 @@ pytestmark = pytest.mark.django_db
     (
         (URL_NEWS_HOME, ANON_CLIENT, HTTPStatus.OK),
         (URL_NEWS_DETAIL, ANON_CLIENT, HTTPStatus.OK),
+        (URL_NEWS_COMMENTS, ANON_CLIENT, HTTPStatus.OK),
+        (URL_CACHE_STATS, ANON_CLIENT, HTTPStatus.NOT_FOUND),
+        (URL_CACHE_STATS, USER_CLIENT, HTTPStatus.NOT_FOUND),
+        (URL_NEWS_SEARCH, ANON_CLIENT, HTTPStatus.OK),
         (URL_USERS_SIGNUP, ANON_CLIENT, HTTPStatus.OK),
         (URL_USERS_LOGIN, ANON_CLIENT, HTTPStatus.OK),
         (URL_USERS_LOGOUT, ANON_CLIENT, HTTPStatus.OK),
@@ -36,9 +43,11 @@ pytestmark = pytest.mark.django_db
     )
 )
 def test_rooting_for_pages_different_user(
-        url, parametrized_client, expected_status, news):
+        url, parametrized_client, expected_status, news,
+        assert_query_budget):
     """Проверка рутинга для страниц для разных пользователей."""
-    response = parametrized_client.get(url)
+    with assert_query_budget(url):
+        response = parametrized_client.get(url)
     assert response.status_code == expected_status
 
 
@@ -46,8 +55,10 @@ def test_rooting_for_pages_different_user(
     'url', (lazy_fixture('url_comment_delete'),
             lazy_fixture('url_comment_edit'))
 )
-def test_redirect_for_anon_user(url, url_users_login, client):
+def test_redirect_for_anon_user(
+        url, url_users_login, client, assert_query_budget):
     """Проверка редиректов для анонимного пользователя."""
     expected_url = f'{url_users_login}?next={url}'
-    response = client.get(url)
+    with assert_query_budget(url):
+        response = client.get(url)
     assertRedirects(response, expected_url)
@@ -0,0 +1,133 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from news import search
+from news.models import Comment, News
+from yacommon.plans import explain
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        not search.is_supported(), reason='Поиск работает на SQLite FTS5.'
+    ),
+]
+
+
+def search_kinds(client, url, query):
+    response = client.get(url, {'q': query})
+    return [
+        (result['kind'], result['news_id'])
+        for result in response.context['results']
+    ]
+
+
+def test_search_finds_news_and_comments(
+        client, news, comment, url_news_search):
+    """Проверить, что поиск находит и новости, и комментарии."""
+    assert search_kinds(client, url_news_search, 'заголовок_новости') == [
+        ('news', news.id)
+    ]
+    assert search_kinds(client, url_news_search, 'ТЕКСТ_КОММЕНТАРИЯ') == [
+        ('comment', news.id)
+    ]
+
+
+def test_search_index_follows_changes(client, news, comment, url_news_search):
+    """Проверить, что индекс обновляется при правке и удалении записей."""
+    Comment.objects.filter(pk=comment.pk).update(text='Обновлённый отзыв')
+    assert search_kinds(client, url_news_search, 'текст_комментария') == []
+    assert search_kinds(client, url_news_search, 'отзыв') == [
+        ('comment', news.id)
+    ]
+    News.objects.all().delete()
+    assert search_kinds(client, url_news_search, 'отзыв') == []
+    assert search_kinds(client, url_news_search, 'заголовок_новости') == []
+
+
+def test_search_snippet_is_escaped(client, author, news, url_news_search):
+    """Проверить, что в сниппете экранирован HTML, кроме подсветки."""
+    Comment.objects.create(
+        news=news, author=author, text='<script>alert(1)</script> находка'
+    )
+    response = client.get(url_news_search, {'q': 'находка'})
+    snippet = response.context['results'][0]['snippet']
+    assert '<script>' not in snippet
+    assert '<mark>находка</mark>' in snippet
+
+
+def test_search_snippet_with_marker_characters(
+        client, author, news, url_news_search):
+    """Проверить, что метки snippet() в тексте не ломают теги <mark>."""
+    Comment.objects.create(
+        news=news, author=author, text='\x03начало \x02 находка \x02'
+    )
+    response = client.get(url_news_search, {'q': 'находка'})
+    snippet = response.context['results'][0]['snippet']
+    assert snippet.count('<mark>') == snippet.count('</mark>') == 1
+    assert '<mark>находка</mark>' in snippet
+
+
+def test_search_best_of_each_source_first(
+        client, author, news, url_news_search):
+    """Проверить, что лучшие новость и комментарий идут первыми."""
+    News.objects.bulk_create(
+        News(title='Погода', text='Погода погода') for _ in range(5)
+    )
+    Comment.objects.create(
+        news=news, author=author, text='Длинный отзыв, где погода ' * 5
+    )
+    kinds = search_kinds(client, url_news_search, 'погода')
+    assert {kind for kind, _ in kinds[:2]} == {'news', 'comment'}
+
+
+def test_search_pagination(client, url_news_search, settings):
+    """Проверить, что результаты поиска разбиты на страницы."""
+    settings.SEARCH_RESULTS_ON_PAGE = 2
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Погода') for index in range(3)
+    )
+    response = client.get(url_news_search, {'q': 'погода'})
+    assert len(response.context['results']) == 2
+    assert response.context['has_next']
+    response = client.get(url_news_search, {'q': 'погода', 'page': 2})
+    assert len(response.context['results']) == 1
+    assert not response.context['has_next']
+    for page in ('x', '9' * 30, settings.SEARCH_MAX_PAGE + 1):
+        response = client.get(url_news_search, {'q': 'погода', 'page': page})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_search_ignores_control_characters(client, news, url_news_search):
+    """Проверить, что управляющие символы в запросе не ломают поиск."""
+    response = client.get(url_news_search, {'q': 'заголовок_новости\x00x'})
+    assert response.status_code == HTTPStatus.OK
+    assert search.to_match_query('a\x00b\x7f') == '"a" "b"'
+
+
+def test_search_does_not_scan_tables(news, comment):
+    """Проверить, что поиск читает таблицы только по первичному ключу."""
+    match_query = search.to_match_query('текст')
+    details = explain(search.SEARCH_SQL, (match_query, match_query, 10, 0))
+    scans = [
+        detail for detail in details
+        if detail.startswith('SCAN ') and 'VIRTUAL TABLE' not in detail
+        and 'subquery' not in detail
+    ]
+    assert not scans, details
+
+
+def test_rebuild_search_index_command(client, news, url_news_search):
+    """Проверить, что команда перестраивает индекс."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO news_news_fts(news_news_fts) VALUES ('delete-all')"
+        )
+    assert search_kinds(client, url_news_search, 'заголовок_новости') == []
+    call_command('rebuild_search_index', stdout=StringIO())
+    assert search_kinds(client, url_news_search, 'заголовок_новости') == [
+        ('news', news.id)
+    ]
@@ -0,0 +1,51 @@
+import pytest
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.template import engines
+
+from yacommon import templating
+from yanews import settings_prod
+
+
+def test_project_templates_compile():
+    """Проверить, что все шаблоны проекта компилируются."""
+    count, errors = templating.precompile()
+    assert errors == []
+    names = templating.template_names(engines['django'])
+    assert {'base.html', 'news/home.html', 'news/detail.html'} <= set(names)
+    assert count >= len(names)
+
+
+def test_check_templates_reports_broken_template(settings, tmp_path):
+    """Проверить, что команда падает на шаблоне с синтаксической ошибкой."""
+    (tmp_path / 'broken.html').write_text('{% if %}')
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0], 'DIRS': [tmp_path],
+    }]
+    with pytest.raises(CommandError, match='1 из'):
+        call_command('check_templates')
+
+
+def test_warmup_fails_on_broken_template(settings, tmp_path, caplog):
+    """
+    Проверить, что прогрев при запуске пишет в лог шаблон с ошибкой
+    и прерывает запуск.
+    """
+    (tmp_path / 'broken.html').write_text('{% if %}')
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0], 'DIRS': [tmp_path],
+    }]
+    settings.TEMPLATES_WARMUP = True
+    with pytest.raises(ImproperlyConfigured, match='broken.html'):
+        apps.get_app_config('yacommon').ready()
+    assert [record.args[0] for record in caplog.records] == ['broken.html']
+
+
+def test_prod_warmup_fills_loader_cache(settings):
+    """Проверить, что в боевом профиле шаблоны попадают в кеш загрузчика."""
+    settings.TEMPLATES = settings_prod.TEMPLATES
+    templating.precompile()
+    loader, = engines['django'].engine.template_loaders
+    assert 'news/home.html' in loader.get_template_cache
+    assert 'includes/header.html' in loader.get_template_cache
@@ -0,0 +1,76 @@
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from news import search, signals
+from yacommon import testdb
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Фикстура создаёт каталог проекта с одной миграцией."""
+    migrations = tmp_path / 'app' / 'migrations'
+    migrations.mkdir(parents=True)
+    (migrations / '0001_initial.py').write_text('operations = []')
+    return tmp_path
+
+
+def fts_tables():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE '%\\_fts' "
+            "ESCAPE '\\'"
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def test_hash_follows_migrations(project):
+    """Проверить, что хеш меняется при правке и добавлении миграций."""
+    migrations = project / 'app' / 'migrations'
+    initial = testdb.migrations_hash(project)
+    assert testdb.migrations_hash(project) == initial
+    (migrations / '0001_initial.py').write_text('operations = [None]')
+    changed = testdb.migrations_hash(project)
+    assert changed != initial
+    (migrations / '0002_more.py').write_text('operations = []')
+    assert testdb.migrations_hash(project) not in (initial, changed)
+
+
+def test_reusable_name_removes_stale_databases(project):
+    """Проверить, что базы со старым хешем удаляются, а шарды - нет."""
+    directory = project / '.test_db'
+    directory.mkdir()
+    stale = directory / 'test_000000000000.sqlite3'
+    stale.touch()
+    name = testdb.reusable_name(project, directory)
+    shard = name.with_name(f'{name.name}_shard1')
+    name.touch()
+    shard.touch()
+    assert testdb.reusable_name(project, directory) == name
+    assert not stale.exists()
+    assert name.exists() and shard.exists()
+
+
+def test_database_settings_modes(project):
+    """Проверить настройки базы для каждого значения TEST_DB."""
+    assert testdb.database_settings('memory', project) == ({}, {})
+    assert testdb.database_settings('nomigrations', project) == (
+        {'MIGRATE': False}, {}
+    )
+    test, pragmas = testdb.database_settings('reuse', project)
+    assert test['NAME'].parent == project / '.test_db'
+    assert pragmas == {'synchronous': 'OFF'}
+    with pytest.raises(ValueError, match='TEST_DB=disk'):
+        testdb.database_settings('disk', project)
+
+
+@pytest.mark.django_db
+def test_search_installed_without_migrations(settings):
+    """Проверить, что без миграций индексы поиска ставит post_migrate."""
+    config = apps.get_app_config('news')
+    search.uninstall()
+    signals.install_search(sender=config, using='default')
+    assert not fts_tables()
+    settings.MIGRATION_MODULES = {'news': None}
+    signals.install_search(sender=config, using='default')
+    assert fts_tables() == set(search.INDEXES)
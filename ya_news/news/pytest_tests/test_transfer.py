@@ -0,0 +1,145 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from news import caching
+from news.models import Comment, News
+
+pytestmark = pytest.mark.django_db
+
+
+def export(model, path, **options):
+    err = StringIO()
+    call_command(
+        'export_news', str(path), model=model, stderr=err, **options
+    )
+    assert 'записей/с' in err.getvalue()
+
+
+def load(model, path, **options):
+    out = StringIO()
+    call_command('import_news', str(path), model=model, stdout=out, **options)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('suffix', ('jsonl', 'csv'))
+def test_round_trip(tmp_path, comments_for_same_news, news, suffix):
+    """Проверить, что выгруженные записи загружаются обратно без потерь."""
+    news_path = tmp_path / f'news.{suffix}'
+    comments_path = tmp_path / f'comments.{suffix}'
+    export('news', news_path, chunk_size=1)
+    export('comments', comments_path, chunk_size=3)
+    expected_news = list(News.objects.values_list('id', 'title', 'date'))
+    expected_comments = list(Comment.objects.values_list(
+        'id', 'news_id', 'author_id', 'text', 'created'
+    ))
+    News.objects.all().delete()
+
+    assert 'Загружено записей: 1 ' in load('news', news_path, chunk_size=1)
+    load('comments', comments_path, chunk_size=3)
+
+    assert list(
+        News.objects.values_list('id', 'title', 'date')
+    ) == expected_news
+    assert list(Comment.objects.values_list(
+        'id', 'news_id', 'author_id', 'text', 'created'
+    )) == expected_comments
+    assert News.objects.get().comment_count == len(expected_comments)
+
+
+def test_import_comments_updates_count_and_cache(
+        tmp_path, author, news, client, url_news_home):
+    """Проверить, что импорт комментариев обновляет счётчик и кеш."""
+    client.get(url_news_home)
+    assert caching.get_home_page() is not None
+    path = tmp_path / 'comments.jsonl'
+    path.write_text(''.join(
+        json.dumps({
+            'news_id': news.id, 'author': author.username, 'text': f'{i}'
+        }) + '\n'
+        for i in range(5)
+    ), encoding='utf-8')
+    load('comments', path, chunk_size=2)
+    news.refresh_from_db()
+    assert news.comment_count == 5
+    assert caching.get_home_page() is None
+
+
+@pytest.mark.parametrize(
+    'line, message',
+    (
+        ('не json', 'строка 2'),
+        ('{"news_id": 1, "author": "нет такого", "text": "x"}',
+         'нет пользователя'),
+        ('{"news_id": 999, "author": "Автор", "text": "x"}',
+         'запись 2: нет новости'),
+        ('{"news_id": 1, "author": "Автор", "text": ""}',
+         'запись 2, text: обязательное поле'),
+    ),
+)
+def test_import_errors(tmp_path, author, news, line, message):
+    """Проверить, что ошибка указывает на запись и откатывает пачку."""
+    valid = json.dumps(
+        {'news_id': news.id, 'author': author.username, 'text': 'ok'}
+    )
+    path = tmp_path / 'comments.jsonl'
+    path.write_text(f'{valid}\n{line}\n', encoding='utf-8')
+    with pytest.raises(CommandError, match=message):
+        load('comments', path, chunk_size=2)
+    assert Comment.objects.count() == 0
+
+
+@pytest.mark.parametrize(
+    'suffix, content, message',
+    (
+        ('jsonl', '{"text": "Текст"}\n'.encode(), 'запись 1, title'),
+        ('csv', b'title,text\n"' + b'x' * 200000 + b'",1\n', 'строка 2'),
+        ('csv', b'title,text\nx,\xff\n', 'UTF-8'),
+        ('jsonl', b'{"title": "\xff"}\n', 'UTF-8'),
+    ),
+)
+def test_import_bad_file(tmp_path, suffix, content, message):
+    """Проверить, что плохой файл даёт ошибку команды, а не traceback."""
+    path = tmp_path / f'news.{suffix}'
+    path.write_bytes(content)
+    with pytest.raises(CommandError, match=message):
+        load('news', path)
+
+
+def test_import_keeps_created_without_id(tmp_path, author, news):
+    """Проверить, что время из файла сохраняется и у записей без id."""
+    created = '2020-01-02T03:04:05+00:00'
+    path = tmp_path / 'comments.jsonl'
+    path.write_text(''.join(
+        json.dumps({
+            'news_id': news.id, 'author': author.username, 'text': text,
+            **extra
+        }) + '\n'
+        for text, extra in (('Старый', {'created': created}), ('Новый', {}))
+    ), encoding='utf-8')
+    load('comments', path)
+    old, new = (
+        Comment.objects.get(text=text) for text in ('Старый', 'Новый')
+    )
+    assert old.created.isoformat() == created
+    assert new.created > old.created
+
+
+def test_import_comments_inserts_in_bulk(
+        tmp_path, author, news, django_assert_max_num_queries):
+    """Проверить, что число запросов не растёт с числом комментариев."""
+    path = tmp_path / 'comments.jsonl'
+    path.write_text(''.join(
+        json.dumps({
+            'news_id': news.id, 'author': author.username,
+            'text': f'Комментарий {index}',
+            'created': f'2020-01-{index + 1:02}T00:00:00+00:00',
+        }) + '\n'
+        for index in range(20)
+    ), encoding='utf-8')
+    with django_assert_max_num_queries(10):
+        load('comments', path)
+    assert Comment.objects.count() == 20
+    assert Comment.objects.filter(created__year=2020).count() == 20
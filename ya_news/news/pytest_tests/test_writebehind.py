@@ -0,0 +1,227 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, OperationalError
+from django.db.models import QuerySet
+
+from news import caching, writebehind
+from news.models import Comment, News
+
+FORM_DATA = {'text': 'Отложенный комментарий'}
+
+
+@pytest.fixture
+def writer(settings, monkeypatch):
+    """Фикстура включает отложенную запись с очередью без потока."""
+    settings.NEWS_COMMENTS_WRITE_BEHIND = True
+    queue = writebehind.CommentWriter(background=False)
+    monkeypatch.setattr(writebehind, 'writer', queue)
+    return queue
+
+
+def queued(news, author, text='Комментарий'):
+    return Comment(news_id=news.pk, author_id=author.pk, text=text)
+
+
+@pytest.mark.django_db
+def test_comment_waits_in_queue(writer, user, user_client, news,
+                                url_news_detail):
+    """Проверить, что POST не пишет в базу, а ставит комментарий в очередь."""
+    count_comments = Comment.objects.count()
+    response = user_client.post(url_news_detail, data=FORM_DATA)
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.count() == count_comments
+    assert writer.has_pending(user.pk)
+
+
+@pytest.mark.django_db
+def test_author_reads_own_comment(writer, user, user_client, news,
+                                  url_news_detail):
+    """Проверить, что после редиректа автор видит свой комментарий."""
+    response = user_client.post(url_news_detail, data=FORM_DATA)
+    response = user_client.get(response.url)
+    assert FORM_DATA['text'] in response.content.decode()
+    assert not writer.has_pending(user.pk)
+    news.refresh_from_db()
+    assert news.comment_count == Comment.objects.filter(news=news).count()
+
+
+@pytest.mark.django_db
+def test_other_reader_does_not_flush(writer, user, author_client,
+                                     user_client, url_news_detail):
+    """Проверить, что чужой запрос не дописывает очередь."""
+    user_client.post(url_news_detail, data=FORM_DATA)
+    author_client.get(url_news_detail)
+    assert writer.has_pending(user.pk)
+
+
+@pytest.mark.django_db
+def test_flush_writes_batch(writer, author, user, news,
+                            django_assert_num_queries):
+    """Проверить, что пачка пишется одним INSERT, а счётчики - по числу."""
+    other = News.objects.create(title='Другая', text='Текст')
+    counts = {news.pk: news.comment_count, other.pk: other.comment_count}
+    for item in (news, other):
+        for person in (author, user):
+            writer.put(queued(item, person))
+    caching.set_home_page(b'old')
+    # SAVEPOINT, новости, авторы, INSERT, UPDATE, RELEASE.
+    with django_assert_num_queries(6):
+        assert writer.flush() == 4
+    for item in (news, other):
+        item.refresh_from_db()
+        assert item.comment_count == counts[item.pk] + 2
+    assert caching.get_home_page() is None
+
+
+@pytest.mark.django_db
+def test_flush_skips_deleted_news(writer, author, news):
+    """Проверить, что комментарий к удалённой новости не записывается."""
+    other = News.objects.create(title='Другая', text='Текст')
+    writer.put(queued(other, author))
+    writer.put(queued(news, author, 'Останется'))
+    other.delete()
+    assert writer.flush() == 1
+    assert Comment.objects.filter(text='Останется').exists()
+
+
+@pytest.mark.django_db
+def test_failed_flush_keeps_queue(writer, author, news, monkeypatch):
+    """Проверить, что при ошибке базы комментарии остаются в очереди."""
+    def locked(*args, **kwargs):
+        raise OperationalError('database is locked')
+
+    writer.put(queued(news, author, 'Первый'))
+    with monkeypatch.context() as patch:
+        patch.setattr(QuerySet, 'bulk_create', locked)
+        with pytest.raises(OperationalError):
+            writer.flush()
+    writer.put(queued(news, author, 'Второй'))
+    assert [comment.text for comment in writer.pending] == [
+        'Первый', 'Второй'
+    ]
+    assert writer.flush() == 2
+
+
+def fail_on(error, texts=None, times=None):
+    """Подмена bulk_create, которая падает на комментариях с texts."""
+    original = QuerySet.bulk_create
+    calls = []
+
+    def bulk_create(queryset, objs, *args, **kwargs):
+        calls.append(objs)
+        if times is not None and len(calls) > times:
+            return original(queryset, objs, *args, **kwargs)
+        if texts is None or any(obj.text in texts for obj in objs):
+            raise error('отказ базы')
+        return original(queryset, objs, *args, **kwargs)
+
+    return bulk_create
+
+
+@pytest.mark.django_db
+def test_poison_comment_dropped(writer, author, news, monkeypatch, caplog):
+    """Проверить, что плохой комментарий не держит остальные."""
+    for text in ('Первый', 'Плохой', 'Третий', 'Четвёртый'):
+        writer.put(queued(news, author, text))
+    monkeypatch.setattr(
+        QuerySet, 'bulk_create', fail_on(IntegrityError, {'Плохой'})
+    )
+    assert writer.flush() == 3
+    assert not writer.pending
+    assert not Comment.objects.filter(text='Плохой').exists()
+    assert 'Плохой' in caplog.text
+
+
+@pytest.mark.django_db
+def test_locked_database_loses_nothing(writer, author, news, monkeypatch):
+    """Проверить, что пока база заблокирована, комментарии ждут в очереди."""
+    texts = [f'Комментарий {number}' for number in range(5)]
+    for text in texts:
+        writer.put(queued(news, author, text))
+    with monkeypatch.context() as patch:
+        patch.setattr(QuerySet, 'bulk_create', fail_on(OperationalError))
+        for _ in range(20):
+            with pytest.raises(OperationalError):
+                writer.flush()
+    assert [comment.text for comment in writer.pending] == texts
+    assert writer.flush() == len(texts)
+    assert Comment.objects.filter(text__in=texts).count() == len(texts)
+
+
+@pytest.mark.django_db
+def test_lock_while_splitting_requeues_rest(writer, author, news,
+                                            monkeypatch):
+    """Проверить, что блокировка посреди деления пачки не теряет остаток."""
+    original = QuerySet.bulk_create
+    locked = []
+
+    def bulk_create(queryset, objs, *args, **kwargs):
+        texts = {obj.text for obj in objs}
+        if 'Плохой' in texts:
+            raise IntegrityError('плохие данные')
+        if 'Последний' in texts and not locked:
+            locked.append(True)
+            raise OperationalError('database is locked')
+        return original(queryset, objs, *args, **kwargs)
+
+    for text in ('Плохой', 'Второй', 'Третий', 'Последний'):
+        writer.put(queued(news, author, text))
+    monkeypatch.setattr(QuerySet, 'bulk_create', bulk_create)
+    with pytest.raises(OperationalError):
+        writer.flush()
+    assert [comment.text for comment in writer.pending] == [
+        'Третий', 'Последний'
+    ]
+    assert writer.flush() == 2
+
+
+@pytest.mark.django_db
+def test_busy_writer_does_not_block_page(writer, user, user_client, settings,
+                                         url_news_detail):
+    """Проверить, что страница не ждёт, пока очередь пишет другой поток."""
+    settings.NEWS_COMMENTS_FLUSH_WAIT = 0.01
+    user_client.post(url_news_detail, data=FORM_DATA)
+    with writer.flush_lock:
+        started = time.monotonic()
+        response = user_client.get(url_news_detail)
+    assert time.monotonic() - started < 1
+    assert response.status_code == HTTPStatus.OK
+    assert writer.has_pending(user.pk)
+    user_client.get(url_news_detail)
+    assert not writer.has_pending(user.pk)
+
+
+@pytest.mark.django_db
+def test_locked_database_does_not_break_page(writer, user, user_client,
+                                             monkeypatch, url_news_detail):
+    """Проверить, что без дописывания очереди страница всё равно видна."""
+    user_client.post(url_news_detail, data=FORM_DATA)
+    monkeypatch.setattr(QuerySet, 'bulk_create', fail_on(OperationalError))
+    response = user_client.get(url_news_detail)
+    assert response.status_code == HTTPStatus.OK
+    assert writer.has_pending(user.pk)
+
+
+@pytest.mark.django_db
+def test_flush_at_exit_retries(writer, author, news, monkeypatch):
+    """Проверить, что при выходе запись повторяется, пока база занята."""
+    writer.put(queued(news, author, 'При выходе'))
+    monkeypatch.setattr(
+        QuerySet, 'bulk_create', fail_on(OperationalError, times=2)
+    )
+    writer.flush_at_exit()
+    assert Comment.objects.filter(text='При выходе').exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_background_flush(settings, author, news):
+    """Проверить, что фоновый поток записывает очередь сам."""
+    settings.NEWS_COMMENTS_FLUSH_INTERVAL = 0.01
+    writer = writebehind.CommentWriter()
+    writer.put(queued(news, author, 'Из потока'))
+    deadline = time.monotonic() + 5
+    while writer.has_pending(author.pk) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert Comment.objects.filter(text='Из потока').exists()
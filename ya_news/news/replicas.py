@@ -0,0 +1,192 @@
+"""
+Чтение страниц новостей с реплик базы.
+
+ReplicaMiddleware отмечает запросы GET и HEAD к главной странице,
+странице новости и спискам записей в админке, и ReplicaRouter
+отправляет их чтения на одну из реплик NEWS_REPLICAS. Реплика
+выбирается один раз на запрос, так что все его запросы видят одно
+состояние базы. Записи всегда идут в основную базу, как и чтения внутри
+её транзакции и всё, что прочитано в запросе после записи.
+
+Реплика отстаёт от основной базы. Поэтому после POST или другой записи
+пользователь получает cookie NEWS_REPLICA_PIN_COOKIE и следующие
+NEWS_REPLICA_LAG секунд читает основную базу - свой комментарий он
+увидит сразу. Реплика, которая отстала больше чем на NEWS_REPLICA_LAG,
+не используется вовсе.
+
+Страница, прочитанная с реплики, не попадает в кеш страниц (caching):
+она могла отстать, а кеш живёт до NEWS_CACHE_TIMEOUT и сбрасывается
+только при записи, так что устаревшая копия пережила бы синхронизацию.
+
+Для SQLite реплика - отдельный файл, который команда sync_replicas
+копирует из основной базы через backup API и отмечает время копии в
+файле <имя базы>.synced. По этой отметке считается отставание. Для
+других баз отставание здесь не измеряется, и реплика считается
+свежей.
+"""
+import contextvars
+import os
+import random
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Имена маршрутов, которые читают с реплики; кроме них - changelist
+# любой модели в админке.
+REPLICA_VIEWS = ('news:home', 'news:detail')
+SYNCED_SUFFIX = '.synced'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class RoutingState:
+    """Решение о реплике для одного запроса."""
+
+    def __init__(self):
+        self.use_replica = False
+        self.alias = None
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('news_replica_state', default=None)
+
+
+def synced_ago(name):
+    """Секунды с последней копии в файл name (бесконечность - копии нет)."""
+    try:
+        return time.time() - os.stat(f'{name}{SYNCED_SUFFIX}').st_mtime
+    except FileNotFoundError:
+        return float('inf')
+
+
+def lag(alias):
+    """Отставание реплики alias в секундах."""
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return 0.0
+    return synced_ago(connection.settings_dict['NAME'])
+
+
+def choose_replica():
+    """Случайная реплика из тех, что отстают не больше допустимого."""
+    fresh = [
+        alias for alias in settings.NEWS_REPLICAS
+        if lag(alias) <= settings.NEWS_REPLICA_LAG
+    ]
+    return random.choice(fresh) if fresh else DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """Чтения запросов, отмеченных ReplicaMiddleware, - на реплику."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if state.alias is None:
+            state.alias = choose_replica()
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной базе.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема попадает на реплики вместе с копией базы.
+        return db not in settings.NEWS_REPLICAS
+
+
+def used_replica():
+    """Читал ли текущий запрос с реплики, а не из основной базы."""
+    state = _state.get()
+    return state is not None and state.alias not in (None, DEFAULT_DB_ALIAS)
+
+
+def reads_from_replica(request):
+    match = request.resolver_match
+    if request.method not in SAFE_METHODS or match is None:
+        return False
+    if match.namespace == 'admin':
+        return match.url_name.endswith('_changelist')
+    return match.view_name in REPLICA_VIEWS
+
+
+def is_pinned(request):
+    try:
+        until = float(request.COOKIES[settings.NEWS_REPLICA_PIN_COOKIE])
+    except (KeyError, ValueError):
+        return False
+    return until > time.time()
+
+
+class ReplicaMiddleware:
+    """
+    Отмечает запросы для чтения с реплики и закрепляет писавших.
+
+    Ставится сразу после RequestMetricsMiddleware: решение о реплике
+    должно действовать и на сессию с пользователем, которые читаются
+    уже в представлении.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NEWS_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                settings.NEWS_REPLICA_PIN_COOKIE,
+                str(time.time() + settings.NEWS_REPLICA_LAG),
+                max_age=settings.NEWS_REPLICA_LAG,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Состояние - общий объект: представление может выполняться в
+        # скопированном контексте, например в пуле async_views.
+        state = _state.get()
+        if state is not None:
+            state.use_replica = (
+                reads_from_replica(request) and not is_pinned(request)
+            )
+
+
+def backup(source, target, timeout=5):
+    """Копирует базу SQLite source в файл target и отмечает время копии."""
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target, timeout=timeout)
+    with closing(source_connection), closing(target_connection):
+        source_connection.backup(target_connection)
+    marker = f'{target}{SYNCED_SUFFIX}'
+    with open(marker, 'a'):
+        os.utime(marker)
+
+
+def sync(alias):
+    """Копирует основную базу в реплику alias."""
+    replica = connections[alias].settings_dict
+    backup(
+        connections[DEFAULT_DB_ALIAS].settings_dict['NAME'],
+        replica['NAME'],
+        replica['OPTIONS'].get('timeout', 5),
+    )
@@ -0,0 +1,154 @@
+"""
+Полнотекстовый поиск по новостям и комментариям на SQLite FTS5.
+
+Индексы news_news_fts и news_comment_fts - внешние (content=) таблицы
+FTS5 поверх news_news и news_comment: сами тексты не дублируются, а
+триггеры держат индекс в согласии с таблицами при любой записи, включая
+bulk_create и update(), которые не отправляют сигналов.
+"""
+from django.db import connection
+
+from yacommon.fts import CONTROL_CHARS, highlight
+
+TOKENIZER = "tokenize='unicode61 remove_diacritics 2'"
+
+SCHEMA = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS news_news_fts USING fts5('
+    "title, text, content='news_news', content_rowid='id', "
+    f'{TOKENIZER})',
+    'CREATE TRIGGER IF NOT EXISTS news_news_fts_insert '
+    'AFTER INSERT ON news_news BEGIN '
+    'INSERT INTO news_news_fts(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+    'CREATE TRIGGER IF NOT EXISTS news_news_fts_delete '
+    'AFTER DELETE ON news_news BEGIN '
+    'INSERT INTO news_news_fts(news_news_fts, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    'CREATE TRIGGER IF NOT EXISTS news_news_fts_update '
+    'AFTER UPDATE OF title, text ON news_news BEGIN '
+    'INSERT INTO news_news_fts(news_news_fts, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); "
+    'INSERT INTO news_news_fts(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+    'CREATE VIRTUAL TABLE IF NOT EXISTS news_comment_fts USING fts5('
+    "text, content='news_comment', content_rowid='id', "
+    f'{TOKENIZER})',
+    'CREATE TRIGGER IF NOT EXISTS news_comment_fts_insert '
+    'AFTER INSERT ON news_comment BEGIN '
+    'INSERT INTO news_comment_fts(rowid, text) '
+    'VALUES (new.id, new.text); END',
+    'CREATE TRIGGER IF NOT EXISTS news_comment_fts_delete '
+    'AFTER DELETE ON news_comment BEGIN '
+    'INSERT INTO news_comment_fts(news_comment_fts, rowid, text) '
+    "VALUES ('delete', old.id, old.text); END",
+    'CREATE TRIGGER IF NOT EXISTS news_comment_fts_update '
+    'AFTER UPDATE OF text ON news_comment BEGIN '
+    'INSERT INTO news_comment_fts(news_comment_fts, rowid, text) '
+    "VALUES ('delete', old.id, old.text); "
+    'INSERT INTO news_comment_fts(rowid, text) '
+    'VALUES (new.id, new.text); END',
+)
+DROP_SCHEMA = (
+    'DROP TRIGGER IF EXISTS news_news_fts_insert',
+    'DROP TRIGGER IF EXISTS news_news_fts_delete',
+    'DROP TRIGGER IF EXISTS news_news_fts_update',
+    'DROP TABLE IF EXISTS news_news_fts',
+    'DROP TRIGGER IF EXISTS news_comment_fts_insert',
+    'DROP TRIGGER IF EXISTS news_comment_fts_delete',
+    'DROP TRIGGER IF EXISTS news_comment_fts_update',
+    'DROP TABLE IF EXISTS news_comment_fts',
+)
+INDEXES = ('news_news_fts', 'news_comment_fts')
+
+
+# rank двух индексов - bm25 по статистике каждой таблицы, и в общей
+# шкале они не сравнимы. Поэтому rank делится на лучший rank своего
+# источника: лучшие новость и комментарий оба получают 1 и идут первыми.
+# Порядок между источниками остаётся приблизительным.
+SEARCH_SQL = '''
+SELECT kind, news_id, comment_id, title, snippet FROM (
+    SELECT 'news' AS kind, news.id AS news_id, NULL AS comment_id,
+           news.title AS title,
+           snippet(news_news_fts, -1, char(2), char(3), '…', 16) AS snippet,
+           news_news_fts.rank AS rank
+    FROM news_news_fts
+    JOIN news_news AS news ON news.id = news_news_fts.rowid
+    WHERE news_news_fts MATCH %s
+    UNION ALL
+    SELECT 'comment', comment.news_id, comment.id, news.title,
+           snippet(news_comment_fts, 0, char(2), char(3), '…', 16),
+           news_comment_fts.rank
+    FROM news_comment_fts
+    JOIN news_comment AS comment ON comment.id = news_comment_fts.rowid
+    JOIN news_news AS news ON news.id = comment.news_id
+    WHERE news_comment_fts MATCH %s
+)
+ORDER BY rank / MIN(rank) OVER (PARTITION BY kind) DESC, rank
+LIMIT %s OFFSET %s
+'''
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(using=connection):
+    """Создаёт индексы и триггеры (повторный вызов ничего не меняет)."""
+    if not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+
+def uninstall(using=connection):
+    if not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        for statement in DROP_SCHEMA:
+            cursor.execute(statement)
+
+
+def rebuild(using=connection):
+    """Перестраивает оба индекса по содержимому таблиц."""
+    with using.cursor() as cursor:
+        for index in INDEXES:
+            cursor.execute(
+                f"INSERT INTO {index}({index}) VALUES ('rebuild')"
+            )
+            cursor.execute(
+                f"INSERT INTO {index}({index}) VALUES ('optimize')"
+            )
+
+
+def to_match_query(query):
+    """
+    Превращает пользовательский ввод в запрос FTS5.
+
+    Каждое слово берётся в кавычки, так что операторы FTS5 из ввода не
+    интерпретируются; слова объединяются через AND. Управляющие символы
+    считаются пробелами.
+    """
+    terms = CONTROL_CHARS.sub(' ', query).split()
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def search(query, limit, offset=0):
+    """
+    Новости и комментарии по запросу, лучшие совпадения первыми.
+
+    Возвращает список словарей с ключами kind, news_id, comment_id,
+    title и snippet (безопасный HTML с подсветкой совпадений).
+    """
+    match_query = to_match_query(query)
+    if not match_query or not is_supported():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEARCH_SQL, (match_query, match_query, limit, offset)
+        )
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    for row in rows:
+        row['snippet'] = highlight(row['snippet'])
+    return rows
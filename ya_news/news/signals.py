@@ -0,0 +1,53 @@
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import F
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from . import caching, moderation, search
+from .models import BadWord, Comment, News
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличиваем счётчик комментариев новости при создании комментария."""
+    if created and not raw:
+        News.objects.filter(pk=instance.news_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшаем счётчик комментариев новости при удалении комментария."""
+    News.objects.filter(
+        pk=instance.news_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_page_cache(sender, instance, **kwargs):
+    """Сбрасываем кеш страниц, на которых видна изменённая запись."""
+    caching.invalidate(
+        instance.pk if sender is News else instance.news_id
+    )
+
+
+@receiver(post_save, sender=BadWord)
+@receiver(post_delete, sender=BadWord)
+def reload_bad_words(sender, **kwargs):
+    """Пересобираем автомат запрещённых слов после изменения списка."""
+    moderation.words_changed()
+
+
+@receiver(post_migrate)
+def install_search(sender, using, **kwargs):
+    """Создаём индекс поиска, если таблицы созданы без миграций."""
+    if sender.name != 'news':
+        return
+    module, _ = MigrationLoader.migrations_module(sender.label)
+    if module is None:
+        search.install(connections[using])
@@ -0,0 +1,239 @@
+"""
+Потоковый импорт и экспорт новостей и комментариев.
+
+Файлы читаются и пишутся построчно в форматах JSON Lines и CSV, записи
+вставляются пачками через bulk_create, поэтому память не зависит от
+размера файла. bulk_create не отправляет сигналы, так что счётчики
+комментариев и кеш страниц обновляются здесь же после каждой пачки;
+поисковый индекс поддерживают триггеры FTS5.
+
+Время создания комментария из файла сохраняется: created - auto_now_add,
+и bulk_create заменил бы его текущим, поэтому комментарии вставляются
+без pre_save полей.
+"""
+import csv
+import json
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from . import caching
+from .models import Comment, News
+
+FORMATS = ('jsonl', 'csv')
+MODELS = {'news': News, 'comments': Comment}
+# Столбцы файла; author у комментария - имя пользователя.
+FIELDS = {
+    'news': ('id', 'title', 'text', 'date'),
+    'comments': ('id', 'news_id', 'author', 'text', 'created'),
+}
+EXPORT_COLUMNS = {
+    'news': ('id', 'title', 'text', 'date'),
+    'comments': ('id', 'news_id', 'author__username', 'text', 'created'),
+}
+
+
+class TransferError(Exception):
+    """Строку файла нельзя импортировать."""
+
+
+def guess_format(path):
+    return 'csv' if str(path).lower().endswith('.csv') else 'jsonl'
+
+
+def _csv_rows(stream):
+    reader = csv.DictReader(stream)
+    try:
+        yield from reader
+    except csv.Error as error:
+        raise TransferError(f'строка {reader.line_num + 1}: {error}')
+
+
+def _jsonl_rows(stream):
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            raise TransferError(f'строка {number}: {error}')
+        if not isinstance(row, dict):
+            raise TransferError(f'строка {number}: ожидается объект JSON')
+        yield row
+
+
+def read_rows(stream, file_format):
+    """Словари строк файла по одной."""
+    rows = _csv_rows if file_format == 'csv' else _jsonl_rows
+    try:
+        yield from rows(stream)
+    except UnicodeDecodeError as error:
+        # Файл декодируется блоками, поэтому номер строки неизвестен.
+        raise TransferError(f'файл не в кодировке UTF-8: {error}')
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def write_rows(rows, stream, kind, file_format):
+    """Пишет кортежи значений в файл; возвращает число строк."""
+    fields = FIELDS[kind]
+    count = 0
+    if file_format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+        return count
+    for count, row in enumerate(rows, 1):
+        stream.write(
+            json.dumps(
+                dict(zip(fields, row)), default=_isoformat,
+                ensure_ascii=False
+            ) + '\n'
+        )
+    return count
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_rows(kind, chunk_size):
+    """Кортежи значений всех записей по порядку id без кеша QuerySet."""
+    return MODELS[kind].objects.order_by('pk').values_list(
+        *EXPORT_COLUMNS[kind]
+    ).iterator(chunk_size=chunk_size)
+
+
+def _clean(model, number, row, fields):
+    """Значения полей из строки; пустыми могут быть только необязательные."""
+    values = {}
+    for name in fields:
+        value = row.get(name)
+        field = model._meta.get_field(name)
+        if value in (None, ''):
+            if field.blank or field.has_default():
+                continue
+            raise TransferError(
+                f'запись {number}, {name}: обязательное поле'
+            )
+        try:
+            values[name] = field.to_python(value)
+        except ValidationError as error:
+            raise TransferError(
+                f'запись {number}, {name}: {" ".join(error.messages)}'
+            )
+    return values
+
+
+def _build_news(rows):
+    return [
+        News(**_clean(News, number, row, FIELDS['news']))
+        for number, row in rows
+    ]
+
+
+def _build_comments(rows):
+    usernames = {row.get('author') for _, row in rows}
+    authors = dict(
+        get_user_model().objects.filter(
+            username__in=usernames
+        ).values_list('username', 'pk')
+    )
+    comments = []
+    for number, row in rows:
+        if row.get('author') not in authors:
+            raise TransferError(
+                f'запись {number}: нет пользователя {row.get("author")!r}'
+            )
+        values = _clean(
+            Comment, number, row, ('id', 'news_id', 'text', 'created')
+        )
+        comments.append(Comment(author_id=authors[row['author']], **values))
+    # Ссылки проверяем сами: SQLite проверяет внешние ключи только при
+    # коммите и не говорит, какая запись ошибочна.
+    news_ids = {comment.news_id for comment in comments}
+    existing = set(
+        News.objects.filter(pk__in=news_ids).values_list('pk', flat=True)
+    )
+    for (number, _), comment in zip(rows, comments):
+        if comment.news_id not in existing:
+            raise TransferError(
+                f'запись {number}: нет новости {comment.news_id!r}'
+            )
+    return comments
+
+
+def _insert_comments(comments):
+    """
+    Вставляет комментарии со временем created из файла.
+
+    Запрос строится как bulk_create, но с raw=True: поля не вызывают
+    pre_save, и auto_now_add не заменяет время. Пустое время ставится
+    здесь же, как это сделал бы auto_now_add, а записи с id и без него
+    вставляются отдельными запросами, как в bulk_create.
+    """
+    now = timezone.now()
+    for comment in comments:
+        if comment.created is None:
+            comment.created = now
+    fields = Comment._meta.concrete_fields
+    for with_pk in (True, False):
+        objects = [
+            comment for comment in comments
+            if (comment.pk is not None) == with_pk
+        ]
+        insert_fields = [
+            field for field in fields
+            if with_pk or field is not Comment._meta.pk
+        ]
+        size = connection.ops.bulk_batch_size(insert_fields, objects)
+        for batch in chunked(objects, size):
+            Comment.objects._insert(batch, insert_fields, raw=True)
+    for comment in comments:
+        comment._state.adding = False
+        comment._state.db = connection.alias
+
+
+def import_rows(rows, kind, chunk_size, on_chunk=None):
+    """
+    Вставляет строки пачками по chunk_size, каждая пачка в своей транзакции.
+
+    При ошибке уже вставленные пачки остаются в базе, а TransferError
+    указывает на записи, которые не удалось загрузить. on_chunk
+    вызывается с числом вставленных строк после каждой пачки.
+    Возвращает общее число строк.
+    """
+    total = 0
+    for chunk in chunked(enumerate(rows, 1), chunk_size):
+        first, last = chunk[0][0], chunk[-1][0]
+        try:
+            with transaction.atomic():
+                if kind == 'news':
+                    objects = _build_news(chunk)
+                    News.objects.bulk_create(objects)
+                    caching.invalidate()
+                else:
+                    objects = _build_comments(chunk)
+                    _insert_comments(objects)
+                    added = Counter(comment.news_id for comment in objects)
+                    News.objects.add_comments(added)
+                    for news_id in added:
+                        caching.invalidate(news_id)
+        except IntegrityError as error:
+            raise TransferError(f'записи {first}-{last}: {error}')
+        total += len(objects)
+        if on_chunk is not None:
+            on_chunk(total)
+    return total
@@ -1,16 +1,42 @@
+from django.conf import settings
 from django.urls import path
 
-from news import views
+from news import async_views, views
 
 app_name = 'news'
 
+
+def select_view(route, sync_view, async_view):
+    """Асинхронное представление, если маршрут есть в NEWS_ASYNC_ROUTES."""
+    if route in settings.NEWS_ASYNC_ROUTES:
+        return async_view
+    return sync_view
+
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path(
+        '',
+        select_view('home', views.NewsList.as_view(), async_views.news_list),
+        name='home'
+    ),
+    path(
+        'news/<int:pk>/',
+        select_view(
+            'detail', views.NewsDetailView.as_view(), async_views.news_detail
+        ),
+        name='detail'
+    ),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsComments.as_view(),
+        name='comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path('cache/stats/', views.CacheStats.as_view(), name='cache_stats'),
 ]
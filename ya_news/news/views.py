@@ -1,49 +1,114 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from . import caching, conditions, search, writebehind
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import InvalidCursor, paginate_comments
 
 
+@method_decorator(condition(
+    etag_func=conditions.news_list_etag,
+    last_modified_func=conditions.news_list_last_modified,
+), name='get')
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
 
+    def get(self, request, *args, **kwargs):
+        """Анонимам отдаём главную страницу из кеша."""
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        content = caching.get_home_page()
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda response: caching.set_home_page(response.content)
+        )
+        return response
+
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта,
+        а число комментариев берётся из денормализованного счётчика.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
-
-
-class NewsDetail(generic.DetailView):
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+
+class CommentPageMixin:
+    """Добавляет в контекст страницу комментариев к новости."""
+
+    def get_comment_page(self, news_id, cursor=None):
+        try:
+            comments, next_cursor = paginate_comments(
+                Comment.objects.filter(
+                    news_id=news_id
+                ).select_related('author'),
+                cursor
+            )
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы комментариев.')
+        return {
+            'news_id': news_id,
+            'comments': comments,
+            'next_cursor': next_cursor,
+        }
+
+
+@method_decorator(condition(
+    etag_func=conditions.news_detail_etag,
+    last_modified_func=conditions.news_detail_last_modified,
+), name='get')
+class NewsDetail(CommentPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         if self.request.user.is_authenticated:
+            context.update(self.get_comment_page(self.object.pk))
             context['form'] = CommentForm()
+            return context
+        comments_block = caching.get_comments_block(self.object.pk)
+        if comments_block is None:
+            comment_page = self.get_comment_page(self.object.pk)
+            context.update(comment_page)
+            comments_block = render_to_string(
+                'news/comments.html', comment_page, self.request
+            )
+            caching.set_comments_block(self.object.pk, comments_block)
+        context['comments_block'] = comments_block
+        return context
+
+
+class NewsComments(CommentPageMixin, generic.TemplateView):
+    """Следующая страница комментариев в виде HTML-фрагмента."""
+    template_name = 'news/comments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        writebehind.writer.flush_for(self.request.user)
+        context.update(self.get_comment_page(
+            self.kwargs['pk'], self.request.GET.get('cursor')
+        ))
         return context
 
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -55,21 +120,35 @@ class NewsComment(
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_comment_page(self.object.pk))
+        return context
+
     def form_valid(self, form):
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        if settings.NEWS_COMMENTS_WRITE_BEHIND:
+            writebehind.writer.put(comment)
+        else:
+            with transaction.atomic():
+                comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        """Новость уже загружена в post(), повторно её не читаем."""
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
 
     def get(self, request, *args, **kwargs):
+        # До проверки ETag: автор должен увидеть свой комментарий из
+        # очереди отложенной записи.
+        writebehind.writer.flush_for(request.user)
         view = NewsDetail.as_view()
         return view(request, *args, **kwargs)
 
@@ -83,14 +162,21 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """
+        Адрес строим по уже загруженному комментарию.
+
+        Для удаления это важно: к этому моменту строки в базе может
+        уже не быть.
+        """
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -98,7 +184,72 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def form_valid(self, form):
+        """Меняется только текст - его одного и записываем."""
+        self.object = form.save(commit=False)
+        self.object.save(update_fields=('text',))
+        return redirect(self.get_success_url())
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
+
+class NewsSearch(generic.TemplateView):
+    """Полнотекстовый поиск по новостям и комментариям."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        try:
+            page = int(self.request.GET.get('page', 1))
+        except ValueError:
+            raise Http404('Неверный номер страницы.')
+        if not 1 <= page <= settings.SEARCH_MAX_PAGE:
+            raise Http404('Неверный номер страницы.')
+        per_page = settings.SEARCH_RESULTS_ON_PAGE
+        results = search.search(
+            query, limit=per_page + 1, offset=(page - 1) * per_page
+        )
+        context.update({
+            'query': query,
+            'results': results[:per_page],
+            'page': page,
+            'has_next': (
+                len(results) > per_page and page < settings.SEARCH_MAX_PAGE
+            ),
+        })
+        return context
+
+
+class CacheStats(generic.View):
+    """
+    Счётчики кеша страниц в текстовом формате Prometheus.
+
+    Видны сотрудникам и адресам из NEWS_CACHE_STATS_IPS, остальным -
+    404, чтобы не выдавать существование страницы.
+    """
+
+    def get(self, request, *args, **kwargs):
+        address = request.META.get('REMOTE_ADDR')
+        if (address not in settings.NEWS_CACHE_STATS_IPS
+                and not request.user.is_staff):
+            raise Http404('Страница не найдена.')
+        lines = []
+        for result in caching.RESULTS:
+            metric = f'news_cache_{result}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for block, counters in caching.get_stats().items():
+                lines.append(
+                    f'{metric}{{block="{block}"}} {counters[result]}'
+                )
+        return HttpResponse(
+            '\n'.join(lines) + '\n',
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -0,0 +1,252 @@
+"""
+Отложенная запись комментариев пачками (write-behind).
+
+При NEWS_COMMENTS_WRITE_BEHIND проверенный формой комментарий не
+сохраняется в запросе, а попадает в очередь процесса. Фоновый поток
+записывает очередь одной транзакцией: раз в
+NEWS_COMMENTS_FLUSH_INTERVAL секунд или сразу, как наберётся
+NEWS_COMMENTS_BATCH_SIZE комментариев. Вместо сотни транзакций на
+SQLite, которые ждут друг друга на блокировке записи, выходит одна с
+bulk_create, а счётчики новостей и кеш страниц обновляются по пачке.
+
+Автор видит свой комментарий сразу: страница новости перед чтением
+дописывает очередь, если в ней есть его комментарии (flush_for). Это
+работает в пределах процесса, поэтому с несколькими процессами
+gunicorn запросы пользователя должны попадать в один процесс. Если
+очередь в этот момент пишет фоновый поток дольше
+NEWS_COMMENTS_FLUSH_WAIT секунд или база не отвечает, страница
+показывается без дописывания.
+
+Блокировка и другие временные ошибки базы комментарии не теряют: пачка
+возвращается в начало очереди, и запись повторяется с растущей паузой.
+Если же база отвергает сами данные (IntegrityError, DataError), пачка
+пишется половинами, пока не останутся отдельные комментарии, которые
+не записываются: они отбрасываются с записью в лог и больше не держат
+очередь.
+
+При нормальном завершении процесса очередь дописывается (atexit) с
+повторами в пределах timeout базы, при SIGKILL или падении
+незаписанные комментарии теряются.
+
+Время создания комментария - время записи пачки, а не запроса.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import (
+    DEFAULT_DB_ALIAS, DatabaseError, DataError, IntegrityError,
+    close_old_connections, connections, transaction,
+)
+
+from . import caching
+from .models import Comment, News
+
+logger = logging.getLogger(__name__)
+
+
+def write_comments(comments):
+    """
+    Записывает комментарии одной транзакцией и возвращает их число.
+
+    Комментарии к новостям и от пользователей, удалённых, пока
+    комментарий ждал в очереди, пропускаются. bulk_create не шлёт
+    сигналы, поэтому счётчики и кеш обновляются здесь.
+    """
+    with transaction.atomic():
+        news_ids = set(News.objects.filter(
+            pk__in={comment.news_id for comment in comments}
+        ).values_list('pk', flat=True))
+        author_ids = set(get_user_model().objects.filter(
+            pk__in={comment.author_id for comment in comments}
+        ).values_list('pk', flat=True))
+        comments = [
+            comment for comment in comments
+            if comment.news_id in news_ids and comment.author_id in author_ids
+        ]
+        Comment.objects.bulk_create(comments)
+        added = Counter(comment.news_id for comment in comments)
+        News.objects.add_comments(added)
+        for news_id in added:
+            caching.invalidate(news_id)
+    return len(comments)
+
+
+class CommentWriter:
+    """Очередь комментариев процесса и поток, который её записывает."""
+
+    def __init__(self, background=True):
+        self.background = background
+        self.pending = []
+        # Пачка, которую сейчас записывают: её комментарии ещё не видны
+        # в базе, хотя из очереди уже ушли.
+        self.writing = []
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.thread = None
+        # Сколько раз подряд очередь не записалась из-за ошибки базы.
+        self.failures = 0
+
+    def put(self, comment):
+        with self.condition:
+            self.pending.append(comment)
+            self.condition.notify()
+        if self.background and self.thread is None:
+            self._start()
+
+    def _start(self):
+        with self.condition:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(
+                target=self._run, name='news-comments', daemon=True
+            )
+            self.thread.start()
+
+    def _full(self):
+        return len(self.pending) >= settings.NEWS_COMMENTS_BATCH_SIZE
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                # Копим пачку до интервала или до полного размера.
+                self.condition.wait_for(
+                    self._full, settings.NEWS_COMMENTS_FLUSH_INTERVAL
+                )
+            try:
+                self.flush()
+            except DatabaseError:
+                close_old_connections()
+                # Комментарии вернулись в очередь, повторим позже.
+                with self.condition:
+                    self.condition.wait(self.retry_delay())
+
+    def has_pending(self, author_id):
+        with self.condition:
+            return any(
+                comment.author_id == author_id
+                for comment in self.pending + self.writing
+            )
+
+    def retry_delay(self):
+        """Пауза перед повтором: удваивается с каждой неудачей."""
+        return min(
+            settings.NEWS_COMMENTS_FLUSH_INTERVAL * 2 ** self.failures,
+            settings.NEWS_COMMENTS_RETRY_MAX_DELAY,
+        )
+
+    def flush(self):
+        """
+        Записывает всю очередь и возвращает число комментариев.
+
+        При ошибке базы незаписанные комментарии возвращаются в начало
+        очереди, а исключение поднимается дальше.
+        """
+        with self.flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self.condition:
+            self.writing, self.pending = self.pending, []
+        if not self.writing:
+            return 0
+        try:
+            written = self._write_parts(self.writing)
+        except DatabaseError:
+            self.failures += 1
+            logger.warning(
+                'Комментарии не записаны (%s раз подряд), повторим',
+                self.failures, exc_info=True,
+            )
+            raise
+        finally:
+            with self.condition:
+                self.writing = []
+        self.failures = 0
+        return written
+
+    def _write_parts(self, comments):
+        """
+        Записывает комментарии и возвращает число записанных.
+
+        Пачку, которую база отвергает по данным, пишем половинами;
+        комментарий, который не записывается и сам по себе, отбрасываем
+        с записью в лог. При любой другой ошибке базы все ещё не
+        записанные комментарии возвращаются в начало очереди.
+        """
+        parts = [comments]
+        written = 0
+        while parts:
+            part = parts.pop(0)
+            try:
+                written += write_comments(part)
+            except (IntegrityError, DataError):
+                if len(part) > 1:
+                    middle = len(part) // 2
+                    parts[:0] = [part[:middle], part[middle:]]
+                    continue
+                comment = part[0]
+                logger.exception(
+                    'Комментарий отброшен: новость %s, автор %s, текст %r',
+                    comment.news_id, comment.author_id, comment.text,
+                )
+            except DatabaseError:
+                with self.condition:
+                    self.pending[:0] = [
+                        comment for rest in [part, *parts] for comment in rest
+                    ]
+                raise
+        return written
+
+    def flush_for(self, user):
+        """
+        Дописывает очередь, если в ней есть комментарии user.
+
+        Страница не ждёт фоновый поток дольше NEWS_COMMENTS_FLUSH_WAIT
+        секунд, а ошибка базы не мешает её показать: комментарии
+        остаются в очереди, и их допишет фоновый поток.
+        """
+        if not user.is_authenticated or not self.has_pending(user.pk):
+            return
+        if not self.flush_lock.acquire(
+                timeout=settings.NEWS_COMMENTS_FLUSH_WAIT):
+            return
+        try:
+            self._flush()
+        except DatabaseError:
+            pass
+        finally:
+            self.flush_lock.release()
+
+    def flush_at_exit(self):
+        """
+        Дописывает очередь при выходе из процесса.
+
+        Повторяет запись, пока база заблокирована, но не дольше timeout
+        соединения; что не записалось - попадает в лог.
+        """
+        timeout = connections[DEFAULT_DB_ALIAS].settings_dict[
+            'OPTIONS'
+        ].get('timeout', 5)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.flush()
+                return
+            except DatabaseError:
+                if time.monotonic() >= deadline:
+                    logger.error(
+                        'При выходе потеряно комментариев: %s',
+                        len(self.pending),
+                    )
+                    return
+                time.sleep(self.retry_delay())
+
+
+writer = CommentWriter()
+atexit.register(writer.flush_at_exit)
@@ -1,8 +1,13 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общий код обоих проектов - пакет yacommon в корне репозитория.
+REPO_DIR = BASE_DIR.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.append(str(REPO_DIR))
 
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
@@ -18,9 +23,12 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'news.apps.NewsConfig',
+    'yacommon.apps.CommonConfig',
 ]
 
 MIDDLEWARE = [
+    'yacommon.middleware.RequestMetricsMiddleware',
+    'news.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,6 +56,10 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать все шаблоны при запуске (yacommon/templating.py); имеет
+# смысл с кеширующим загрузчиком, как в settings_prod.
+TEMPLATES_WARMUP = False
+
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
@@ -58,6 +70,51 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения (news/replicas.py): алиасы из DATABASES, с которых
+# читают главная страница, страница новости и списки в админке. Реплика
+# с отставанием больше NEWS_REPLICA_LAG секунд не используется, а
+# пользователь после записи столько же читает основную базу. Файлы
+# реплик SQLite обновляет команда sync_replicas.
+NEWS_REPLICAS = ()
+NEWS_REPLICA_LAG = 2
+NEWS_REPLICA_SYNC_INTERVAL = 0.5
+NEWS_REPLICA_PIN_COOKIE = 'news_primary'
+DATABASE_ROUTERS = ['news.replicas.ReplicaRouter']
+
+# PRAGMA для каждого нового соединения с SQLite (yacommon/db.py); значения
+# для боевого запуска - в settings_prod.
+SQLITE_PRAGMAS = {}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanews',
+        # На новость приходится до трёх ключей (блок комментариев,
+        # валидаторы, отметка изменения); при стандартных 300 записях
+        # кеш вытеснял сам себя уже на сотне новостей.
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Кеш страниц (news/caching.py): алиас из CACHES и время жизни записи в
+# секундах. Сигналы сбрасывают записи только в кеше, который видит
+# изменивший данные процесс: с locmem остальные процессы отдают старую
+# главную страницу, блок комментариев и ответы 304 до NEWS_CACHE_TIMEOUT
+# секунд. Поэтому с несколькими процессами нужен общий кеш, как в
+# settings_prod.
+NEWS_CACHE_ALIAS = 'default'
+NEWS_CACHE_TIMEOUT = 60 * 60
+# Кто видит счётчики кеша (news:cache_stats), кроме сотрудников: адреса
+# REMOTE_ADDR, например сборщика метрик.
+NEWS_CACHE_STATS_IPS = ()
+
+
+# Кеш пользователя для yacommon.auth.CachedModelBackend (включён в
+# settings_prod): алиас из CACHES и время жизни записи в секундах. С
+# несколькими процессами алиас должен указывать на общий кеш, см.
+# yacommon/auth.py.
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = 300
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +137,38 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 20
+
+SEARCH_RESULTS_ON_PAGE = 20
+# Дальше этой страницы поиск отвечает 404.
+SEARCH_MAX_PAGE = 50
+
+# Маршруты news, которые обслуживают асинхронные представления из
+# news/async_views.py (имеет смысл под ASGI): 'home' и/или 'detail'.
+NEWS_ASYNC_ROUTES = ()
+# Потоки для базы и рендера шаблонов у асинхронных представлений.
+NEWS_ASYNC_WORKERS = 8
+
+# Отложенная запись комментариев пачками (news/writebehind.py): очередь
+# процесса записывается раз в NEWS_COMMENTS_FLUSH_INTERVAL секунд или
+# по NEWS_COMMENTS_BATCH_SIZE комментариев. Пока база заблокирована,
+# запись повторяется с паузой, которая удваивается до
+# NEWS_COMMENTS_RETRY_MAX_DELAY секунд. Страница новости ждёт записи
+# очереди не дольше NEWS_COMMENTS_FLUSH_WAIT секунд.
+NEWS_COMMENTS_WRITE_BEHIND = False
+NEWS_COMMENTS_FLUSH_INTERVAL = 0.005
+NEWS_COMMENTS_BATCH_SIZE = 100
+NEWS_COMMENTS_RETRY_MAX_DELAY = 1.0
+NEWS_COMMENTS_FLUSH_WAIT = 0.1
+
+# Файл с дополнительными запрещёнными словами, по одному в строке.
+BAD_WORDS_FILE = None
+
+# Замеры RequestMetricsMiddleware: Server-Timing и перцентили по
+# представлениям (команда request_metrics). Замеры процесса пишутся в
+# REQUEST_METRICS_DIR раз в REQUEST_METRICS_FLUSH_INTERVAL секунд.
+REQUEST_METRICS_ENABLED = False
+REQUEST_METRICS_DIR = BASE_DIR / 'request_metrics'
+REQUEST_METRICS_SAMPLES = 1000
+REQUEST_METRICS_FLUSH_INTERVAL = 10
@@ -0,0 +1,74 @@
+"""
+Профиль для боевого запуска: DJANGO_SETTINGS_MODULE=yanews.settings_prod.
+
+SQLite работает в режиме WAL (PRAGMA - yacommon/db.py), а atomic()
+сразу берёт блокировку записи (yacommon/backends/sqlite3). Соединения
+переживают запрос (CONN_MAX_AGE).
+
+Шаблоны разбираются один раз на процесс кеширующим загрузчиком, причём
+все сразу при запуске (TEMPLATES_WARMUP), а не на первых запросах.
+
+Сессия и пользователь берутся из кеша, так что авторизованный запрос
+при попадании в кеш не читает ни django_session, ни auth_user. Кеш для
+них и для страниц общий у всех процессов (файлы в SHARED_CACHE_DIR):
+выход, смена пароля или новый комментарий в одном процессе сразу
+действуют и в остальных.
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, CACHES, DATABASES, TEMPLATES
+
+# После .settings: она добавляет в sys.path корень репозитория.
+from yacommon.db import PROD_PRAGMAS
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        # BEGIN IMMEDIATE вместо BEGIN в atomic().
+        'ENGINE': 'yacommon.backends.sqlite3',
+        'CONN_MAX_AGE': 600,
+        # Ожидание блокировки в модуле sqlite3, в секундах.
+        'OPTIONS': {'timeout': 20},
+    },
+}
+
+SQLITE_PRAGMAS = PROD_PRAGMAS
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    # Вместе с явными loaders APP_DIRS должна быть выключена.
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+TEMPLATES_WARMUP = True
+
+# Сессии в кеше с записью в базу. Вариант без хранилища вовсе -
+# 'django.contrib.sessions.backends.signed_cookies': данные сессии
+# подписываются и лежат в cookie, но их нельзя отозвать на сервере.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTHENTICATION_BACKENDS = ['yacommon.auth.CachedModelBackend']
+# Сессии, пользователи и страницы - в кеше, общем для процессов на этой
+# машине (почему - в yacommon/auth.py и у NEWS_CACHE_ALIAS в
+# settings.py). Для нескольких машин сюда нужен сетевой кеш (memcached,
+# redis).
+SHARED_CACHE_DIR = BASE_DIR / '.cache' / 'shared'
+CACHES = {
+    **CACHES,
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': SHARED_CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+SESSION_CACHE_ALIAS = 'shared'
+AUTH_USER_CACHE_ALIAS = 'shared'
+NEWS_CACHE_ALIAS = 'shared'
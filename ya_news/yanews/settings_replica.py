@@ -0,0 +1,19 @@
+"""
+Профиль с репликой для чтения: DJANGO_SETTINGS_MODULE=yanews.settings_replica.
+
+Реплика - файл db_replica.sqlite3 рядом с основной базой. Копию
+основной базы в него каждые NEWS_REPLICA_SYNC_INTERVAL секунд делает
+команда, запущенная рядом с сервером:
+    python manage.py sync_replicas
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES
+
+DATABASES = {
+    **DATABASES,
+    'replica': {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+    },
+}
+NEWS_REPLICAS = ('replica',)
@@ -0,0 +1,28 @@
+"""
+Профиль для тестов: DJANGO_SETTINGS_MODULE=yanews.settings_test.
+
+Пароли хешируются MD5: PBKDF2 с сотнями тысяч итераций тратит заметное
+время на каждые create_user, регистрацию и вход.
+
+Тестовую базу выбирает переменная окружения TEST_DB: memory (по
+умолчанию), nomigrations или reuse - см. yacommon/testdb.py.
+"""
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES
+
+# После .settings: она добавляет в sys.path корень репозитория.
+from yacommon import testdb
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+TEST_DB = os.environ.get('TEST_DB', 'memory')
+TEST_DATABASE, SQLITE_PRAGMAS = testdb.database_settings(TEST_DB, BASE_DIR)
+
+DATABASES = {
+    'default': {**DATABASES['default'], 'TEST': TEST_DATABASE},
+    # Реплика для тестов news/replicas.py - та же тестовая база; по
+    # умолчанию NEWS_REPLICAS пуст и она не используется.
+    'replica': {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}},
+}
@@ -0,0 +1,29 @@
+"""Валидаторы для условных GET-запросов к заметкам."""
+from .models import Note
+
+
+def _get_modified(request, slug):
+    """
+    Дата изменения заметки текущего пользователя.
+
+    Результат запоминается на запросе, чтобы ETag и Last-Modified
+    обошлись одним лёгким запросом до построения страницы.
+    """
+    if not hasattr(request, '_note_modified'):
+        request._note_modified = Note.objects.filter(
+            author=request.user, slug=slug
+        ).values_list('pk', 'modified').first()
+    return request._note_modified
+
+
+def note_etag(request, slug, *args, **kwargs):
+    state = _get_modified(request, slug)
+    if state is None:
+        return None
+    pk, modified = state
+    return f'{pk}-{modified.timestamp()}'
+
+
+def note_last_modified(request, slug, *args, **kwargs):
+    state = _get_modified(request, slug)
+    return None if state is None else state[1]
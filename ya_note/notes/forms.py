@@ -1,5 +1,3 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
@@ -16,14 +14,27 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
+        """
+        Обрабатывает случай, если slug не уникален.
+
+        Пустой slug не проверяем: свободный вариант из заголовка подберёт
+        Note.save.
+        """
         cleaned_data = super().clean()
         slug = cleaned_data.get('slug')
         if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
+            return slug
         if Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+
+class NotesImportForm(forms.Form):
+    """Загрузка заметок из файла выгрузки."""
+
+    file = forms.FileField(
+        label='Файл',
+        help_text='JSON Lines (.jsonl) или zip с файлами Markdown (.zip)'
+    )
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes import transfer
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в JSON Lines или zip с Markdown.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Имя пользователя.')
+        parser.add_argument('path', help='Путь к файлу выгрузки.')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        file_format = (
+            options['format'] or transfer.guess_format(options['path'])
+        )
+        try:
+            with open(options['path'], 'wb') as stream:
+                for chunk in transfer.export_notes(author, file_format):
+                    stream.write(chunk)
+        except OSError as error:
+            raise CommandError(error)
+        self.stdout.write(f'Заметки выгружены в {options["path"]}.')
@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes import transfer
+
+
+class Command(BaseCommand):
+    help = 'Загружает заметки пользователю из выгрузки export_notes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Имя пользователя.')
+        parser.add_argument('path', help='Путь к файлу выгрузки.')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=transfer.CHUNK_SIZE,
+            help='Сколько заметок вставлять в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        file_format = (
+            options['format'] or transfer.guess_format(options['path'])
+        )
+        try:
+            with open(options['path'], 'rb') as stream:
+                created, renamed = transfer.import_notes(
+                    author, transfer.read_notes(stream, file_format),
+                    options['chunk_size']
+                )
+        except (OSError, transfer.TransferError) as error:
+            raise CommandError(error)
+        self.stdout.write(
+            f'Загружено заметок: {created}, из них с новым slug: {renamed}.'
+        )
@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', help='Имя пользователя; по умолчанию все заметки.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько заметок индексировать за одну транзакцию.'
+        )
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('Поиск работает только на SQLite с FTS5.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        author_id = None
+        if options['user']:
+            try:
+                author_id = get_user_model().objects.get(
+                    username=options['user']
+                ).pk
+            except get_user_model().DoesNotExist:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден.'
+                )
+        search.install()
+        total = search.reindex(author_id, batch_size=options['batch_size'])
+        self.stdout.write(f'Проиндексировано заметок: {total}.')
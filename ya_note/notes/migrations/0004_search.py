@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Схема поиска на момент миграции: notes.search может меняться дальше,
+# а миграция должна создавать то же, что и раньше.
+SCHEMA = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS notes_note_fts USING fts5('
+    "author, title, text, tokenize='unicode61 remove_diacritics 2', "
+    "prefix='2 3')",
+    'DELETE FROM notes_note_fts',
+    'INSERT INTO notes_note_fts(rowid, author, title, text) '
+    "SELECT id, 'u' || author_id, title, text FROM notes_note",
+)
+DROP_SCHEMA = ('DROP TABLE IF EXISTS notes_note_fts',)
+
+
+def execute(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(execute(SCHEMA), execute(DROP_SCHEMA)),
+    ]
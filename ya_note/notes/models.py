@@ -1,7 +1,11 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .slugs import allocate_slug
+
+# Сколько раз подбирать slug заново, если параллельный запрос занял его
+# между подбором и вставкой.
+SLUG_ATTEMPTS = 5
 
 
 class Note(models.Model):
@@ -27,12 +31,31 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    modified = models.DateTimeField('Изменена', auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Пустой slug заполняется первым свободным вариантом из заголовка.
+
+        Если между подбором и вставкой slug занял параллельный запрос,
+        уникальный индекс вернёт IntegrityError, и slug подбирается снова.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = allocate_slug(self.title, exclude_pk=self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_ATTEMPTS - 1:
+                    raise
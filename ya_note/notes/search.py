@@ -0,0 +1,159 @@
+"""
+Полнотекстовый поиск по заметкам на SQLite FTS5.
+
+notes_note_fts хранит копию заголовка и текста каждой заметки под тем же
+rowid, что и сама заметка, плюс служебный столбец author с токеном
+автора. Фильтр по автору задаётся прямо в запросе MATCH, поэтому FTS5
+перебирает только заметки текущего пользователя. Индекс обновляется
+сигналами при Note.save и удалении, а команда reindex_notes
+перестраивает его для одного или всех пользователей пачками.
+"""
+from django.db import connection, transaction
+
+from yacommon.fts import CONTROL_CHARS, highlight
+
+from .models import Note
+
+SCHEMA = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS notes_note_fts USING fts5('
+    "author, title, text, tokenize='unicode61 remove_diacritics 2', "
+    "prefix='2 3')",
+)
+DROP_SCHEMA = ('DROP TABLE IF EXISTS notes_note_fts',)
+
+
+# Вес столбца author нулевой: он только фильтрует, но не влияет на ранг.
+SEARCH_SQL = '''
+SELECT note.id, note.slug, note.title,
+       snippet(notes_note_fts, 2, char(2), char(3), '…', 16) AS snippet
+FROM notes_note_fts
+JOIN notes_note AS note ON note.id = notes_note_fts.rowid
+WHERE notes_note_fts MATCH %s AND note.author_id = %s
+ORDER BY bm25(notes_note_fts, 0.0, 10.0, 1.0)
+LIMIT %s OFFSET %s
+'''
+INSERT_SQL = (
+    'INSERT OR REPLACE INTO notes_note_fts(rowid, author, title, text) '
+    "SELECT id, 'u' || author_id, title, text FROM notes_note "
+)
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(using=connection):
+    """Создаёт индекс (повторный вызов ничего не меняет)."""
+    if not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+
+def uninstall(using=connection):
+    if not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        for statement in DROP_SCHEMA:
+            cursor.execute(statement)
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def index_notes(note_ids):
+    """Заново индексирует заметки с указанными id одним запросом."""
+    note_ids = list(note_ids)
+    if not note_ids or not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{INSERT_SQL} WHERE id IN ({_placeholders(note_ids)})',
+            note_ids
+        )
+
+
+def unindex_notes(note_ids):
+    note_ids = list(note_ids)
+    if not note_ids or not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'DELETE FROM notes_note_fts '
+            f'WHERE rowid IN ({_placeholders(note_ids)})',
+            note_ids
+        )
+
+
+def reindex(author_id=None, batch_size=1000):
+    """
+    Перестраивает индекс всех заметок или заметок одного автора.
+
+    Заметки обходятся пачками по batch_size в порядке id, каждая пачка -
+    отдельная короткая транзакция. Возвращает число проиндексированных
+    заметок.
+    """
+    notes = Note.objects.order_by('id')
+    if author_id is None:
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM notes_note_fts')
+    else:
+        notes = notes.filter(author_id=author_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM notes_note_fts WHERE author MATCH %s',
+                (f'"u{author_id}"',)
+            )
+    last_id = 0
+    total = 0
+    while True:
+        note_ids = list(notes.filter(
+            id__gt=last_id
+        ).values_list('id', flat=True)[:batch_size])
+        if not note_ids:
+            return total
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'{INSERT_SQL} WHERE id IN ({_placeholders(note_ids)})',
+                    note_ids
+                )
+        total += len(note_ids)
+        last_id = note_ids[-1]
+
+
+def to_match_query(query, author_id):
+    """
+    Запрос FTS5: слова ищутся по префиксу и объединяются через AND.
+
+    Каждое слово берётся в кавычки, так что операторы FTS5 из ввода не
+    интерпретируются. Управляющие символы считаются пробелами.
+    """
+    terms = ' '.join(
+        '"{}"*'.format(term.replace('"', '""'))
+        for term in CONTROL_CHARS.sub(' ', query).split()
+    )
+    if not terms:
+        return None
+    return f'author : "u{author_id}" AND {{title text}} : ({terms})'
+
+
+def search(query, author_id, limit, offset=0):
+    """
+    Заметки автора по запросу, лучшие совпадения первыми.
+
+    Возвращает список словарей с ключами id, slug, title и snippet
+    (безопасный HTML с подсветкой совпадений).
+    """
+    match_query = to_match_query(query, author_id)
+    if match_query is None or not is_supported():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, (match_query, author_id, limit, offset))
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    for row in rows:
+        row['snippet'] = highlight(row['snippet'])
+    return rows
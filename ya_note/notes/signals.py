@@ -0,0 +1,30 @@
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import Note
+
+
+@receiver(post_save, sender=Note)
+def index_note(sender, instance, raw=False, **kwargs):
+    """Обновляем заметку в поисковом индексе после сохранения."""
+    if not raw:
+        search.index_notes([instance.pk])
+
+
+@receiver(post_delete, sender=Note)
+def unindex_note(sender, instance, **kwargs):
+    """Убираем удалённую заметку из поискового индекса."""
+    search.unindex_notes([instance.pk])
+
+
+@receiver(post_migrate)
+def install_search(sender, using, **kwargs):
+    """Создаём индекс поиска, если таблицы созданы без миграций."""
+    if sender.name != 'notes':
+        return
+    module, _ = MigrationLoader.migrations_module(sender.label)
+    if module is None:
+        search.install(connections[using])
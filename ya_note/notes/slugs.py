@@ -0,0 +1,133 @@
+"""
+Подбор свободных slug для заметок.
+
+Для заголовка берётся базовый slug (slugify, обрезанный до длины поля),
+а при занятости - первый свободный вариант с суффиксом: my-note, my-note-2,
+my-note-3 и т.д. Все занятые варианты читаются одним запросом по
+уникальному индексу на slug (сам slug и диапазон slug-...), в том числе
+сразу для пачки заголовков.
+"""
+import re
+
+from django.db import connection
+from pytils.translit import slugify
+
+# Место под суффикс вида -1234567890 при обрезке длинных slug.
+SUFFIX_RESERVE = 11
+# Сколько диапазонов объединять в один запрос при массовом подборе.
+BULK_CHUNK_SIZE = 200
+# Символы шаблона GLOB; в квадратных скобках они значат сами себя.
+GLOB_SPECIAL = re.compile(r'([*?[])')
+
+
+def _max_length():
+    from .models import Note
+
+    return Note._meta.get_field('slug').max_length
+
+
+def base_slug(title):
+    return slugify(title)[:_max_length()]
+
+
+def _glob_literal(text):
+    """Текст как шаблон GLOB, совпадающий только с самим собой."""
+    return GLOB_SPECIAL.sub(r'[\1]', text)
+
+
+def _condition(base):
+    """
+    Условие SQL на все варианты slug для base.
+
+    Диапазон по индексу выбирает slug с нужным началом, а GLOB
+    оставляет из них только основу и варианты с числовым суффиксом:
+    base-2, но не base-note. Короткая основа с суффиксом не обрезается,
+    и для неё после дефиса допускаются одни цифры. У длинной основы
+    суффикс отрезает конец, поэтому для неё читается диапазон по
+    обрезанной основе, а GLOB требует в конце дефис с цифрой.
+    """
+    stem_length = _max_length() - SUFFIX_RESERVE
+    if len(base) <= stem_length:
+        pattern = _glob_literal(base) + '-'
+        return (
+            '(slug = %s OR (slug >= %s AND slug < %s '
+            'AND slug GLOB %s AND slug NOT GLOB %s))',
+            [
+                base, base + '-', base + '-\uffff',
+                pattern + '[0-9]*', pattern + '*[^0-9]*',
+            ],
+        )
+    stem = base[:stem_length]
+    return (
+        '(slug = %s OR (slug >= %s AND slug < %s AND slug GLOB %s))',
+        [base, stem, stem + '\uffff', _glob_literal(stem) + '*-[0-9]*'],
+    )
+
+
+def _candidates(base):
+    yield base
+    max_length = _max_length()
+    number = 2
+    while True:
+        suffix = f'-{number}'
+        yield base[:max_length - len(suffix)] + suffix
+        number += 1
+
+
+def _first_free(base, taken):
+    for candidate in _candidates(base):
+        if candidate not in taken:
+            return candidate
+
+
+def _taken_slugs(bases, exclude_pk=None):
+    """
+    Все занятые варианты slug для любой из основ.
+
+    Условие собирается строкой SQL: QuerySet.filter сравнивает каждое
+    новое условие со всеми уже добавленными, и на сотнях основ это
+    квадратично по времени.
+    """
+    from .models import Note
+
+    bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(bases), BULK_CHUNK_SIZE):
+        conditions = [
+            _condition(base)
+            for base in bases[start:start + BULK_CHUNK_SIZE]
+        ]
+        where = ' OR '.join(sql for sql, _ in conditions)
+        params = [value for _, values in conditions for value in values]
+        sql = f'SELECT slug FROM {Note._meta.db_table} WHERE ({where})'
+        if exclude_pk is not None:
+            sql += ' AND id <> %s'
+            params.append(exclude_pk)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            taken.update(slug for slug, in cursor.fetchall())
+    return taken
+
+
+def allocate_slug(title, exclude_pk=None):
+    """Свободный slug для заголовка за один запрос."""
+    base = base_slug(title)
+    return _first_free(base, _taken_slugs([base], exclude_pk))
+
+
+def allocate_slugs(titles, reserved=()):
+    """
+    Свободные и попарно различные slug для списка заголовков.
+
+    Занятые варианты читаются по BULK_CHUNK_SIZE основ за запрос, а не
+    по запросу на заметку. reserved - slug, которые уже заняты
+    (например, явно указаны в импортируемых данных).
+    """
+    bases = [base_slug(title) for title in titles]
+    taken = _taken_slugs(bases) | set(reserved)
+    slugs = []
+    for base in bases:
+        slug = _first_free(base, taken)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+class QueryBudgetMixin:
+    """
+    Проверка бюджета SQL-запросов на запрос к адресу.
+
+    Бюджет берётся из QUERY_BUDGETS по имени маршрута; при превышении
+    тест падает со списком выполненных запросов.
+    """
+
+    # Наибольшее число SQL-запросов на один GET по имени маршрута. Сессия
+    # и пользователь - это два запроса для авторизованного клиента.
+    QUERY_BUDGETS = {
+        'notes:home': 2,
+        'notes:add': 2,
+        'notes:list': 3,
+        'notes:success': 2,
+        'notes:edit': 3,
+        'notes:detail': 4,
+        'notes:delete': 3,
+        'notes:search': 3,
+        'notes:export': 2,
+        'notes:import': 2,
+        'users:login': 2,
+        'users:signup': 2,
+        'users:logout': 4,
+    }
+
+    @contextmanager
+    def assert_query_budget(self, url):
+        view_name = resolve(urlsplit(url).path).view_name
+        budget = self.QUERY_BUDGETS[view_name]
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        if len(context) > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(context.captured_queries, 1)
+            )
+            self.fail(
+                f'{view_name}: {len(context)} SQL-запросов при бюджете '
+                f'{budget}:\n{queries}'
+            )
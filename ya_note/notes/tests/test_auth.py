@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yacommon.auth import CachedModelBackend
+from notes.models import Note
+from yanote import settings_prod
+
+
+@override_settings(
+    SESSION_ENGINE=settings_prod.SESSION_ENGINE,
+    AUTHENTICATION_BACKENDS=settings_prod.AUTHENTICATION_BACKENDS,
+)
+class TestCachedAuth(TestCase):
+    """Тестирование сессий и пользователя из кеша."""
+
+    LIST_URL = reverse('notes:list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        Note.objects.create(
+            title='Заголовок', text='Текст', slug='note', author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_cache_hit_skips_session_and_user(self):
+        """Проверить, что список заметок при попадании в кеш - один запрос."""
+        self.client.get(self.LIST_URL)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.LIST_URL)
+        self.assertEqual(response.context['user'], self.author)
+
+    def test_user_save_invalidates_cache(self):
+        """Проверить, что сохранение пользователя сбрасывает кеш."""
+        backend = CachedModelBackend()
+        backend.get_user(self.author.pk)
+        self.author.first_name = 'Новое имя'
+        self.author.save()
+        self.assertEqual(
+            backend.get_user(self.author.pk).first_name, 'Новое имя'
+        )
+
+    def test_password_change_ends_cached_sessions(self):
+        """Проверить, что смена пароля завершает сессию и в кеше."""
+        self.client.get(self.LIST_URL)
+        self.author.set_password('новый-пароль')
+        self.author.save()
+        response = self.client.get(self.LIST_URL)
+        self.assertEqual(response.status_code, 302)
+
+    def test_prod_shares_session_and_user_cache(self):
+        """Проверить, что в боевом профиле кеш сессий и пользователей общий."""
+        for alias in (
+            settings_prod.SESSION_CACHE_ALIAS,
+            settings_prod.AUTH_USER_CACHE_ALIAS,
+        ):
+            self.assertNotIn(
+                'locmem', settings_prod.CACHES[alias]['BACKEND']
+            )
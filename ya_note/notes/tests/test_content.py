@@ -1,5 +1,7 @@
+from http import HTTPStatus
+
 from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from notes.forms import NoteForm
@@ -18,6 +20,7 @@ class TestContent(TestCase):
     NOTE_LIST_URL = reverse('notes:list')
     ADD_NOTE_URL = reverse('notes:add')
     EDIT_NOTE_URL = reverse('notes:edit', args=(SLUG,))
+    DETAIL_NOTE_URL = reverse('notes:detail', args=(SLUG,))
 
     @classmethod
     def setUpTestData(cls):
@@ -70,6 +73,46 @@ class TestContent(TestCase):
         self.assertEqual(note.title, self.note.title, 'Неверный заголовок!')
         self.assertEqual(note.text, self.note.text, 'Текст заметки неверен!')
 
+    @override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+    def test_notes_list_keyset_pagination(self):
+        """
+        Проверить, что список заметок отдаётся страницами по курсору,
+        читает только поля, нужные шаблону, а полная страница со
+        следующей за ней обходится одним запросом заметок.
+        """
+        for index in range(2):
+            Note.objects.create(title=f'заметка_{index}', text=self.TEXT,
+                                author=self.author, slug=f'slug_{index}')
+        expected = list(Note.objects.filter(
+            author=self.author
+        ).order_by('id').values_list('id', flat=True))
+        # Сессия, пользователь и страница заметок.
+        with self.assertNumQueries(3):
+            response = self.author_client.get(self.NOTE_LIST_URL)
+        notes = list(response.context['object_list'])
+        self.assertEqual(len(notes), 2)
+        self.assertIn('text', notes[0].get_deferred_fields())
+        seen = [note.id for note in notes]
+        cursor = response.context['next_cursor']
+        while cursor:
+            response = self.author_client.get(
+                self.NOTE_LIST_URL, {'after': cursor}
+            )
+            seen += [note.id for note in response.context['object_list']]
+            cursor = response.context['next_cursor']
+        self.assertEqual(seen, expected)
+
+    def test_notes_list_invalid_cursor(self):
+        """Проверить, что неверный курсор приводит к 404."""
+        for after in ('мусор', '9' * 30):
+            with self.subTest(after=after):
+                response = self.author_client.get(
+                    self.NOTE_LIST_URL, {'after': after}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_FOUND
+                )
+
     def test_note_creation_and_editing_pages_transferred_on_form(self):
         """
         Проверить, что страницы создания и
@@ -81,3 +124,28 @@ class TestContent(TestCase):
                 response = self.author_client.get(url)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+    def test_note_detail_conditional_get(self):
+        """
+        Проверить, что страница заметки отдаёт ETag и Last-Modified
+        и отвечает 304, пока заметка не изменилась.
+        """
+        response = self.author_client.get(self.DETAIL_NOTE_URL)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        with self.assertNumQueries(3):
+            response = self.author_client.get(
+                self.DETAIL_NOTE_URL, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        response = self.author_client.get(
+            self.DETAIL_NOTE_URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        note = Note.objects.get(pk=self.note.pk)
+        note.text = 'новый_текст'
+        note.save()
+        response = self.author_client.get(
+            self.DETAIL_NOTE_URL, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
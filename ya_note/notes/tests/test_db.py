@@ -0,0 +1,58 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+from yacommon.backends.sqlite3.base import DatabaseWrapper as ImmediateWrapper
+from yanote import settings_prod
+
+
+class TestSqliteProfile(SimpleTestCase):
+    """Тестирование профиля SQLite для боевого запуска."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = str(Path(directory.name) / 'db.sqlite3')
+        self.wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': self.name},
+            alias='pragmas',
+        )
+        self.addCleanup(self.wrapper.close)
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS=settings_prod.SQLITE_PRAGMAS)
+    def test_prod_pragmas_applied(self):
+        """Проверить, что PRAGMA профиля применяются к новому соединению."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('busy_timeout'), 20000)
+        self.assertEqual(self.pragma('synchronous'), 1)
+
+    def test_default_profile_keeps_sqlite_defaults(self):
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
+
+    def test_immediate_backend_locks_on_begin(self):
+        """Проверить, что транзакция сразу берёт блокировку записи."""
+        wrapper = ImmediateWrapper(
+            {**connection.settings_dict, 'NAME': self.name},
+            alias='immediate',
+        )
+        self.addCleanup(wrapper.close)
+        other = sqlite3.connect(self.name, timeout=0)
+        self.addCleanup(other.close)
+        wrapper._start_transaction_under_autocommit()
+        with self.assertRaisesRegex(sqlite3.OperationalError, 'locked'):
+            other.execute('BEGIN IMMEDIATE')
+
+    def test_prod_profile_keeps_connections(self):
+        database = settings_prod.DATABASES['default']
+        self.assertEqual(database['ENGINE'], 'yacommon.backends.sqlite3')
+        self.assertGreater(database['CONN_MAX_AGE'], 0)
+        self.assertGreater(database['OPTIONS']['timeout'], 0)
@@ -1,12 +1,16 @@
 from http import HTTPStatus
+from unittest import mock
 
 from django.contrib.auth.models import User
 from django.test import Client, TestCase
 from django.urls import reverse
 from pytils.translit import slugify
 
+from notes import models as notes_models
 from notes.forms import WARNING
 from notes.models import Note
+from notes import slugs as notes_slugs
+from notes.slugs import allocate_slugs
 
 
 class TestCreateNote(TestCase):
@@ -143,6 +147,106 @@ class TestCreateNote(TestCase):
         self.assertEqual(note.author, self.user, 'Автор неверен!')
 
 
+class TestSlugAllocation(TestCase):
+    """Тестирование подбора свободного slug."""
+
+    TITLE = 'Моя заметка'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='автор_заметки')
+        cls.base = slugify(cls.TITLE)
+
+    def test_auto_slug_gets_next_free_suffix(self):
+        """Проверить, что занятый slug получает первый свободный суффикс."""
+        Note.objects.create(title=self.TITLE, text='текст', author=self.user)
+        Note.objects.create(title='другая', text='текст', author=self.user,
+                            slug=f'{self.base}-3')
+        # Подбор slug, SAVEPOINT, INSERT, запись в поисковый индекс
+        # и RELEASE SAVEPOINT.
+        with self.assertNumQueries(5):
+            second = Note.objects.create(
+                title=self.TITLE, text='текст', author=self.user
+            )
+        third = Note.objects.create(
+            title=self.TITLE, text='текст', author=self.user
+        )
+        self.assertEqual(second.slug, f'{self.base}-2')
+        self.assertEqual(third.slug, f'{self.base}-4')
+
+    def test_auto_slug_retries_after_concurrent_insert(self):
+        """
+        Проверить, что slug подбирается заново, если его успел
+        занять параллельный запрос.
+        """
+        Note.objects.create(title=self.TITLE, text='текст', author=self.user)
+        with mock.patch.object(
+                notes_models, 'allocate_slug',
+                side_effect=[self.base, f'{self.base}-2']
+        ):
+            note = Note.objects.create(
+                title=self.TITLE, text='текст', author=self.user
+            )
+        self.assertEqual(note.slug, f'{self.base}-2')
+
+    def test_bulk_allocation_single_query(self):
+        """
+        Проверить, что пачка slug подбирается одним запросом
+        и все они различны.
+        """
+        Note.objects.create(title=self.TITLE, text='текст', author=self.user)
+        titles = [self.TITLE] * 3 + ['Другая заметка', 'Третья']
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(titles)
+        self.assertEqual(
+            slugs[:3],
+            [f'{self.base}-2', f'{self.base}-3', f'{self.base}-4']
+        )
+        self.assertEqual(len(set(slugs)), len(titles))
+
+    def test_taken_slugs_only_variants_of_base(self):
+        """
+        Проверить, что подбор читает только варианты основы, а не все
+        slug с тем же началом.
+        """
+        for slug in (
+            self.base, f'{self.base}-2', f'{self.base}ka',
+            f'{self.base}-note', f'{self.base}-2-note',
+        ):
+            Note.objects.create(
+                title='другая', text='текст', author=self.user, slug=slug
+            )
+        self.assertEqual(
+            notes_slugs._taken_slugs([self.base]),
+            {self.base, f'{self.base}-2'}
+        )
+
+    def test_long_title_gets_truncated_suffix(self):
+        """Проверить, что у длинного slug суффикс заменяет конец."""
+        title = 'заметка ' * 20
+        first = Note.objects.create(
+            title=title, text='текст', author=self.user
+        )
+        second = Note.objects.create(
+            title=title, text='текст', author=self.user
+        )
+        self.assertEqual(second.slug, first.slug[:-2] + '-2')
+
+    def test_taken_slugs_of_long_base_need_numeric_suffix(self):
+        """
+        Проверить, что у длинной основы читаются только варианты с
+        числовым суффиксом.
+        """
+        base = notes_slugs.base_slug('заметка ' * 20)
+        for slug in (base, base[:-2] + '-2', base[:-2] + '-x'):
+            Note.objects.create(
+                title='другая', text='текст', author=self.user, slug=slug
+            )
+        self.assertEqual(
+            notes_slugs._taken_slugs([base]), {base, base[:-2] + '-2'}
+        )
+
+
 class TestNoteEdit(TestCase):
     """Тестирование редактирования заметки."""
 
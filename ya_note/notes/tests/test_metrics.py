@@ -0,0 +1,51 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yacommon.middleware import recorder
+
+
+class TestRequestMetrics(TestCase):
+    """Тестирование замеров RequestMetricsMiddleware."""
+
+    NOTES_LIST_URL = reverse('notes:list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='автор_заметки')
+
+    def setUp(self):
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        settings_override = override_settings(
+            REQUEST_METRICS_ENABLED=True,
+            REQUEST_METRICS_DIR=metrics_dir.name,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        recorder.clear()
+        self.addCleanup(recorder.clear)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_server_timing_header(self):
+        """Проверить, что ответ содержит заголовок Server-Timing."""
+        response = self.author_client.get(self.NOTES_LIST_URL)
+        for name in ('db;dur=', 'tpl;dur=', 'total;dur='):
+            self.assertIn(name, response['Server-Timing'])
+
+    def test_request_metrics_command(self):
+        """Проверить, что команда собирает перцентили по представлениям."""
+        for _ in range(3):
+            self.author_client.get(self.NOTES_LIST_URL)
+        recorder.flush()
+        stdout = StringIO()
+        call_command('request_metrics', '--json', stdout=stdout)
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report['notes:list']['requests'], 3)
+        self.assertGreaterEqual(report['notes:list']['queries_p50'], 3)
@@ -0,0 +1,63 @@
+from unittest import skipIf
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from yacommon.plans import bad_plans
+
+
+@skipIf(connection.vendor != 'sqlite', 'Планы запросов SQLite.')
+class TestQueryPlans(TestCase):
+    """Проверка планов запросов всех страниц приложения 'Заметки'."""
+
+    SLUG = 'slug'
+
+    urls = (
+        reverse('notes:home'),
+        reverse('notes:add'),
+        reverse('notes:list'),
+        reverse('notes:success'),
+        reverse('notes:edit', args=(SLUG,)),
+        reverse('notes:detail', args=(SLUG,)),
+        reverse('notes:delete', args=(SLUG,)),
+        reverse('users:login'),
+        reverse('users:signup'),
+        reverse('users:logout'),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='автор_заметки')
+        Note.objects.create(
+            title='заголовок_заметки',
+            text='текст_заметки',
+            slug=cls.SLUG,
+            author=cls.author,
+        )
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def collect_selects(self, url):
+        queries = []
+
+        def capture(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith('SELECT'):
+                queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            self.author_client.get(url)
+        return queries
+
+    def test_view_queries_use_indexes(self):
+        """
+        Проверить, что ни один запрос страниц не читает таблицу
+        целиком и не сортирует во временном B-дереве.
+        """
+        for url in self.urls:
+            with self.subTest(url=url):
+                plans = bad_plans(self.collect_selects(url))
+                self.assertFalse(plans, '\n\n'.join(plans))
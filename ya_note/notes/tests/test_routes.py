@@ -5,9 +5,10 @@ from django.contrib.auth.models import User
 from django.urls import reverse
 
 from notes.models import Note
+from notes.tests.mixins import QueryBudgetMixin
 
 
-class TestRoutes(TestCase):
+class TestRoutes(QueryBudgetMixin, TestCase):
     """Тестирование роуминга приложения 'Заметки'."""
 
     AUTHOR = 'автор_заметки'
@@ -26,6 +27,9 @@ class TestRoutes(TestCase):
     NOTES_EDIT_URL = reverse('notes:edit', args=(SLUG,))
     NOTES_DETAIL_URL = reverse('notes:detail', args=(SLUG,))
     NOTES_DELETE_URL = reverse('notes:delete', args=(SLUG,))
+    NOTES_SEARCH_URL = reverse('notes:search') + '?q=note'
+    NOTES_EXPORT_URL = reverse('notes:export')
+    NOTES_IMPORT_URL = reverse('notes:import')
 
     urls = (
         NOTES_HOME_URL,
@@ -35,6 +39,9 @@ class TestRoutes(TestCase):
         NOTES_ADD_URL,
         NOTES_LIST_URL,
         NOTES_SUCCESS_URL,
+        NOTES_SEARCH_URL,
+        NOTES_EXPORT_URL,
+        NOTES_IMPORT_URL,
         USERS_LOGIN_URL,
         USERS_SIGNUP_URL,
         USERS_LOGOUT_URL,
@@ -60,7 +67,7 @@ class TestRoutes(TestCase):
     def test_page_for_author(self):
         """Проверка доступности страниц для пользователя автора."""
         for url in self.urls:
-            with self.subTest(url=url):
+            with self.subTest(url=url), self.assert_query_budget(url):
                 response = self.author_client.get(url)
                 self.assertEqual(response.status_code, HTTPStatus.OK)
 
@@ -70,8 +77,8 @@ class TestRoutes(TestCase):
             self.NOTES_EDIT_URL, self.NOTES_DELETE_URL, self.NOTES_DETAIL_URL
         )
         for url in self.urls:
-            response = self.user_client.get(url)
-            with self.subTest(url=url):
+            with self.subTest(url=url), self.assert_query_budget(url):
+                response = self.user_client.get(url)
                 expected_status_code = (HTTPStatus.NOT_FOUND
                                         if url in urls_not_available_for_user
                                         else HTTPStatus.OK)
@@ -84,8 +91,8 @@ class TestRoutes(TestCase):
             self.USERS_SIGNUP_URL, self.USERS_LOGOUT_URL
         )
         for url in self.urls:
-            response = self.client.get(url)
-            with self.subTest(url=url):
+            with self.subTest(url=url), self.assert_query_budget(url):
+                response = self.client.get(url)
                 if url in urls_available_for_anon:
                     self.assertEqual(response.status_code, HTTPStatus.OK)
                 else:
@@ -0,0 +1,115 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes import search
+from notes.models import Note
+
+
+class TestNotesSearch(TestCase):
+    """Тестирование поиска по заметкам."""
+
+    SEARCH_URL = reverse('notes:search')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='автор')
+        cls.reader = User.objects.create_user(username='читатель')
+        cls.shopping = Note.objects.create(
+            title='Покупки', text='Купить молоко и хлеб', author=cls.author
+        )
+        cls.milk = Note.objects.create(
+            title='Молоко', text='Выбрать ферму', author=cls.author
+        )
+        cls.foreign = Note.objects.create(
+            title='Молоко', text='Чужая заметка про молоко',
+            author=cls.reader
+        )
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def search(self, query, author=None):
+        author = author or self.author
+        return [
+            result['id'] for result in search.search(query, author.pk, 10)
+        ]
+
+    def test_prefix_match(self):
+        """Слово находится по началу."""
+        self.assertEqual(self.search('хле'), [self.shopping.pk])
+
+    def test_only_own_notes(self):
+        """Пользователь находит только свои заметки."""
+        self.assertNotIn(self.foreign.pk, self.search('молоко'))
+        self.assertEqual(
+            self.search('молоко', self.reader), [self.foreign.pk]
+        )
+
+    def test_title_ranked_first(self):
+        """Совпадение в заголовке ранжируется выше совпадения в тексте."""
+        self.assertEqual(
+            self.search('молоко'), [self.milk.pk, self.shopping.pk]
+        )
+
+    def test_fts_syntax_is_quoted(self):
+        """Операторы FTS5 во вводе не ломают запрос."""
+        for query in (
+            '"', 'молоко OR', 'author:u1', 'NEAR(', '*', 'хлеб\x00x'
+        ):
+            with self.subTest(query=query):
+                self.search(query)
+        self.assertEqual(self.search('   '), [])
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении заметки."""
+        self.shopping.text = 'Купить кефир'
+        self.shopping.save()
+        self.assertEqual(self.search('хлеб'), [])
+        self.assertEqual(self.search('кефир'), [self.shopping.pk])
+        self.shopping.delete()
+        self.assertEqual(self.search('кефир'), [])
+
+    def test_search_page(self):
+        """Страница поиска выводит экранированный фрагмент с подсветкой."""
+        Note.objects.create(
+            title='Разметка', text='<b>хлеб</b>', author=self.author
+        )
+        response = self.author_client.get(self.SEARCH_URL, {'q': 'хлеб'})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.context['results']), 2)
+        self.assertContains(response, '&lt;b&gt;<mark>хлеб</mark>')
+
+    def test_bad_page(self):
+        for page in (
+            '0', 'x', '9' * 30, settings.NOTES_SEARCH_MAX_PAGE + 1
+        ):
+            with self.subTest(page=page):
+                response = self.author_client.get(
+                    self.SEARCH_URL, {'q': 'хлеб', 'page': page}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_reindex_command(self):
+        """Команда восстанавливает индекс одного или всех пользователей."""
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM notes_note_fts')
+        call_command(
+            'reindex_notes', user=self.reader.username, batch_size=1,
+            stdout=StringIO()
+        )
+        self.assertEqual(self.search('молоко'), [])
+        self.assertEqual(
+            self.search('молоко', self.reader), [self.foreign.pk]
+        )
+        out = StringIO()
+        call_command('reindex_notes', batch_size=2, stdout=out)
+        self.assertIn('3', out.getvalue())
+        self.assertEqual(
+            self.search('молоко'), [self.milk.pk, self.shopping.pk]
+        )
@@ -0,0 +1,62 @@
+import tempfile
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from yacommon import templating
+from yanote import settings_prod
+
+
+class TestTemplating(SimpleTestCase):
+    """Тестирование предварительной компиляции шаблонов."""
+
+    def test_project_templates_compile(self):
+        """Проверить, что все шаблоны проекта компилируются."""
+        count, errors = templating.precompile()
+        self.assertEqual(errors, [])
+        names = templating.template_names(engines['django'])
+        for name in ('base.html', 'notes/list.html', 'notes/detail.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+        self.assertGreaterEqual(count, len(names))
+
+    def test_check_templates_reports_broken_template(self):
+        """Проверить, что команда падает на шаблоне с ошибкой."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        (Path(directory.name) / 'broken.html').write_text('{% if %}')
+        templates = [{**settings.TEMPLATES[0], 'DIRS': [directory.name]}]
+        with override_settings(TEMPLATES=templates):
+            with self.assertRaisesRegex(CommandError, '1 из'):
+                call_command('check_templates')
+
+    def test_warmup_fails_on_broken_template(self):
+        """
+        Проверить, что прогрев при запуске пишет в лог шаблон с ошибкой
+        и прерывает запуск.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        (Path(directory.name) / 'broken.html').write_text('{% if %}')
+        templates = [{**settings.TEMPLATES[0], 'DIRS': [directory.name]}]
+        with override_settings(TEMPLATES=templates, TEMPLATES_WARMUP=True):
+            with self.assertLogs('yacommon.templating') as logs:
+                with self.assertRaisesRegex(
+                    ImproperlyConfigured, 'broken.html'
+                ):
+                    apps.get_app_config('yacommon').ready()
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('broken.html', logs.output[0])
+
+    @override_settings(TEMPLATES=settings_prod.TEMPLATES)
+    def test_prod_warmup_fills_loader_cache(self):
+        """Проверить, что в боевом профиле шаблоны попадают в кеш."""
+        templating.precompile()
+        loader, = engines['django'].engine.template_loaders
+        self.assertIn('notes/list.html', loader.get_template_cache)
+        self.assertIn('includes/header.html', loader.get_template_cache)
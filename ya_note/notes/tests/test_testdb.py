@@ -0,0 +1,69 @@
+import tempfile
+from pathlib import Path
+
+from django.apps import apps
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from notes import search, signals
+from yacommon import testdb
+
+
+class TestReusableDatabase(SimpleTestCase):
+    """Тестирование имени тестовой базы для pytest --reuse-db."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.project = Path(directory.name)
+        self.migrations = self.project / 'app' / 'migrations'
+        self.migrations.mkdir(parents=True)
+        (self.migrations / '0001_initial.py').write_text('operations = []')
+
+    def test_hash_follows_migrations(self):
+        """Проверить, что хеш меняется при правке и добавлении миграций."""
+        initial = testdb.migrations_hash(self.project)
+        self.assertEqual(testdb.migrations_hash(self.project), initial)
+        (self.migrations / '0001_initial.py').write_text('operations = [1]')
+        changed = testdb.migrations_hash(self.project)
+        self.assertNotEqual(changed, initial)
+        (self.migrations / '0002_more.py').write_text('operations = []')
+        self.assertNotIn(
+            testdb.migrations_hash(self.project), (initial, changed)
+        )
+
+    def test_reusable_name_removes_stale_databases(self):
+        """Проверить, что базы со старым хешем удаляются, а шарды - нет."""
+        directory = self.project / '.test_db'
+        directory.mkdir()
+        stale = directory / 'test_000000000000.sqlite3'
+        stale.touch()
+        name = testdb.reusable_name(self.project, directory)
+        shard = name.with_name(f'{name.name}_shard1')
+        name.touch()
+        shard.touch()
+        self.assertEqual(testdb.reusable_name(self.project, directory), name)
+        self.assertFalse(stale.exists())
+        self.assertTrue(name.exists())
+        self.assertTrue(shard.exists())
+
+
+class TestSearchWithoutMigrations(TestCase):
+    """Тестирование индекса поиска в базе, созданной без миграций."""
+
+    def index_exists(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'notes_note_fts'"
+            )
+            return cursor.fetchone() is not None
+
+    def test_search_installed_without_migrations(self):
+        """Проверить, что без миграций индекс поиска ставит post_migrate."""
+        config = apps.get_app_config('notes')
+        search.uninstall()
+        signals.install_search(sender=config, using='default')
+        self.assertFalse(self.index_exists())
+        with override_settings(MIGRATION_MODULES={'notes': None}):
+            signals.install_search(sender=config, using='default')
+        self.assertTrue(self.index_exists())
@@ -0,0 +1,174 @@
+import io
+import json
+import zipfile
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes import search, transfer
+from notes.models import Note
+
+
+class TestNotesTransfer(TestCase):
+    """Тестирование выгрузки и загрузки заметок."""
+
+    EXPORT_URL = reverse('notes:export')
+    IMPORT_URL = reverse('notes:import')
+    SUCCESS_URL = reverse('notes:success')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='автор')
+        cls.reader = User.objects.create_user(username='читатель')
+        cls.notes = [
+            Note.objects.create(
+                title=f'Заметка {number}',
+                text=f'строка 1\n\nстрока {number}',
+                author=cls.author,
+            )
+            for number in range(3)
+        ]
+        Note.objects.create(title='Чужая', text='текст', author=cls.reader)
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def export(self, file_format):
+        response = self.author_client.get(
+            self.EXPORT_URL, {'format': file_format}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def upload(self, name, content):
+        return self.reader_client.post(
+            self.IMPORT_URL, {'file': SimpleUploadedFile(name, content)}
+        )
+
+    def expected(self):
+        return [
+            {'title': note.title, 'text': note.text, 'slug': note.slug}
+            for note in self.notes
+        ]
+
+    def test_export_jsonl(self):
+        """Выгрузка JSON Lines содержит только заметки пользователя."""
+        lines = self.export('jsonl').decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         self.expected())
+
+    def test_export_zip(self):
+        """Выгрузка zip содержит по файлу Markdown на заметку."""
+        archive = zipfile.ZipFile(io.BytesIO(self.export('zip')))
+        self.assertEqual(
+            archive.namelist(), [f'{note.slug}.md' for note in self.notes]
+        )
+        self.assertEqual(
+            [transfer.from_markdown(archive.read(name).decode())
+             for name in archive.namelist()],
+            self.expected()
+        )
+
+    def test_unknown_format(self):
+        response = self.author_client.get(self.EXPORT_URL, {'format': 'x'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_import_renames_taken_slugs(self):
+        """
+        Занятые slug при загрузке заменяются свободными, а заметки сразу
+        попадают в поисковый индекс.
+        """
+        for file_format in transfer.FORMATS:
+            with self.subTest(file_format=file_format):
+                response = self.upload(
+                    f'notes.{file_format}', self.export(file_format)
+                )
+                self.assertRedirects(response, self.SUCCESS_URL)
+        imported = Note.objects.filter(author=self.reader).exclude(
+            title='Чужая'
+        ).order_by('id')
+        self.assertEqual(imported.count(), 2 * len(self.notes))
+        slugs = set(imported.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), 2 * len(self.notes))
+        self.assertFalse(slugs & {note.slug for note in self.notes})
+        self.assertEqual(
+            len(search.search('строка', self.reader.pk, 10)),
+            2 * len(self.notes)
+        )
+
+    def test_import_queries_do_not_grow_with_notes(self):
+        """Число запросов на пачку не зависит от числа заметок в ней."""
+        def rows(count):
+            return [
+                {'title': 'Заметка 0', 'text': 'т', 'slug': f'new-{i}'}
+                for i in range(count)
+            ] + [{'title': 'Заметка 0', 'text': 'т'}] * count
+
+        with self.assertNumQueries(7) as context:
+            transfer.import_notes(self.reader, rows(2))
+        with self.assertNumQueries(len(context.captured_queries)):
+            transfer.import_notes(self.reader, rows(50))
+
+    def test_import_error(self):
+        """Битый файл не загружается, ошибка выводится в форме."""
+        cases = (
+            ('notes.jsonl', b'{"title": "x"}\n', 'заметка 1: нет текста'),
+            ('notes.jsonl', b'\n\nnot json\n', 'строка 3: Expecting value'),
+            ('notes.zip', b'not zip', 'File is not a zip file'),
+            ('notes.jsonl', b'{"text": "\xff"}\n', 'не в кодировке UTF-8'),
+        )
+        for name, content, error in cases:
+            with self.subTest(content=content):
+                response = self.upload(name, content)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertIn(
+                    error, response.context['form'].errors['file'][0]
+                )
+        self.assertEqual(Note.objects.filter(author=self.reader).count(), 1)
+
+    def test_import_zip_size_limits(self):
+        """Архив проверяется по размеру до распаковки."""
+        def archive(*sizes):
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_:
+                for number, size in enumerate(sizes):
+                    zip_.writestr(
+                        f'{number}.md',
+                        transfer.to_markdown('т', 'x' * size, '')
+                    )
+            return buffer.getvalue()
+
+        cases = (
+            (archive(200), 'файл больше 100 байт'),
+            (archive(60, 60), 'архив больше 150 байт'),
+        )
+        with mock.patch.multiple(
+                transfer, MAX_ZIP_ENTRY_SIZE=100, MAX_ZIP_SIZE=150
+        ):
+            for content, error in cases:
+                with self.subTest(error=error):
+                    response = self.upload('notes.zip', content)
+                    self.assertIn(
+                        error, response.context['form'].errors['file'][0]
+                    )
+        self.assertEqual(Note.objects.filter(author=self.reader).count(), 1)
+
+    def test_import_slug_conflicts_become_form_error(self):
+        """Если slug всё время занимают, ошибка выводится в форме."""
+        with mock.patch.object(
+                Note.objects, 'bulk_create', side_effect=IntegrityError
+        ):
+            response = self.upload(
+                'notes.jsonl', b'{"title": "x", "text": "y"}\n'
+            )
+        self.assertIn(
+            'не удалось подобрать свободные slug',
+            response.context['form'].errors['file'][0]
+        )
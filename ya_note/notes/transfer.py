@@ -0,0 +1,266 @@
+"""
+Выгрузка и загрузка заметок пользователя.
+
+Заметки выгружаются в JSON Lines или в zip с файлом Markdown на каждую
+заметку. Оба формата собираются по мере чтения из базы, так что в памяти
+одновременно лежит не больше одной пачки заметок. Загрузка вставляет
+заметки пачками через bulk_create; slug подбираются по тем же правилам,
+что и в Note.save, но для всей пачки сразу.
+"""
+import io
+import json
+import zipfile
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import IntegrityError, transaction
+
+from . import search
+from .models import SLUG_ATTEMPTS, Note
+from .slugs import allocate_slugs
+
+FORMATS = ('jsonl', 'zip')
+CONTENT_TYPES = {'jsonl': 'application/jsonl', 'zip': 'application/zip'}
+FIELDS = ('title', 'text', 'slug')
+CHUNK_SIZE = 500
+FRONT_MATTER = '---'
+# Пределы распакованного размера архива: файла .md и всех вместе.
+MAX_ZIP_ENTRY_SIZE = 2 ** 20
+MAX_ZIP_SIZE = 64 * 2 ** 20
+
+
+class TransferError(Exception):
+    """Файл заметок нельзя загрузить."""
+
+
+def guess_format(name):
+    return 'zip' if str(name).lower().endswith('.zip') else 'jsonl'
+
+
+def _notes(author, chunk_size):
+    return Note.objects.filter(author=author).order_by('id').values_list(
+        *FIELDS
+    ).iterator(chunk_size=chunk_size)
+
+
+def to_markdown(title, text, slug):
+    """Заметка в Markdown; заголовок и slug - во front matter."""
+    return (
+        f'{FRONT_MATTER}\n'
+        f'title: {json.dumps(title, ensure_ascii=False)}\n'
+        f'slug: {slug}\n'
+        f'{FRONT_MATTER}\n\n'
+        f'{text}'
+    )
+
+
+def from_markdown(content):
+    lines = content.split('\n')
+    if not lines or lines[0] != FRONT_MATTER:
+        raise ValueError('нет заголовка ---')
+    end = lines.index(FRONT_MATTER, 1)
+    meta = dict(line.split(': ', 1) for line in lines[1:end])
+    body = lines[end + 1:]
+    if body and not body[0]:
+        body = body[1:]
+    return {
+        'title': json.loads(meta['title']),
+        'slug': meta.get('slug', ''),
+        'text': '\n'.join(body),
+    }
+
+
+def export_jsonl(author, chunk_size=CHUNK_SIZE):
+    """Строки JSON Lines, по одной на заметку."""
+    for row in _notes(author, chunk_size):
+        yield json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n'
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Приёмник без seek: zipfile пишет в него, генератор забирает."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_zip(author, chunk_size=CHUNK_SIZE):
+    """
+    Куски zip-архива с файлом <slug>.md на каждую заметку.
+
+    zipfile пишет в буфер без seek, поэтому архив отдаётся сразу после
+    каждого файла, а не собирается целиком.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for title, text, slug in _notes(author, chunk_size):
+            archive.writestr(f'{slug}.md', to_markdown(title, text, slug))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def export_notes(author, file_format):
+    if file_format == 'zip':
+        return export_zip(author)
+    return (line.encode() for line in export_jsonl(author))
+
+
+def _jsonl_rows(stream):
+    for number, line in enumerate(io.TextIOWrapper(stream, 'utf-8'), 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            raise TransferError(f'строка {number}: {error}')
+        if not isinstance(row, dict):
+            raise TransferError(f'строка {number}: ожидается объект JSON')
+        yield row
+
+
+def read_jsonl(stream):
+    """Словари заметок из потока байтов JSON Lines."""
+    try:
+        yield from _jsonl_rows(stream)
+    except UnicodeDecodeError as error:
+        # Поток декодируется блоками, поэтому номер строки неизвестен.
+        raise TransferError(f'файл не в кодировке UTF-8: {error}')
+
+
+def _markdown_entries(archive):
+    """
+    Файлы .md архива, если их распакованный размер в пределах.
+
+    Размер берётся из заголовков архива до распаковки; zipfile не
+    распакует больше, чем в них указано, так что подделать его нельзя.
+    """
+    entries = [
+        info for info in archive.infolist() if info.filename.endswith('.md')
+    ]
+    for info in entries:
+        if info.file_size > MAX_ZIP_ENTRY_SIZE:
+            raise TransferError(
+                f'{info.filename}: файл больше {MAX_ZIP_ENTRY_SIZE} байт'
+            )
+    if sum(info.file_size for info in entries) > MAX_ZIP_SIZE:
+        raise TransferError(f'архив больше {MAX_ZIP_SIZE} байт')
+    return entries
+
+
+def read_zip(stream):
+    """Словари заметок из файлов .md архива, по одному в памяти."""
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile as error:
+        raise TransferError(error)
+    with archive:
+        for info in _markdown_entries(archive):
+            try:
+                yield from_markdown(archive.read(info).decode())
+            except (ValueError, KeyError, zipfile.BadZipFile) as error:
+                raise TransferError(f'{info.filename}: {error}')
+
+
+def read_notes(stream, file_format):
+    return read_zip(stream) if file_format == 'zip' else read_jsonl(stream)
+
+
+def _valid_slug(slug):
+    if not slug or len(slug) > Note._meta.get_field('slug').max_length:
+        return False
+    try:
+        validate_slug(slug)
+    except ValidationError:
+        return False
+    return True
+
+
+def _assign_slugs(notes):
+    """
+    Подбирает slug всей пачке за несколько запросов.
+
+    Указанный в файле slug сохраняется, если он свободен и не повторяется
+    в пачке; иначе, как и для пустого slug в Note.save, берётся первый
+    свободный вариант из заголовка.
+    """
+    wanted = [note.slug for note in notes if _valid_slug(note.slug)]
+    taken = set(
+        Note.objects.filter(slug__in=wanted).values_list('slug', flat=True)
+    )
+    kept = set()
+    renamed = []
+    for note in notes:
+        if _valid_slug(note.slug) and note.slug not in taken | kept:
+            kept.add(note.slug)
+        else:
+            renamed.append(note)
+    for note, slug in zip(renamed, allocate_slugs(
+            [note.title for note in renamed], reserved=kept)):
+        note.slug = slug
+    return len(renamed)
+
+
+def _clean_title(title):
+    field = Note._meta.get_field('title')
+    return str(title or field.default)[:field.max_length]
+
+
+def _insert_chunk(author, rows, first):
+    """Вставляет пачку, подбирая slug заново, если их заняли параллельно."""
+    for _ in range(SLUG_ATTEMPTS):
+        notes = []
+        for number, row in enumerate(rows, first):
+            if not isinstance(row.get('text'), str):
+                raise TransferError(f'заметка {number}: нет текста')
+            notes.append(Note(
+                author=author,
+                title=_clean_title(row.get('title')),
+                text=row['text'],
+                slug=str(row.get('slug') or ''),
+            ))
+        try:
+            with transaction.atomic():
+                renamed = _assign_slugs(notes)
+                Note.objects.bulk_create(notes)
+                # bulk_create на SQLite не возвращает id, а сигналы не
+                # отправляет: находим заметки по slug и индексируем сами.
+                search.index_notes(Note.objects.filter(
+                    slug__in=[note.slug for note in notes]
+                ).values_list('id', flat=True))
+            return len(notes), renamed
+        except IntegrityError:
+            # slug занял параллельный запрос - подбираем пачке заново.
+            continue
+    raise TransferError(
+        f'заметки {first}-{first + len(rows) - 1}: '
+        'не удалось подобрать свободные slug, повторите загрузку'
+    )
+
+
+def import_notes(author, rows, chunk_size=CHUNK_SIZE):
+    """
+    Загружает заметки автору пачками по chunk_size.
+
+    Каждая пачка вставляется в своей транзакции. Возвращает число
+    загруженных заметок и число заметок, получивших новый slug.
+    """
+    created = renamed = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return created, renamed
+        counts = _insert_chunk(author, chunk, created + 1)
+        created, renamed = created + counts[0], renamed + counts[1]
@@ -1,10 +1,21 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
-from .forms import NoteForm
+from . import search, transfer
+from .conditions import note_etag, note_last_modified
+from .forms import WARNING, NoteForm, NotesImportForm
 from .models import Note
 
+# Диапазон целых SQLite: курсор вне его ломает запрос OverflowError.
+MIN_ID, MAX_ID = -2 ** 63, 2 ** 63 - 1
+
 
 class Home(generic.TemplateView):
     """Домашняя страница."""
@@ -26,22 +37,38 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormMixin:
+    """Сохранение заметки из формы создания или редактирования."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """
+        Сохраняем заметку один раз.
+
+        Явно указанный slug мог занять параллельный запрос уже после
+        проверки в форме - тогда показываем ту же ошибку, что и форма.
+        """
+        self.object = form.save(commit=False)
+        try:
+            with transaction.atomic():
+                self.object.save()
+        except IntegrityError:
+            form.add_error('slug', form.cleaned_data['slug'] + WARNING)
+            return self.form_invalid(form)
+        return redirect(self.get_success_url())
+
+
+class NoteCreate(NoteBase, NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -53,7 +80,109 @@ class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
-
+    def get_queryset(self):
+        """
+        Страница заметок по порядку id после курсора ?after=<id>.
+
+        Читаем только поля, которые выводит шаблон, а следующую страницу
+        выбираем условием по id, поэтому стоимость запроса не зависит
+        от числа заметок пользователя. Берём на одну заметку больше
+        страницы: по ней видно, есть ли следующая страница.
+        """
+        queryset = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        after = self.request.GET.get('after')
+        if after:
+            try:
+                after = int(after)
+            except ValueError:
+                raise Http404('Неверный курсор страницы заметок.')
+            if not MIN_ID <= after <= MAX_ID:
+                raise Http404('Неверный курсор страницы заметок.')
+            queryset = queryset.filter(id__gt=after)
+        return queryset[:settings.NOTES_COUNT_ON_LIST_PAGE + 1]
+
+    def get_context_data(self, **kwargs):
+        notes = self.object_list
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = None
+        if len(notes) > settings.NOTES_COUNT_ON_LIST_PAGE:
+            # Лишнюю заметку убираем из уже прочитанного результата:
+            # object_list остаётся QuerySet без повторного запроса.
+            notes._result_cache.pop()
+            context['next_cursor'] = notes._result_cache[-1].id
+        return context
+
+
+@method_decorator(condition(
+    etag_func=note_etag, last_modified_func=note_last_modified
+), name='get')
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NotesSearch(LoginRequiredMixin, generic.TemplateView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        try:
+            page = int(self.request.GET.get('page', 1))
+        except ValueError:
+            raise Http404('Неверный номер страницы.')
+        if not 1 <= page <= settings.NOTES_SEARCH_MAX_PAGE:
+            raise Http404('Неверный номер страницы.')
+        per_page = settings.NOTES_SEARCH_RESULTS_ON_PAGE
+        results = search.search(
+            query, self.request.user.pk,
+            limit=per_page + 1, offset=(page - 1) * per_page
+        )
+        context.update({
+            'query': query,
+            'results': results[:per_page],
+            'page': page,
+            'has_next': (
+                len(results) > per_page
+                and page < settings.NOTES_SEARCH_MAX_PAGE
+            ),
+        })
+        return context
+
+
+class NotesExport(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя в JSON Lines или zip."""
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'jsonl')
+        if file_format not in transfer.FORMATS:
+            raise Http404('Неизвестный формат выгрузки.')
+        response = StreamingHttpResponse(
+            transfer.export_notes(request.user, file_format),
+            content_type=transfer.CONTENT_TYPES[file_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{file_format}"'
+        )
+        return response
+
+
+class NotesImport(LoginRequiredMixin, generic.FormView):
+    """Загрузка заметок из файла выгрузки."""
+    template_name = 'notes/import.html'
+    form_class = NotesImportForm
+    success_url = reverse_lazy('notes:success')
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        try:
+            transfer.import_notes(self.request.user, transfer.read_notes(
+                upload, transfer.guess_format(upload.name)
+            ))
+        except transfer.TransferError as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        return super().form_valid(form)
@@ -1,8 +1,13 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+# Общий код обоих проектов - пакет yacommon в корне репозитория.
+REPO_DIR = BASE_DIR.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.append(str(REPO_DIR))
 
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
@@ -18,10 +23,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'notes.apps.NotesConfig'
+    'notes.apps.NotesConfig',
+    'yacommon.apps.CommonConfig',
 ]
 
 MIDDLEWARE = [
+    'yacommon.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +56,10 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать все шаблоны при запуске (yacommon/templating.py); имеет
+# смысл с кеширующим загрузчиком, как в settings_prod.
+TEMPLATES_WARMUP = False
+
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
@@ -59,6 +70,17 @@ DATABASES = {
     }
 }
 
+# PRAGMA для каждого нового соединения с SQLite (yacommon/db.py); значения
+# для боевого запуска - в settings_prod.
+SQLITE_PRAGMAS = {}
+
+
+# Кеш пользователя для yacommon.auth.CachedModelBackend (включён в
+# settings_prod): алиас из CACHES и время жизни записи в секундах. С
+# несколькими процессами алиас должен указывать на общий кеш, см.
+# yacommon/auth.py.
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = 300
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +109,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 50
+NOTES_SEARCH_RESULTS_ON_PAGE = 20
+# Дальше этой страницы поиск отвечает 404.
+NOTES_SEARCH_MAX_PAGE = 50
+
+# Замеры RequestMetricsMiddleware: Server-Timing и перцентили по
+# представлениям (команда request_metrics). Замеры процесса пишутся в
+# REQUEST_METRICS_DIR раз в REQUEST_METRICS_FLUSH_INTERVAL секунд.
+REQUEST_METRICS_ENABLED = False
+REQUEST_METRICS_DIR = BASE_DIR / 'request_metrics'
+REQUEST_METRICS_SAMPLES = 1000
+REQUEST_METRICS_FLUSH_INTERVAL = 10
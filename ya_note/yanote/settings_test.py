@@ -0,0 +1,25 @@
+"""
+Профиль для тестов: DJANGO_SETTINGS_MODULE=yanote.settings_test.
+
+Пароли хешируются MD5: PBKDF2 с сотнями тысяч итераций тратит заметное
+время на каждые create_user, регистрацию и вход.
+
+Тестовую базу выбирает переменная окружения TEST_DB: memory (по
+умолчанию), nomigrations или reuse - см. yacommon/testdb.py.
+"""
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES
+
+# После .settings: она добавляет в sys.path корень репозитория.
+from yacommon import testdb
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+TEST_DB = os.environ.get('TEST_DB', 'memory')
+TEST_DATABASE, SQLITE_PRAGMAS = testdb.database_settings(TEST_DB, BASE_DIR)
+
+DATABASES = {
+    'default': {**DATABASES['default'], 'TEST': TEST_DATABASE},
+}
@@ -0,0 +1,7 @@
+"""
+Общий код проектов ya_news и ya_note.
+
+Пакет лежит в корне репозитория; settings.py каждого проекта добавляет
+корень в sys.path и подключает приложение yacommon в INSTALLED_APPS -
+так находятся его команды manage.py.
+"""
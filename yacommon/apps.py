@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class CommonConfig(AppConfig):
+    name = 'yacommon'
+    verbose_name = 'Общий код проектов'
+
+    def ready(self):
+        from . import signals, templating  # noqa: F401
+
+        if settings.TEMPLATES_WARMUP:
+            templating.warmup()
@@ -0,0 +1,46 @@
+"""
+Бэкенд аутентификации с кешем пользователя.
+
+AuthenticationMiddleware на каждом запросе читает пользователя из
+auth_user. CachedModelBackend берёт его из кеша AUTH_USER_CACHE_ALIAS
+и идёт в базу только при промахе. Запись сбрасывается сигналом при
+сохранении или удалении пользователя.
+
+Сигнал сбрасывает запись только в том кеше, который видит процесс. С
+locmem кеш свой у каждого процесса, и в остальных процессах старый
+пользователь живёт до AUTH_USER_CACHE_TIMEOUT секунд: сессия, которую
+должна была завершить смена пароля или is_active=False, там всё ещё
+действует. Поэтому в settings_prod AUTH_USER_CACHE_ALIAS - общий для
+процессов кеш.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def _cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def _key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_user(user_id):
+    """Сбрасывает закешированного пользователя."""
+    _cache().delete(_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который кеширует пользователя для get_user()."""
+
+    def get_user(self, user_id):
+        cache = _cache()
+        user = cache.get(_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(
+                    _key(user_id), user, settings.AUTH_USER_CACHE_TIMEOUT
+                )
+        return user
@@ -0,0 +1,16 @@
+"""
+SQLite, в котором транзакции начинаются с BEGIN IMMEDIATE.
+
+Обычный BEGIN откладывает блокировку до первой записи, и если к этому
+моменту писать начал другой процесс, SQLite сразу возвращает "database
+is locked", не дожидаясь busy_timeout. BEGIN IMMEDIATE берёт блокировку
+записи в начале atomic(), где busy_timeout работает. Цена: atomic()
+только для чтения тоже ждёт писателей.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,34 @@
+"""
+Настройка соединений с SQLite.
+
+На каждом новом соединении выполняются PRAGMA из настройки
+SQLITE_PRAGMAS. В основном профиле она пустая, а settings_prod обоих
+проектов берут PROD_PRAGMAS.
+
+PROD_PRAGMAS переводят базу в режим WAL: читатели не блокируют
+писателя, а писатели ждут друг друга до busy_timeout вместо немедленной
+ошибки "database is locked". synchronous=NORMAL в режиме WAL не теряет
+целостность базы, но может потерять последние транзакции при
+отключении питания.
+"""
+from django.conf import settings
+
+# busy_timeout идёт первым: переключение в WAL само берёт блокировку.
+PROD_PRAGMAS = {
+    'busy_timeout': 20000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение - размер в КиБ, а не в страницах.
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_pragmas(connection):
+    """Выполняет PRAGMA из SQLITE_PRAGMAS в порядке их перечисления."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,40 @@
+"""
+Общее для полнотекстового поиска обоих проектов на SQLite FTS5.
+
+snippet() отмечает совпадения символами char(2) и char(3), а highlight()
+превращает их в теги <mark>. Сохранённый текст может сам содержать эти
+символы. Настоящая метка всегда прилегает к слову: открывающая стоит
+прямо перед ним, закрывающая - сразу после, а токенизатор считает сами
+символы разделителями. Прочие метки выбрасываются, оставшиеся
+разбираются как скобки: открывающая внутри совпадения и закрывающая вне
+его отбрасываются, незакрытое совпадение закрывается в конце. Теги в
+результате всегда парные, а всё остальное экранировано.
+"""
+import re
+
+from django.utils.html import escape
+
+MATCH_START, MATCH_END = '\x02', '\x03'
+MARKERS = re.compile(f'({MATCH_START}(?=\\w)|(?<=\\w){MATCH_END})')
+STRAY_MARKERS = re.compile(f'[{MATCH_START}{MATCH_END}]')
+# Управляющие символы во вводе: NUL обрывает строку запроса FTS5.
+CONTROL_CHARS = re.compile('[\x00-\x1f\x7f-\x9f]')
+
+
+def highlight(snippet):
+    """Безопасный HTML сниппета с подсветкой совпадений."""
+    parts, inside = [], False
+    for part in MARKERS.split(snippet):
+        if part == MATCH_START:
+            if not inside:
+                parts.append('<mark>')
+            inside = True
+        elif part == MATCH_END:
+            if inside:
+                parts.append('</mark>')
+            inside = False
+        else:
+            parts.append(escape(STRAY_MARKERS.sub('', part)))
+    if inside:
+        parts.append('</mark>')
+    return ''.join(parts)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from yacommon import templating
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта и приложений; завершается с '
+        'ошибкой, если какой-то шаблон не компилируется.'
+    )
+
+    def handle(self, *args, **options):
+        count, errors = templating.precompile()
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(
+                f'Не компилируются шаблоны: {len(errors)} из {count}.'
+            )
+        self.stdout.write(f'Скомпилировано шаблонов: {count}.')
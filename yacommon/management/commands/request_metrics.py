@@ -0,0 +1,80 @@
+import json
+from collections import defaultdict
+from math import ceil
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from yacommon.middleware import METRICS
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values, rank):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    return ordered[max(ceil(rank / 100 * len(ordered)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит перцентили времени и числа запросов к базе по '
+        'представлениям из замеров RequestMetricsMiddleware.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести отчёт в JSON.'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Удалить накопленные замеры после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        files = sorted(Path(settings.REQUEST_METRICS_DIR).glob('*.json'))
+        samples = defaultdict(lambda: defaultdict(list))
+        for path in files:
+            for view_name, view in json.loads(path.read_text()).items():
+                for metric in METRICS:
+                    samples[view_name][metric].extend(view[metric])
+
+        report = {
+            view_name: {
+                'requests': len(view['total']),
+                **{
+                    f'{metric}_p{rank}': percentile(view[metric], rank)
+                    for metric in METRICS
+                    for rank in PERCENTILES
+                },
+            }
+            for view_name, view in sorted(samples.items())
+            if view['total']
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.write_table(report)
+        if options['reset']:
+            for path in files:
+                path.unlink()
+
+    def write_table(self, report):
+        if not report:
+            self.stdout.write('Замеров пока нет.')
+            return
+        for view_name, row in report.items():
+            self.stdout.write(f'{view_name} (запросов: {row["requests"]})')
+            for metric in METRICS:
+                values = ' '.join(
+                    f'p{rank}={self.format(metric, row[f"{metric}_p{rank}"])}'
+                    for rank in PERCENTILES
+                )
+                self.stdout.write(f'  {metric:<9}{values}')
+
+    @staticmethod
+    def format(metric, value):
+        if metric == 'queries':
+            return str(value)
+        return f'{value * 1000:.1f}мс'
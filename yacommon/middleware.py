@@ -0,0 +1,187 @@
+"""
+Замеры стоимости запросов: число SQL-запросов, время в базе,
+время рендеринга шаблона и полное время ответа.
+
+Замеры отдаются в заголовке Server-Timing и копятся в памяти процесса по
+имени представления. Фоновый поток раз в REQUEST_METRICS_FLUSH_INTERVAL
+секунд (и atexit при завершении процесса) сбрасывает их в
+REQUEST_METRICS_DIR, откуда команда request_metrics собирает
+перцентили; сам запрос файлы не пишет. Если REQUEST_METRICS_ENABLED
+выключен, Django исключает middleware из цепочки и накладных расходов
+нет совсем.
+
+Время шаблонов - это все рендеры Template.render за запрос: и ответа
+TemplateResponse, и render_to_string внутри представления. Вложенные
+рендеры ({% include %}, шаблон внутри шаблона) входят во время внешнего
+и отдельно не считаются. Рендер в потоке, который не унаследовал
+контекст запроса, в замер не попадает.
+"""
+import atexit
+import json
+import os
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from threading import Lock, Thread
+from time import perf_counter, sleep
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+
+METRICS = ('total', 'db', 'template', 'queries')
+# Замеры текущего запроса для обёртки Template.render.
+current_stats = ContextVar('request_metrics', default=None)
+
+
+class MetricsRecorder:
+    """Последние замеры по каждому представлению в памяти процесса."""
+
+    def __init__(self):
+        self.samples = defaultdict(self._new_view)
+        self.pending = 0
+        self.lock = Lock()
+        # Файл пишут и фоновый поток, и atexit.
+        self.flush_lock = Lock()
+        self.thread = None
+
+    @staticmethod
+    def _new_view():
+        return {
+            metric: deque(maxlen=settings.REQUEST_METRICS_SAMPLES)
+            for metric in METRICS
+        }
+
+    def record(self, view_name, **values):
+        with self.lock:
+            view = self.samples[view_name]
+            for metric in METRICS:
+                view[metric].append(values[metric])
+            self.pending += 1
+            # После fork поток родителя в дочернем процессе не работает.
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = Thread(
+                    target=self._run, name='request-metrics', daemon=True
+                )
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            sleep(settings.REQUEST_METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view_name: {
+                    metric: list(values) for metric, values in view.items()
+                }
+                for view_name, view in self.samples.items()
+            }
+
+    def flush(self):
+        """Сбрасывает замеры процесса в файл <pid>.json."""
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return
+                self.pending = 0
+            directory = Path(settings.REQUEST_METRICS_DIR)
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f'{os.getpid()}.json'
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(self.snapshot()))
+            temporary.replace(path)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+            self.pending = 0
+
+
+recorder = MetricsRecorder()
+atexit.register(recorder.flush)
+
+
+def _timed_render(render):
+    @wraps(render)
+    def timed(self, context):
+        stats = current_stats.get()
+        if stats is None or stats['rendering']:
+            return render(self, context)
+        stats['rendering'] = True
+        start = perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            stats['template'] += perf_counter() - start
+            stats['rendering'] = False
+
+    timed.request_metrics = True
+    return timed
+
+
+def instrument_templates():
+    """Оборачивает Template.render замером времени, один раз."""
+    if not getattr(Template.render, 'request_metrics', False):
+        Template.render = _timed_render(Template.render)
+
+
+class RequestMetricsMiddleware:
+    """
+    Считает запросы к базе и время обработки каждого запроса.
+
+    Ставится первым в MIDDLEWARE, чтобы в полное время попали остальные
+    middleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        instrument_templates()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = {
+            'queries': 0, 'db': 0.0, 'template': 0.0, 'rendering': False,
+        }
+
+        def track_query(execute, sql, params, many, context):
+            start = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['db'] += perf_counter() - start
+                stats['queries'] += 1
+
+        start = perf_counter()
+        token = current_stats.set(stats)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(track_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        total = perf_counter() - start
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={stats["db"] * 1000:.2f};'
+            f'desc="{stats["queries"]} queries"',
+            f'tpl;dur={stats["template"] * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        match = request.resolver_match
+        recorder.record(
+            match.view_name if match else 'unresolved',
+            total=total,
+            db=stats['db'],
+            template=stats['template'],
+            queries=stats['queries'],
+        )
+        return response
@@ -0,0 +1,26 @@
+"""Проверка планов запросов SQLite (EXPLAIN QUERY PLAN) для тестов."""
+from django.db import connection
+
+
+def is_bad_plan_step(detail):
+    """Полный проход по таблице или сортировка во временном B-дереве."""
+    if detail.startswith('USE TEMP B-TREE'):
+        return True
+    return detail.startswith('SCAN ') and ' USING ' not in detail
+
+
+def explain(sql, params=()):
+    """Шаги плана запроса."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def bad_plans(queries):
+    """Планы запросов (sql, params), в которых есть плохие шаги."""
+    plans = []
+    for sql, params in queries:
+        details = explain(sql, params)
+        if any(is_bad_plan_step(detail) for detail in details):
+            plans.append(f'{sql}\n  ' + '\n  '.join(details))
+    return plans
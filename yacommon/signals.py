@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import auth, db
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Применяем SQLITE_PRAGMAS к новому соединению с базой."""
+    db.apply_pragmas(connection)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_cached_user(sender, instance, **kwargs):
+    """Сбрасываем пользователя в кеше CachedModelBackend."""
+    auth.forget_user(instance.pk)
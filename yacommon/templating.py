@@ -0,0 +1,73 @@
+"""
+Предварительная компиляция шаблонов.
+
+С кеширующим загрузчиком шаблон разбирается один раз на процесс, при
+первом обращении. Если TEMPLATES_WARMUP включена, это обращение
+происходит при запуске, а не на первом запросе пользователя, и шаблон
+с ошибкой не даёт процессу запуститься. Команда check_templates
+компилирует те же шаблоны и сообщает об ошибках.
+"""
+import logging
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+logger = logging.getLogger(__name__)
+
+
+def template_dirs(engine):
+    """Каталоги, в которых ищут шаблоны загрузчики движка."""
+    for loader in engine.engine.template_loaders:
+        if hasattr(loader, 'get_dirs'):
+            yield from map(Path, loader.get_dirs())
+
+
+def template_names(engine):
+    """Имена шаблонов из DIRS и каталогов templates приложений."""
+    names = set()
+    for directory in template_dirs(engine):
+        for path in directory.rglob('*'):
+            if path.suffix in TEMPLATE_SUFFIXES and path.is_file():
+                names.add(path.relative_to(directory).as_posix())
+    return sorted(names)
+
+
+def precompile():
+    """
+    Компилирует все шаблоны движков Django.
+
+    Возвращает число шаблонов и список пар (имя, ошибка). Шаблон с
+    ошибкой не попадает в кеш загрузчика.
+    """
+    count, errors = 0, []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in template_names(engine):
+            count += 1
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as error:
+                errors.append((name, error))
+    return count, errors
+
+
+def warmup():
+    """
+    Компилирует шаблоны при запуске процесса.
+
+    Каждый шаблон с ошибкой пишется в лог, после чего запуск прерывается
+    ImproperlyConfigured: иначе ошибка всплыла бы только на запросе.
+    """
+    count, errors = precompile()
+    for name, error in errors:
+        logger.error('Шаблон %s не компилируется: %s', name, error)
+    if errors:
+        raise ImproperlyConfigured(
+            f'Не компилируются шаблоны: {len(errors)} из {count} '
+            f'({", ".join(name for name, _ in errors)}).'
+        )
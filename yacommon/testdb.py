@@ -0,0 +1,63 @@
+"""
+Тестовая база SQLite для settings_test обоих проектов.
+
+Базу выбирает переменная окружения TEST_DB:
+    memory        база в памяти, схема по миграциям (по умолчанию);
+    nomigrations  база в памяти, таблицы сразу по моделям, без
+                  миграций - как у ключа pytest --nomigrations;
+    reuse         файл .test_db/test_<хеш миграций>.sqlite3: с ключом
+                  pytest --reuse-db схема создаётся один раз и
+                  переживает запуски, пока не изменятся миграции.
+
+В имени файла - хеш миграций приложений проекта и версии Django (с ней
+меняются миграции admin, auth и прочих встроенных приложений). Пока
+миграции прежние, pytest --reuse-db берёт схему из готового файла;
+после правки миграции имя меняется и база создаётся заново, а файлы со
+старым хешем удаляются.
+"""
+import hashlib
+from pathlib import Path
+
+import django
+
+
+def migrations_hash(base_dir):
+    """Хеш файлов миграций из приложений в base_dir и версии Django."""
+    base_dir = Path(base_dir)
+    digest = hashlib.sha256(django.get_version().encode())
+    for path in sorted(base_dir.glob('*/migrations/*.py')):
+        digest.update(str(path.relative_to(base_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def reusable_name(base_dir, directory):
+    """Путь к тестовой базе в directory для текущих миграций."""
+    directory = Path(directory)
+    directory.mkdir(exist_ok=True)
+    name = f'test_{migrations_hash(base_dir)}.sqlite3'
+    # Вместе с базой остаются её журнал и копии шардов pytest_shard.
+    for path in directory.glob('test_*.sqlite3*'):
+        if not path.name.startswith(name):
+            path.unlink(missing_ok=True)
+    return directory / name
+
+
+def database_settings(mode, base_dir):
+    """
+    Настройки для режима TEST_DB=mode проекта в base_dir.
+
+    Возвращает словарь TEST для DATABASES['default'] и SQLITE_PRAGMAS.
+    """
+    if mode == 'reuse':
+        test = {'NAME': reusable_name(base_dir, Path(base_dir) / '.test_db')}
+        # Файл можно потерять без ущерба: без fsync на каждый коммит
+        # транзакционные тесты не ждут диска.
+        return test, {'synchronous': 'OFF'}
+    if mode == 'nomigrations':
+        return {'MIGRATE': False}, {}
+    if mode == 'memory':
+        return {}, {}
+    raise ValueError(
+        f'TEST_DB={mode}: ожидается memory, nomigrations или reuse'
+    )